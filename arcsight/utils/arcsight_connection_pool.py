@@ -0,0 +1,239 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+"""ArcSight Plugin connection pool."""
+
+
+import select
+import socket
+import ssl
+import threading
+import time
+
+from .arcsight_constants import (
+    CONNECTION_IDLE_TIMEOUT,
+    MAX_IDLE_CONNECTIONS,
+    SSL_DRAIN_SIZE,
+)
+
+
+def _raise_error(record):
+    """Re-raise the error being handled by a pooled handler.
+
+    Logging handlers swallow delivery errors by default. Pooled handlers
+    re-raise them instead so that a broken connection can be replaced.
+    """
+    raise
+
+
+def _is_ssl_connection_alive(sock):
+    """To Check whether given SSL socket is still connected.
+
+    A TLS 1.3 server sends session tickets after the handshake, so the
+    socket is readable although the connection is healthy. The pending
+    records are read without blocking instead, and only an end of stream
+    or a reset marks the connection as dead.
+
+    Args:
+        sock: The SSL socket to be checked
+
+    Returns:
+        True if the connection can be reused, False otherwise
+    """
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        while True:
+            if not sock.recv(SSL_DRAIN_SIZE):
+                return False
+    except (ssl.SSLWantReadError, ssl.SSLWantWriteError):
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.settimeout(timeout)
+
+
+def is_connection_alive(handler):
+    """To Check whether the socket of given handler can still be written to.
+
+    A ArcSight receiver never sends data back. So a plain stream socket
+    that is readable has either been closed by the peer or is in an
+    unexpected state. Either way it must not be reused.
+
+    Args:
+        handler: The ArcSight handler whose socket is to be checked
+
+    Returns:
+        True if the connection can be reused, False otherwise
+    """
+    sock = getattr(handler, "socket", None)
+    if sock is None:
+        return False
+    try:
+        if sock.type != socket.SOCK_STREAM:
+            return True
+        if isinstance(sock, ssl.SSLSocket):
+            return _is_ssl_connection_alive(sock)
+        readable, _, _ = select.select([sock], [], [], 0)
+        return not readable
+    except (OSError, ValueError):
+        return False
+
+
+def close_handler(handler):
+    """To Close given handler, ignoring any error raised while doing so.
+
+    Args:
+        handler: The syslog handler to be closed
+    """
+    try:
+        handler.close()
+    except Exception:
+        pass
+
+
+class ArcSightConnectionPool(object):
+    """Pool of ArcSight handlers kept alive across pushes, per destination."""
+
+    def __init__(
+        self,
+        idle_timeout=CONNECTION_IDLE_TIMEOUT,
+        max_idle_connections=MAX_IDLE_CONNECTIONS,
+    ):
+        """Init method.
+
+        Args:
+            idle_timeout: Seconds after which an unused connection is closed
+            max_idle_connections: Max unused connections kept per destination
+        """
+        self.idle_timeout = idle_timeout
+        self.max_idle_connections = max_idle_connections
+        self._idle = {}  # destination -> list of (handler, last used time)
+        self._lock = threading.Lock()
+
+    def _pop_expired(self, now):
+        """To Remove the connections idle for longer than idle_timeout.
+
+        Must be called with the lock held.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            List of removed handlers
+        """
+        expired = []
+        for destination in list(self._idle):
+            connections = self._idle[destination]
+            alive = []
+            for handler, last_used in connections:
+                if now - last_used > self.idle_timeout:
+                    expired.append(handler)
+                else:
+                    alive.append((handler, last_used))
+            if alive:
+                self._idle[destination] = alive
+            else:
+                del self._idle[destination]
+        return expired
+
+    def acquire(self, destination, factory):
+        """To Fetch a healthy connection to given destination, creating one if needed.
+
+        The returned handler is owned by the caller until it is handed back
+        with release() or discard().
+
+        Args:
+            destination: Hashable key identifying the destination
+            factory: Callable creating a new handler for the destination
+
+        Returns:
+            Syslog handler
+        """
+        handler = None
+        with self._lock:
+            stale = self._pop_expired(time.monotonic())
+            connections = self._idle.get(destination, [])
+            while connections:
+                candidate, _ = connections.pop()
+                if is_connection_alive(candidate):
+                    handler = candidate
+                    break
+                stale.append(candidate)
+
+        for stale_handler in stale:
+            close_handler(stale_handler)
+
+        if handler is None:
+            handler = factory()
+            handler.handleError = _raise_error
+        return handler
+
+    def release(self, destination, handler):
+        """To Hand back a connection for later reuse.
+
+        Args:
+            destination: Hashable key identifying the destination
+            handler: The handler obtained from acquire()
+        """
+        surplus = []
+        with self._lock:
+            connections = self._idle.setdefault(destination, [])
+            connections.append((handler, time.monotonic()))
+            while len(connections) > self.max_idle_connections:
+                surplus.append(connections.pop(0)[0])
+
+        for surplus_handler in surplus:
+            close_handler(surplus_handler)
+
+    def discard(self, handler):
+        """To Close a connection which must not be reused.
+
+        Args:
+            handler: The handler obtained from acquire()
+        """
+        close_handler(handler)
+
+    def close_all(self):
+        """Close every idle connection of the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+
+        for connections in idle.values():
+            for handler, _ in connections:
+                close_handler(handler)
+
+
+# Connections are shared by every instance of the plugin in this process.
+connection_pool = ArcSightConnectionPool()
@@ -33,10 +33,18 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """ArcSight Plugin Helper."""
 
 
+import collections
+import json
+import re
+import threading
+
+from jsonpath import jsonpath
 from jsonschema import validate
 
 from .arcsight_exceptions import (
     MappingValidationError,
+    FieldNotFoundError,
+    SubtypeMappingNotFoundError,
 )
 from jsonschema.exceptions import ValidationError as JsonSchemaValidationError
 
@@ -237,3 +245,228 @@ def extract_subtypes(mappings, data_type):
     """
     taxonomy = mappings["taxonomy"][data_type]
     return [subtype for subtype in taxonomy]
+
+
+# Bounded per-process cache of compiled mapping plans. Keyed on the mapping
+# JSON itself so that any change in the configured mapping builds a new plan.
+MAPPING_PLAN_CACHE_SIZE = 64
+_mapping_plan_cache = collections.OrderedDict()
+_mapping_plan_lock = threading.Lock()
+
+# JSON paths made only of plain dotted keys (e.g. "$.a.b") are resolved by
+# direct dictionary lookups instead of going through jsonpath.
+_SIMPLE_JSON_PATH_RE = re.compile(r"^\$(\.[A-Za-z_][A-Za-z0-9_]*)+$")
+
+
+def _compile_json_path(json_path):
+    """Compile the given JSON path into a function fetching its values.
+
+    Args:
+        json_path: JSON path indicating the path of the value in given JSON
+
+    Returns:
+        Function returning the list of matched values (or False when nothing
+        matches), as jsonpath would.
+    """
+    if not _SIMPLE_JSON_PATH_RE.match(json_path):
+        return lambda data: jsonpath(data, json_path)
+
+    keys = tuple(json_path.split(".")[1:])
+
+    def fetch(data):
+        for key in keys:
+            if not isinstance(data, dict) or key not in data:
+                return False
+            data = data[key]
+        return [data]
+
+    return fetch
+
+
+def _compile_field(field_mapping, is_json_path=False):
+    """Compile the mapping of a single header/extension field into a getter.
+
+    Args:
+        field_mapping: Dict containing "mapping_field" and "default_value" fields
+        is_json_path: Whether the mapped value is JSON path or direct field name
+
+    Returns:
+        Function fetching the value of the field from given record
+
+    ---------------------------------------------------------------------
+         Mapping          |    Response    |    Retrieved Value
+    ----------------------|                |
+    default  |  Mapping   |                |
+    ---------------------------------------------------------------------
+       P     |     P      |        P       |           Mapped
+       P     |     P      |        NP      |           Default
+       P     |     NP     |        P       |           Default
+       NP    |     P      |        P       |           Mapped
+       P     |     NP     |        NP      |           Default
+       NP    |     P      |        NP      |           -
+       NP    |     NP     |        P       |           - (Not possible)
+       NP    |     NP     |        NP      |           - (Not possible)
+    -----------------------------------------------------------------------
+    """
+    mapping_field = field_mapping.get("mapping_field")
+    has_default = "default_value" in field_mapping
+    default_value = field_mapping.get("default_value")
+
+    if not mapping_field:
+        # If mapping is not present, 'default_value' must be there because of validation (case #3 and case #5)
+        return lambda data: default_value
+
+    if is_json_path:
+        fetch = _compile_json_path(mapping_field)
+
+        def get_json_path_value(data):
+            # If mapping field specified by JSON path is present in data, map that field, else skip by raising
+            # exception
+            value = fetch(data)
+            if value:
+                return ",".join([str(val) for val in value])
+            raise FieldNotFoundError(mapping_field)
+
+        return get_json_path_value
+
+    def get_field_value(data):
+        # If mapping is present in data, map that field, else skip by raising exception
+        if mapping_field in data:  # case #1 and case #4
+            value = data[mapping_field]
+            return value if value or isinstance(value, int) else "null"
+        elif has_default:
+            # If mapped value is not found in response and default is mapped, map the default value (case #2)
+            return default_value
+        # case #6
+        raise FieldNotFoundError(mapping_field)
+
+    return get_field_value
+
+
+class MappingPlan(object):
+    """Compiled header and extension mappings of a single subtype."""
+
+    def __init__(self, delimiter, cef_version, subtype_mapping):
+        """Init method.
+
+        Args:
+            delimiter: Delimiter of CEF components
+            cef_version: Version of CEF being used
+            subtype_mapping: Mapping JSON of the subtype to be compiled
+        """
+        self.delimiter = delimiter
+        self.cef_version = cef_version
+        self.header_fields = [
+            (cef_header, _compile_field(header_mapping))
+            for cef_header, header_mapping in subtype_mapping[
+                "header"
+            ].items()
+        ]
+        self.extension_fields = [
+            (
+                cef_extension,
+                _compile_field(
+                    extension_mapping,
+                    is_json_path="is_json_path" in extension_mapping,
+                ),
+            )
+            for cef_extension, extension_mapping in subtype_mapping[
+                "extension"
+            ].items()
+        ]
+
+    @staticmethod
+    def _apply(fields, data):
+        values = {}
+        for name, getter in fields:
+            try:
+                values[name] = getter(data)
+            except FieldNotFoundError:
+                # Fields missing from the record are skipped
+                pass
+        return values
+
+    def get_headers(self, data):
+        """Fetch the mapped CEF headers of given record.
+
+        Args:
+            data: The alert/event for which the CEF header is being generated
+
+        Returns:
+            header dict
+        """
+        return self._apply(self.header_fields, data)
+
+    def get_extensions(self, data):
+        """Fetch the mapped CEF extensions of given record.
+
+        Args:
+            data: The alert/event for which the CEF extension is being generated
+
+        Returns:
+            extension dict
+        """
+        return self._apply(self.extension_fields, data)
+
+
+def get_subtype_mapping(mappings, subtype):
+    """Retrieve subtype mappings (mappings for subtypes of alerts/events) case insensitively.
+
+    Args:
+        mappings: Mapping JSON from which subtypes are to be retrieved
+        subtype: Subtype (e.g. DLP for alerts) for which the mapping is to be fetched
+
+    Returns:
+        Fetched mapping JSON object
+    """
+    mappings = {k.lower(): v for k, v in mappings.items()}
+    return mappings[subtype.lower()]
+
+
+def get_mapping_plan(mappings, data_type, subtype):
+    """Fetch the compiled mapping plan of given data type and subtype.
+
+    The mappings are validated and compiled only the first time a given
+    (mapping JSON, data_type, subtype) is seen; later calls are served from
+    a per-process cache.
+
+    Args:
+        mappings: Attribute mapping json
+        data_type (str): Data type (alert/event) for which the plan is to be fetched
+        subtype (str): Subtype for which the plan is to be fetched
+
+    Raises:
+        KeyError: If the mapping JSON is malformed
+        MappingValidationError: If the mapping JSON fails validation
+        SubtypeMappingNotFoundError: If the subtype is not mapped
+
+    Returns:
+        MappingPlan object
+    """
+    key = (
+        json.dumps(mappings, sort_keys=True),
+        data_type,
+        subtype.lower(),
+    )
+    with _mapping_plan_lock:
+        plan = _mapping_plan_cache.get(key)
+        if plan is not None:
+            _mapping_plan_cache.move_to_end(key)
+            return plan
+
+    delimiter, cef_version, arcsight_mappings = get_arcsight_mappings(
+        mappings, data_type
+    )
+    try:
+        subtype_mapping = get_subtype_mapping(
+            arcsight_mappings[data_type], subtype
+        )
+    except Exception:
+        raise SubtypeMappingNotFoundError(subtype)
+    plan = MappingPlan(delimiter, cef_version, subtype_mapping)
+
+    with _mapping_plan_lock:
+        _mapping_plan_cache[key] = plan
+        while len(_mapping_plan_cache) > MAPPING_PLAN_CACHE_SIZE:
+            _mapping_plan_cache.popitem(last=False)
+    return plan
@@ -33,9 +33,7 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """AWS S3 Plugin."""
 
 
-import os
 from typing import List
-from tempfile import NamedTemporaryFile
 
 from netskope.integrations.cls.plugin_base import (
     PluginBase,
@@ -46,6 +44,14 @@ from .utils.aws_s3_validator import (
     AWSS3Validator,
 )
 from .utils.aws_s3_client import AWSS3Client
+from .utils.aws_s3_constants import (
+    COMPRESSION_NONE,
+    DEFAULT_COMPRESSION_LEVEL,
+    DEFAULT_MAX_SPOOL_SIZE,
+    SPOOL_DIRECTORY,
+)
+from .utils.aws_s3_encoder import get_encoder
+from .utils.aws_s3_spool_writer import AWSS3SpoolWriter
 
 
 class AWSS3Plugin(PluginBase):
@@ -73,19 +79,35 @@ class AWSS3Plugin(PluginBase):
             aws_client = AWSS3Client(
                 self.configuration, self.logger, self.proxy
             )
-
-            temp_obj_file = NamedTemporaryFile("wb", delete=False)
-            for data in transformed_data:
-                temp_obj_file.write(data)
-            temp_obj_file.flush()
-
-            try:
-                aws_client.push(temp_obj_file.name, data_type, subtype)
-            except Exception:
-                raise
-            finally:
-                temp_obj_file.close()
-                os.unlink(temp_obj_file.name)
+            spool_writer = AWSS3SpoolWriter(
+                AWSS3SpoolWriter.get_spool_dir(
+                    self.configuration.get("spool_directory")
+                    or SPOOL_DIRECTORY,
+                    self.configuration["region_name"],
+                    self.configuration["bucket_name"],
+                    self.configuration["obj_prefix"],
+                ),
+                self.configuration["max_file_size"],
+                self.configuration["max_duration"],
+                aws_client.push,
+                self.logger,
+                self.configuration.get("max_spool_size")
+                or DEFAULT_MAX_SPOOL_SIZE,
+            )
+            compression = (
+                self.configuration.get("compression") or COMPRESSION_NONE
+            )
+            encoder = get_encoder(
+                compression,
+                self.configuration.get("compression_level")
+                or DEFAULT_COMPRESSION_LEVEL,
+            )
+            spool_writer.write(
+                encoder.encode(transformed_data),
+                data_type,
+                subtype,
+                compression,
+            )
         except Exception as e:
             self.logger.error(f"Error while pushing to AWS S3: {e}")
             raise
@@ -192,6 +214,32 @@ class AWSS3Plugin(PluginBase):
                 success=False, message="Invalid Max File Size provided."
             )
 
+        if not aws_validator.validate_compression(
+            configuration.get("compression") or COMPRESSION_NONE,
+            configuration.get("compression_level") or DEFAULT_COMPRESSION_LEVEL,
+        ):
+            self.logger.error(
+                "AWS S3 Plugin: Validation error occurred. Error: "
+                "Invalid Compression or Compression Level found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False,
+                message="Invalid Compression or Compression Level provided.",
+            )
+
+        if not aws_validator.validate_spool_settings(
+            configuration.get("spool_directory"),
+            configuration.get("max_spool_size") or DEFAULT_MAX_SPOOL_SIZE,
+        ):
+            self.logger.error(
+                "AWS S3 Plugin: Validation error occurred. Error: "
+                "Invalid Spool Directory or Maximum Spool Size found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False,
+                message="Invalid Spool Directory or Maximum Spool Size provided.",
+            )
+
         try:
             aws_validator.validate_credentials(
                 configuration["aws_public_key"].strip(),
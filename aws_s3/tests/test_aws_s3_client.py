@@ -0,0 +1,193 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Tests of the AWS S3 client against moto's in-memory S3."""
+
+
+import gzip
+import io
+import logging
+import os
+
+import pytest
+
+pytest.importorskip("moto")
+
+import boto3  # noqa: E402
+from moto import mock_aws  # noqa: E402
+
+from ..utils import aws_s3_client  # noqa: E402
+from ..utils.aws_s3_client import AWSS3Client  # noqa: E402
+from ..utils.aws_s3_constants import MULTIPART_CHUNKSIZE  # noqa: E402
+
+REGION = "us-east-2"
+BUCKET = "netskope-logs"
+
+
+def _configuration(**overrides):
+    """To Build a plugin configuration, with given overrides."""
+    configuration = {
+        "aws_public_key": "AKIAEXAMPLE",
+        "aws_private_key": "secret",
+        "region_name": REGION,
+        "bucket_name": BUCKET,
+        "obj_prefix": "ns",
+    }
+    configuration.update(overrides)
+    return configuration
+
+
+@pytest.fixture(autouse=True)
+def s3(monkeypatch):
+    """moto S3, with empty caches of the client module."""
+    monkeypatch.setattr(aws_s3_client, "_clients", aws_s3_client.OrderedDict())
+    monkeypatch.setattr(aws_s3_client, "_existing_buckets", set())
+    with mock_aws():
+        yield boto3.client("s3", region_name=REGION)
+
+
+@pytest.fixture
+def calls():
+    """Names of the S3 operations called by the cached clients."""
+    names = []
+
+    def record(model, **kwargs):
+        names.append(model.name)
+
+    client = AWSS3Client(_configuration(), logging.getLogger(__name__), {})
+    client.get_aws_client().meta.events.register("before-call.s3", record)
+    return names
+
+
+def _push(data, data_type="alerts", subtype="dlp", **overrides):
+    """To Push given data with a new client, as every plugin push does."""
+    AWSS3Client(
+        _configuration(**overrides), logging.getLogger(__name__), {}
+    ).push(data, data_type, subtype)
+
+
+def _objects(s3, bucket=BUCKET):
+    """To List the objects of given bucket."""
+    return s3.list_objects_v2(Bucket=bucket).get("Contents", [])
+
+
+def test_push_file(s3, tmp_path):
+    """A file is uploaded under the object prefix, data type and subtype."""
+    path = tmp_path / "chunk"
+    path.write_bytes(b'{"alert": 1}\n')
+
+    _push(str(path))
+
+    (item,) = _objects(s3)
+    assert item["Key"].startswith("ns_alerts_dlp_")
+    body = s3.get_object(Bucket=BUCKET, Key=item["Key"])["Body"].read()
+    assert body == b'{"alert": 1}\n'
+
+
+def test_push_file_object(s3):
+    """In-memory data is uploaded, named after its compression."""
+    _push(io.BytesIO(gzip.compress(b"data")), None, None)
+
+    (item,) = _objects(s3)
+    assert item["Key"].startswith("ns_webtx_")
+    assert item["Key"].endswith(".gz")
+
+
+def test_push_large_file_multipart(s3, tmp_path):
+    """Files above the multipart threshold are uploaded in parts."""
+    data = os.urandom(2 * MULTIPART_CHUNKSIZE + 1024)
+    path = tmp_path / "chunk"
+    path.write_bytes(data)
+
+    _push(str(path))
+
+    (item,) = _objects(s3)
+    assert item["Size"] == len(data)
+    # The ETag of a multipart upload ends with its number of parts
+    assert item["ETag"].strip('"').endswith("-3")
+    body = s3.get_object(Bucket=BUCKET, Key=item["Key"])["Body"].read()
+    assert body == data
+
+
+def test_bucket_created(s3, tmp_path):
+    """A missing bucket is created in the configured region."""
+    path = tmp_path / "chunk"
+    path.write_bytes(b"data")
+
+    _push(str(path))
+
+    location = s3.get_bucket_location(Bucket=BUCKET)["LocationConstraint"]
+    assert location == REGION
+
+
+def test_bucket_created_without_region(s3, tmp_path):
+    """Without a configured region, the bucket is created in the default one."""
+    path = tmp_path / "chunk"
+    path.write_bytes(b"data")
+
+    _push(str(path), region_name="None")
+
+    assert [item["Name"] for item in s3.list_buckets()["Buckets"]] == [BUCKET]
+
+
+def test_client_and_bucket_cached(s3, tmp_path, calls):
+    """Pushes share one client, and check the bucket only once."""
+    path = tmp_path / "chunk"
+    path.write_bytes(b"data")
+
+    for _ in range(3):
+        _push(str(path))
+
+    assert len(_objects(s3)) == 3
+    assert calls.count("HeadBucket") == 1
+    assert calls.count("CreateBucket") == 1
+    assert calls.count("PutObject") == 3
+
+
+def test_existing_bucket_not_created(s3, tmp_path, calls):
+    """An existing bucket is used as it is."""
+    s3.create_bucket(
+        Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": REGION}
+    )
+    path = tmp_path / "chunk"
+    path.write_bytes(b"data")
+
+    _push(str(path))
+
+    assert "CreateBucket" not in calls
+    assert len(_objects(s3)) == 1
+
+
+def test_push_error_raised(tmp_path):
+    """Errors of the upload are raised to the plugin."""
+    with pytest.raises(FileNotFoundError):
+        _push(str(tmp_path / "missing"))
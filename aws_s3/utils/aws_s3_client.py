@@ -33,10 +33,40 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """AWS S3 Client Class."""
 
 
+import json
+import threading
 import boto3
 import time
 import uuid
+from collections import OrderedDict
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from .aws_s3_constants import (
+    MAX_CACHED_BUCKETS,
+    MAX_CACHED_CLIENTS,
+    MAX_POOL_CONNECTIONS,
+    MAX_RETRY_ATTEMPTS,
+    MULTIPART_CHUNKSIZE,
+    MULTIPART_THRESHOLD,
+    UPLOAD_CONCURRENCY,
+)
+from .aws_s3_encoder import get_extension
+
+# boto3 clients are thread safe and expensive to build (credential
+# resolution, endpoint loading), so they are shared across pushes.
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+# Buckets already known to exist, keyed by (client key, bucket name)
+_existing_buckets = set()
+
+_transfer_config = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_CHUNKSIZE,
+    max_concurrency=UPLOAD_CONCURRENCY,
+    use_threads=True,
+)
 
 
 class AWSS3Client:
@@ -48,105 +78,125 @@ class AWSS3Client:
         self.logger = logger
         self.proxy = proxy
 
+    def _get_client_kwargs(self):
+        """To get the arguments of the aws client/resource."""
+        kwargs = {
+            "aws_access_key_id": self.configuration["aws_public_key"],
+            "aws_secret_access_key": self.configuration["aws_private_key"],
+            "config": Config(
+                proxies=self.proxy,
+                max_pool_connections=MAX_POOL_CONNECTIONS,
+                retries={"max_attempts": MAX_RETRY_ATTEMPTS, "mode": "standard"},
+            ),
+        }
+        if self.configuration["region_name"] != "None":
+            kwargs["region_name"] = self.configuration["region_name"]
+        return kwargs
+
+    def _get_cache_key(self):
+        """To get the key of the cached aws client of the configuration."""
+        return (
+            self.configuration["aws_public_key"],
+            self.configuration["aws_private_key"],
+            self.configuration["region_name"],
+            json.dumps(self.proxy, sort_keys=True) if self.proxy else None,
+        )
+
     def get_aws_resource(self):
         """To get aws resource."""
-        try:
-            if self.configuration["region_name"] == "None":
-                s3_resource = boto3.resource(
-                    "s3",
-                    aws_access_key_id=self.configuration["aws_public_key"],
-                    aws_secret_access_key=self.configuration[
-                        "aws_private_key"
-                    ],
-                    config=Config(proxies=self.proxy),
-                )
-                return s3_resource
-            else:
-                s3_resource = boto3.resource(
-                    "s3",
-                    aws_access_key_id=self.configuration["aws_public_key"],
-                    aws_secret_access_key=self.configuration[
-                        "aws_private_key"
-                    ],
-                    region_name=self.configuration["region_name"],
-                    config=Config(proxies=self.proxy),
-                )
-                return s3_resource
-        except Exception:
-            raise
+        return boto3.resource("s3", **self._get_client_kwargs())
 
     def get_aws_client(self):
-        """To get aws client."""
-        try:
-            if self.configuration["region_name"] == "None":
-                s3_client = boto3.client(
-                    "s3",
-                    aws_access_key_id=self.configuration["aws_public_key"],
-                    aws_secret_access_key=self.configuration[
-                        "aws_private_key"
-                    ],
-                    config=Config(proxies=self.proxy),
-                )
+        """To get aws client, cached per credentials, region and proxy."""
+        key = self._get_cache_key()
+        with _clients_lock:
+            s3_client = _clients.get(key)
+            if s3_client is not None:
+                _clients.move_to_end(key)
                 return s3_client
-            else:
-                s3_client = boto3.client(
-                    "s3",
-                    aws_access_key_id=self.configuration["aws_public_key"],
-                    aws_secret_access_key=self.configuration[
-                        "aws_private_key"
-                    ],
-                    region_name=self.configuration["region_name"],
-                    config=Config(proxies=self.proxy),
-                )
-                return s3_client
-        except Exception:
-            raise
+        # The default boto3 session is not thread safe, use a dedicated one
+        s3_client = boto3.session.Session().client(
+            "s3", **self._get_client_kwargs()
+        )
+        with _clients_lock:
+            s3_client = _clients.setdefault(key, s3_client)
+            _clients.move_to_end(key)
+            while len(_clients) > MAX_CACHED_CLIENTS:
+                _clients.popitem(last=False)
+        return s3_client
 
     def is_bucket_exists(self, bucket_name):
         """To check if a bucket exists or not."""
+        s3_client = self.get_aws_client()
         try:
-            s3_client = self.get_aws_client()
-            buckets = s3_client.list_buckets()
-            for bucket in buckets["Buckets"]:
-                if bucket_name == bucket["Name"]:
-                    return True
-            return False
-        except Exception:
+            s3_client.head_bucket(Bucket=bucket_name)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchBucket"):
+                return False
             raise
 
     def get_bucket(self):
         """To get bucket if exists or create bucket."""
-        try:
-            if not self.is_bucket_exists(self.configuration["bucket_name"]):
-                s3_client = self.get_aws_client()
-                if self.configuration["region_name"] == "None":
-                    bucket = s3_client.create_bucket(
-                        Bucket=self.configuration["bucket_name"],
-                    )
-                else:
-                    location = {
-                        "LocationConstraint": self.configuration["region_name"]
-                    }
-                    bucket = s3_client.create_bucket(
-                        Bucket=self.configuration["bucket_name"],
-                        CreateBucketConfiguration=location,
-                    )
-                return bucket
-        except Exception as e:
-            raise e
-
-    def push(self, file_name, data_type, subtype):
-        """Push method."""
+        bucket_name = self.configuration["bucket_name"]
+        key = (self._get_cache_key(), bucket_name)
+        if key in _existing_buckets:
+            return None
+        bucket = None
+        if not self.is_bucket_exists(bucket_name):
+            s3_client = self.get_aws_client()
+            if self.configuration["region_name"] == "None":
+                bucket = s3_client.create_bucket(
+                    Bucket=bucket_name,
+                )
+            else:
+                location = {
+                    "LocationConstraint": self.configuration["region_name"]
+                }
+                bucket = s3_client.create_bucket(
+                    Bucket=bucket_name,
+                    CreateBucketConfiguration=location,
+                )
+        if len(_existing_buckets) >= MAX_CACHED_BUCKETS:
+            _existing_buckets.clear()
+        _existing_buckets.add(key)
+        return bucket
+
+    def push(self, data, data_type, subtype):
+        """Push method.
+
+        Objects larger than MULTIPART_THRESHOLD are uploaded as multipart
+        uploads with UPLOAD_CONCURRENCY parts in flight.
+
+        Args:
+            data: Path of the file to be uploaded, or a binary file-like
+                object (e.g. io.BytesIO) to be streamed from memory
+            data_type: The type of data being pushed (None for webtx)
+            subtype: The subtype of data being pushed
+        """
         cur_time = int(time.time())
         if data_type is None:
             object_name = f'{self.configuration["obj_prefix"]}_webtx_{cur_time}_{str(uuid.uuid1())}'
         else:
             object_name = f'{self.configuration["obj_prefix"]}_{data_type}_{subtype}_{cur_time}_{str(uuid.uuid1())}'
         try:
+            object_name += get_extension(data)
             s3_client = self.get_aws_client()
-            s3_client.upload_file(
-                file_name, self.configuration["bucket_name"], object_name
-            )
+            self.get_bucket()
+            if isinstance(data, str):
+                s3_client.upload_file(
+                    data,
+                    self.configuration["bucket_name"],
+                    object_name,
+                    Config=_transfer_config,
+                )
+            else:
+                s3_client.upload_fileobj(
+                    data,
+                    self.configuration["bucket_name"],
+                    object_name,
+                    Config=_transfer_config,
+                )
             self.logger.info(
                 f"Successfully Uploaded to AWS S3 as object file.{object_name}"
             )
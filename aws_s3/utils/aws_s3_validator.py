@@ -33,9 +33,16 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """AWS S3 validator."""
 
 
+import os
 import boto3
 from botocore.config import Config
-from .aws_s3_constants import REGIONS
+from .aws_s3_constants import (
+    COMPRESSION_LEVELS,
+    COMPRESSION_NONE,
+    COMPRESSION_ZSTD,
+    REGIONS,
+)
+from .aws_s3_encoder import zstandard
 
 
 class AWSS3Validator(object):
@@ -87,6 +94,59 @@ class AWSS3Validator(object):
         else:
             return False
 
+    def validate_compression(self, compression, compression_level):
+        """Validate compression and compression level.
+
+        Args:
+            compression: the compression to be validated
+            compression_level: the compression level to be validated
+
+        Returns:
+            Whether the provided values are valid or not. True in case of valid values, False otherwise
+        """
+        if compression == COMPRESSION_NONE:
+            return True
+        if compression not in COMPRESSION_LEVELS:
+            return False
+        if compression == COMPRESSION_ZSTD and zstandard is None:
+            self.logger.error(
+                "AWS S3 Plugin: The zstandard package is required for zstd compression."
+            )
+            return False
+        try:
+            compression_level = int(compression_level)
+        except (TypeError, ValueError):
+            return False
+        low, high = COMPRESSION_LEVELS[compression]
+        return low <= compression_level <= high
+
+    def validate_spool_settings(self, spool_directory, max_spool_size):
+        """Validate spool directory and max spool size.
+
+        Args:
+            spool_directory: the spool directory to be validated, empty for the default one
+            max_spool_size: the max spool size (in MBs) to be validated
+
+        Returns:
+            Whether the provided values are valid or not. True in case of valid values, False otherwise
+        """
+        try:
+            if int(max_spool_size) <= 0:
+                return False
+        except (TypeError, ValueError):
+            return False
+        if not spool_directory:
+            return True
+        if not isinstance(spool_directory, str) or not os.path.isabs(
+            spool_directory
+        ):
+            return False
+        try:
+            os.makedirs(spool_directory, exist_ok=True)
+        except OSError:
+            return False
+        return os.access(spool_directory, os.W_OK | os.X_OK)
+
     def validate_region_name(self, region_name):
         """Validate region name.
 
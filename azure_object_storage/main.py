@@ -34,10 +34,8 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
 import re
-import os
 from typing import List
 from azure.storage.blob import BlobServiceClient
-from tempfile import NamedTemporaryFile
 from netskope.integrations.cls.plugin_base import PluginBase, ValidationResult
 
 from .utils.azure_validator import (
@@ -46,6 +44,16 @@ from .utils.azure_validator import (
 from .utils.azure_client import (
     AzureClient,
 )
+from .utils.azure_constants import (
+    COMPRESSION_NONE,
+    DEFAULT_COMPRESSION_LEVEL,
+    DEFAULT_MAX_SPOOL_SIZE,
+    DEFAULT_UPLOAD_BLOCK_SIZE,
+    DEFAULT_UPLOAD_CONCURRENCY,
+    SPOOL_DIRECTORY,
+)
+from .utils.azure_encoder import get_encoder
+from .utils.azure_spool_writer import AzureSpoolWriter
 
 REGEX_FOR_CONTAINER = r"^(?!-)(?!.*--)[A-Za-z0-9-]+(?<!-)$"
 
@@ -62,17 +70,35 @@ class AzurePlugin(PluginBase):
         """
         try:
             self.azure_client = AzureClient(self.configuration, self.logger, self.proxy)
-            temp_obj_file = NamedTemporaryFile("wb", delete=False)
-            for data in transformed_data:
-                temp_obj_file.write(data)
-            temp_obj_file.flush()
-            try:
-                self.azure_client.push(temp_obj_file.name, data_type, subtype)
-            except Exception:
-                raise
-            finally:
-                temp_obj_file.close()
-                os.unlink(temp_obj_file.name)
+            spool_writer = AzureSpoolWriter(
+                AzureSpoolWriter.get_spool_dir(
+                    self.configuration.get("spool_directory")
+                    or SPOOL_DIRECTORY,
+                    self.configuration["azure_connection_string"],
+                    self.configuration["container_name"],
+                    self.configuration["obj_prefix"],
+                ),
+                self.configuration["max_file_size"],
+                self.configuration["max_duration"],
+                self.azure_client.push,
+                self.logger,
+                self.configuration.get("max_spool_size")
+                or DEFAULT_MAX_SPOOL_SIZE,
+            )
+            compression = (
+                self.configuration.get("compression") or COMPRESSION_NONE
+            )
+            encoder = get_encoder(
+                compression,
+                self.configuration.get("compression_level")
+                or DEFAULT_COMPRESSION_LEVEL,
+            )
+            spool_writer.write(
+                encoder.encode(transformed_data),
+                data_type,
+                subtype,
+                compression,
+            )
         except Exception as e:
             self.logger.error(
                 f"Error while pushing to Azure Storage Plugin: {e}"
@@ -159,6 +185,46 @@ class AzurePlugin(PluginBase):
                 success=False, message="Invalid Max Duration provided."
             )
 
+        if not azure_validator.validate_compression(
+            configuration.get("compression") or COMPRESSION_NONE,
+            configuration.get("compression_level") or DEFAULT_COMPRESSION_LEVEL,
+        ):
+            self.logger.error(
+                "Azure Storage Plugin: Validation error occurred. Error: "
+                "Invalid Compression or Compression Level found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False,
+                message="Invalid Compression or Compression Level provided.",
+            )
+
+        if not azure_validator.validate_spool_settings(
+            configuration.get("spool_directory"),
+            configuration.get("max_spool_size") or DEFAULT_MAX_SPOOL_SIZE,
+        ):
+            self.logger.error(
+                "Azure Storage Plugin: Validation error occurred. Error: "
+                "Invalid Spool Directory or Maximum Spool Size found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False,
+                message="Invalid Spool Directory or Maximum Spool Size provided.",
+            )
+
+        if not azure_validator.validate_upload_settings(
+            configuration.get("upload_block_size") or DEFAULT_UPLOAD_BLOCK_SIZE,
+            configuration.get("upload_concurrency")
+            or DEFAULT_UPLOAD_CONCURRENCY,
+        ):
+            self.logger.error(
+                "Azure Storage Plugin: Validation error occurred. Error: "
+                "Invalid Upload Block Size or Upload Concurrency found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False,
+                message="Invalid Upload Block Size or Upload Concurrency provided.",
+            )
+
         return ValidationResult(
             success=True, message="Validation successful."
         )
@@ -0,0 +1,245 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Tests of the Azure Blob client against a local Blob endpoint.
+
+The endpoint emulates the few Blob service operations made by AzureClient,
+keeping the containers and blobs in memory and counting the requests.
+"""
+
+
+import http.server
+import logging
+import re
+import threading
+import urllib.parse
+from email.utils import formatdate
+
+import pytest
+
+from ..utils import azure_client
+from ..utils.azure_client import AzureClient
+from ..utils.azure_constants import BYTES_PER_MB
+
+pytestmark = pytest.mark.emulator
+
+# Well known key of the Azure storage emulator account
+ACCOUNT_KEY = (
+    "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZ"
+    "FPTOtr/KBHBeksoGMGw=="
+)
+CONTAINER = "netskope-logs"
+
+
+class FakeBlobHandler(http.server.BaseHTTPRequestHandler):
+    """Blob service endpoint serving the requests made by AzureClient."""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    containers = set()
+    blobs = {}
+    blocks = {}
+    calls = []
+
+    def log_message(self, *args):
+        """To Keep the test output clean."""
+
+    def _send(self, status, headers=None, body=b""):
+        """To Send a response."""
+        self.send_response(status)
+        for key, value in {
+            "x-ms-request-id": "test",
+            "x-ms-version": "2021-08-06",
+            "ETag": '"0x1"',
+            "Last-Modified": formatdate(usegmt=True),
+            "Date": formatdate(usegmt=True),
+            "Content-Length": str(len(body)),
+            **(headers or {}),
+        }.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _parse(self):
+        """To Parse the container, the blob and the query of the request."""
+        url = urllib.parse.urlsplit(self.path)
+        # The path holds the account name, then the container and the blob
+        return (
+            [part for part in url.path.strip("/").split("/", 2)[1:] if part],
+            dict(urllib.parse.parse_qsl(url.query)),
+        )
+
+    def do_HEAD(self):
+        """To Serve the container existence checks."""
+        self.do_GET()
+
+    def do_GET(self):
+        """To Serve the container properties."""
+        parts, query = self._parse()
+        if len(parts) == 1 and query.get("restype") == "container":
+            with self.lock:
+                self.calls.append("get container properties")
+            if parts[0] in self.containers:
+                return self._send(200)
+            return self._send(404, {"x-ms-error-code": "ContainerNotFound"})
+        self._send(404)
+
+    def do_PUT(self):
+        """To Create the containers and store the blobs and blocks."""
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        parts, query = self._parse()
+        comp = query.get("comp", "blob")
+        if query.get("restype") == "container":
+            with self.lock:
+                self.calls.append("create container")
+            if parts[0] in self.containers:
+                return self._send(
+                    409, {"x-ms-error-code": "ContainerAlreadyExists"}
+                )
+            self.containers.add(parts[0])
+            return self._send(201)
+        key = "/".join(parts)
+        with self.lock:
+            self.calls.append("put " + comp)
+            if comp == "block":
+                self.blocks[(key, query["blockid"])] = body
+            elif comp == "blocklist":
+                block_ids = re.findall(
+                    rb"<(?:Latest|Uncommitted|Committed)>([^<]+)<", body
+                )
+                self.blobs[key] = b"".join(
+                    self.blocks.pop((key, block_id.decode()))
+                    for block_id in block_ids
+                )
+            else:
+                self.blobs[key] = body
+        self._send(201)
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """Blob endpoint on a free local port, with empty client caches."""
+    FakeBlobHandler.containers = set()
+    FakeBlobHandler.blobs = {}
+    FakeBlobHandler.blocks = {}
+    FakeBlobHandler.calls = []
+    monkeypatch.setattr(azure_client, "_clients", azure_client.OrderedDict())
+    monkeypatch.setattr(azure_client, "_existing_containers", set())
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), FakeBlobHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def push(endpoint):
+    """Callable pushing a file with a new client, as every push does."""
+    configuration = {
+        "azure_connection_string": (
+            "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+            "AccountKey={};BlobEndpoint=http://127.0.0.1:{}/devstoreaccount1;"
+        ).format(ACCOUNT_KEY, endpoint.server_address[1]),
+        "container_name": CONTAINER,
+        "obj_prefix": "ns",
+        "upload_block_size": 1,
+        "upload_concurrency": 4,
+    }
+
+    def push(file_name, data_type="alerts", subtype="dlp"):
+        AzureClient(configuration, logging.getLogger(__name__), {}).push(
+            file_name, data_type, subtype
+        )
+
+    return push
+
+
+def _blob_names():
+    """To Get the names of the stored blobs."""
+    return [key.split("/", 1)[1] for key in FakeBlobHandler.blobs]
+
+
+def test_push_small_file(push, tmp_path):
+    """A file below the block size is uploaded with a single request."""
+    path = tmp_path / "chunk"
+    path.write_bytes(b'{"alert": 1}\n')
+
+    push(str(path))
+
+    (name,) = _blob_names()
+    assert name.startswith("ns_alerts_dlp_")
+    assert list(FakeBlobHandler.blobs.values()) == [b'{"alert": 1}\n']
+    assert FakeBlobHandler.calls.count("put blob") == 1
+
+
+def test_push_large_file_in_blocks(push, tmp_path):
+    """A file above the block size is staged in blocks and committed."""
+    data = bytes(range(256)) * (3 * BYTES_PER_MB // 256) + b"end"
+    path = tmp_path / "chunk"
+    path.write_bytes(data)
+
+    push(str(path), None, None)
+
+    (name,) = _blob_names()
+    assert name.startswith("ns_webtx_")
+    assert list(FakeBlobHandler.blobs.values()) == [data]
+    assert FakeBlobHandler.calls.count("put block") == 4
+    assert FakeBlobHandler.calls.count("put blocklist") == 1
+    assert "put blob" not in FakeBlobHandler.calls
+
+
+def test_container_created_once(push, tmp_path):
+    """A missing container is created, and checked once per process."""
+    path = tmp_path / "chunk"
+    path.write_bytes(b"data")
+
+    for _ in range(3):
+        push(str(path))
+
+    assert FakeBlobHandler.containers == {CONTAINER}
+    assert len(FakeBlobHandler.blobs) == 3
+    assert FakeBlobHandler.calls.count("get container properties") == 1
+    assert FakeBlobHandler.calls.count("create container") == 1
+
+
+def test_existing_container_not_created(push, tmp_path):
+    """An existing container is used as it is."""
+    FakeBlobHandler.containers.add(CONTAINER)
+    path = tmp_path / "chunk"
+    path.write_bytes(b"data")
+
+    push(str(path))
+
+    assert "create container" not in FakeBlobHandler.calls
+    assert len(FakeBlobHandler.blobs) == 1
@@ -33,12 +33,33 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """Azure Client."""
 
 
+import json
+import os
+import threading
 import time
 import uuid
+from collections import OrderedDict
+from azure.core.exceptions import ResourceExistsError
 from azure.storage.blob import (
     BlobServiceClient,
 )
 
+from .azure_constants import (
+    BYTES_PER_MB,
+    DEFAULT_UPLOAD_BLOCK_SIZE,
+    DEFAULT_UPLOAD_CONCURRENCY,
+    MAX_CACHED_CLIENTS,
+    MAX_CACHED_CONTAINERS,
+)
+from .azure_encoder import get_extension
+
+# BlobServiceClients are thread safe and keep their connection pool, so
+# they are shared across pushes.
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+# Containers already known to exist, keyed by (client key, container name)
+_existing_containers = set()
+
 
 class AzureClient:
     """Azure Sentinel Client Class."""
@@ -48,54 +69,112 @@ class AzureClient:
         self.configuration = configuration
         self.logger = logger
         self.proxy = proxy
+        self.block_size = (
+            int(
+                configuration.get("upload_block_size")
+                or DEFAULT_UPLOAD_BLOCK_SIZE
+            )
+            * BYTES_PER_MB
+        )
+        self.concurrency = int(
+            configuration.get("upload_concurrency")
+            or DEFAULT_UPLOAD_CONCURRENCY
+        )
+
+    def _get_cache_key(self):
+        """Get the key of the cached client of the configuration."""
+        return (
+            self.configuration.get("azure_connection_string"),
+            json.dumps(self.proxy, sort_keys=True) if self.proxy else None,
+            self.block_size,
+        )
+
+    def get_blob_service_client(self):
+        """Get the blob service client, cached per configuration.
+
+        Blobs larger than the block size are uploaded as blocks, staged in
+        parallel and committed with a block list.
+
+        :return: BlobServiceClient object
+        """
+        key = self._get_cache_key()
+        with _clients_lock:
+            blob_service_client = _clients.get(key)
+            if blob_service_client is not None:
+                _clients.move_to_end(key)
+                return blob_service_client
+        blob_service_client = BlobServiceClient.from_connection_string(
+            self.configuration.get("azure_connection_string"),
+            max_block_size=self.block_size,
+            max_single_put_size=self.block_size,
+            proxies=self.proxy,
+        )
+        with _clients_lock:
+            blob_service_client = _clients.setdefault(key, blob_service_client)
+            _clients.move_to_end(key)
+            while len(_clients) > MAX_CACHED_CLIENTS:
+                _clients.popitem(last=False)
+        return blob_service_client
+
+    def get_container_client(self):
+        """Get the container client, creating the container if needed.
+
+        The existence of the container is checked once per process.
+
+        :return: ContainerClient object
+        """
+        container_name = self.configuration.get("container_name")
+        container_client = self.get_blob_service_client().get_container_client(
+            container_name
+        )
+        key = (self._get_cache_key(), container_name)
+        if key in _existing_containers:
+            return container_client
+        if not container_client.exists():
+            try:
+                container_client.create_container()
+                self.logger.info(
+                    "New container created named {} in Azure.".format(
+                        container_name
+                    )
+                )
+            except ResourceExistsError:
+                pass  # Created by another worker in the meantime
+        if len(_existing_containers) >= MAX_CACHED_CONTAINERS:
+            _existing_containers.clear()
+        _existing_containers.add(key)
+        return container_client
 
     def push(self, file_name, data_type, subtype):
-        """Call method of post_data with appropriate parameters.
+        """Upload the given file as a block blob.
 
-        :param data: The data to be ingested
-        :param data_type: The type of the data being ingested (alerts/events)
+        :param file_name: Path of the file to be uploaded
+        :param data_type: The type of the data being ingested (None for webtx)
+        :param subtype: The subtype of the data being ingested
         """
         # Setting a few properties of data being ingested
         cur_time = int(time.time())
         if data_type is None:
             object_name = (
-                f'{self.configuration["obj_prefix"]}_webtx_{cur_time}'
+                f'{self.configuration["obj_prefix"]}_webtx_{cur_time}_{str(uuid.uuid1())}'
             )
         else:
             object_name = f'{self.configuration["obj_prefix"]}_{data_type}_{subtype}_{cur_time}_{str(uuid.uuid1())}'
 
         try:
-            connect_str = self.configuration.get("azure_connection_string")
-
-            # Create the BlobServiceClient object which will be used to create a container client
-            blob_service_client = BlobServiceClient.from_connection_string(
-                connect_str,
-            )
-            container_name = self.configuration.get("container_name")
-            name = []
-            list_container = blob_service_client.list_containers(
-                name_starts_with=None, proxies=self.proxy
-            )
-            for i in list_container:
-                name.append(i["name"])
-
-            if container_name not in name:
-                # Create the container
-                blob_service_client.create_container(container_name, proxies=self.proxy)
-                self.logger.info(
-                    "New container created named {} in Azure.".format(
-                        container_name
-                    )
-                )
-
-            # Create a blob client using the local file name as the name for the blob
-            blob_client = blob_service_client.get_blob_client(
-                container=container_name, blob=object_name
+            object_name += get_extension(file_name)
+            blob_client = self.get_container_client().get_blob_client(
+                object_name
             )
 
             # Upload the created file
             with open(file_name, "rb") as data:
-                blob_client.upload_blob(data, overwrite=True, proxies=self.proxy)
+                blob_client.upload_blob(
+                    data,
+                    length=os.path.getsize(file_name),
+                    overwrite=True,
+                    max_concurrency=self.concurrency,
+                )
 
             self.logger.info(
                 f"Successfully Uploaded to Azure Storage as blob file. {object_name}"
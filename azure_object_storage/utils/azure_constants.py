@@ -0,0 +1,69 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Azure Storage Plugin constants."""
+
+
+import os
+
+
+# Rolling spool of pushed chunks, uploaded once max_file_size/max_duration is hit.
+# It lives in the plugin directory, which CE keeps on its persistent volume,
+# unless the Spool Directory configuration parameter is set.
+SPOOL_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".spool"
+)
+SPOOL_SUFFIX = ".spool"  # Spool still being appended to
+READY_SUFFIX = ".ready"  # Rotated spool waiting to be uploaded
+UPLOADING_SUFFIX = ".uploading"  # Ready spool claimed by a worker uploading it
+SPOOL_CLAIM_TIMEOUT = 3600  # Seconds after which a claim is considered stale
+SPOOL_FLUSH_INTERVAL = 10  # Seconds between two background flushes of the spools
+SPOOL_LOCK_FILE = ".lock"
+DEFAULT_MAX_SPOOL_SIZE = 1024  # MBs of spooled data above which pushes fail
+BYTES_PER_MB = 1024 * 1024
+
+# Compression of the stored data
+COMPRESSION_NONE = "none"  # Data is stored as it is received
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+COMPRESSION_LEVELS = {COMPRESSION_GZIP: (1, 9), COMPRESSION_ZSTD: (1, 22)}
+DEFAULT_COMPRESSION_LEVEL = 6
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Cached clients and parallel block uploads
+MAX_CACHED_CLIENTS = 16
+MAX_CACHED_CONTAINERS = 256
+DEFAULT_UPLOAD_BLOCK_SIZE = 4  # In MBs
+DEFAULT_UPLOAD_CONCURRENCY = 4  # Blocks staged in parallel
+MAX_UPLOAD_BLOCK_SIZE = 100  # In MBs
+MAX_UPLOAD_CONCURRENCY = 16
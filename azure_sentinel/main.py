@@ -46,13 +46,14 @@ from .utils.sentinel_validator import (
 )
 from .utils.sentinel_constants import (
     attribute_dtype_map,
+    MAX_FIELD_SIZE,
+    FIELD_CACHE_SIZE,
 )
 from .utils.sentinel_exception import (
     MaxRetriesExceededError,
 )
 from .utils.sentinel_helper import (
     get_sentinel_mappings,
-    map_sentinel_data,
     conversion_map,
 )
 
@@ -60,6 +61,10 @@ from .utils.sentinel_helper import (
 class AzureSentinelPlugin(PluginBase):
     """The Netskope CLS plugin implementation class."""
 
+    # Field name -> (normalized field name, data type converter or None).
+    # Shared across records and chunks, as the fields hardly ever change.
+    _field_cache = {}
+
     @staticmethod
     def get_subtype_mapping(mappings, subtype):
         """Retrieve subtype mappings (mappings for subtypes of alerts/events) case insensitively.
@@ -85,17 +90,31 @@ class AzureSentinelPlugin(PluginBase):
         # be represented. For example chinese characters.
         return len(string.encode("utf-8"))
 
-    def _convert_dtype(self, key, value):
-        """Convert the data type of given value to string.
+    def _get_field_normalization(self, key):
+        """Get the normalized name and data type converter of the given field.
 
         :param key: The attribute name from the Netskope response
-        :param value: The value of the given attribute whose data type is to be converted to string
-        :return: value in form of String
+        :return: Tuple of the normalized key and the function converting the value to string, if it has to be
         """
-        if key in attribute_dtype_map:
-            return conversion_map[attribute_dtype_map[key]](value)
+        try:
+            return self._field_cache[key]
+        except KeyError:
+            pass
+
+        # Convert the key to lowercase and check if it contains characters other than alphanumeric and underscores
+        normalized_key = self._normalize_key(str(key).lower(), {})
+
+        # The data types of ID and timestamps are converted to corresponding strings
+        converter = (
+            conversion_map[attribute_dtype_map[key]]
+            if key in attribute_dtype_map
+            else None
+        )
 
-        return value
+        if len(self._field_cache) >= FIELD_CACHE_SIZE:
+            self._field_cache.clear()
+        self._field_cache[key] = (normalized_key, converter)
+        return normalized_key, converter
 
     def _normalize_key(self, key, transform_map):
         """Normalize the given key by removing any special characters.
@@ -154,56 +173,74 @@ class AzureSentinelPlugin(PluginBase):
             )
             raise
 
-        transformed_data = []
-        for data in raw_data:
-            transform_map = {}
-            try:
-                # First apply the filters based on the given mapping file
-                subtype_mappings = self.get_subtype_mapping(mappings, subtype)
+        try:
+            subtype_mappings = self.get_subtype_mapping(mappings, subtype)
 
-                # If subtype mappings are provided, use only those fields, otherwise map all the fields
-                if subtype_mappings:
-                    data = map_sentinel_data(
-                        subtype_mappings, data, self.logger, data_type, subtype
+            # If subtype mappings are provided, use only those fields, otherwise map all the fields
+            fields = (
+                list(dict.fromkeys(subtype_mappings))
+                if subtype_mappings
+                else None
+            )
+        except Exception as err:
+            for data in raw_data:
+                self.logger.error(
+                    "Could not transform data \n{}.\n Error:{}".format(
+                        data, err
                     )
+                )
+            return []
+
+        # Any string of up to this many characters fits in the field size limit, even when fully made of 4 byte
+        # UTF-8 characters
+        max_field_chars = MAX_FIELD_SIZE * 1000 // 4
 
+        transformed_data = []
+        for data in raw_data:
+            try:
                 """
-                Now we have filtered record as per the mapping file, so we can proceed with transformation and data
-                normalization (like replacing characters other than letters, numbers and underscores etc.)
+                Filter the record as per the mapping file and, in the same pass, proceed with transformation and
+                data normalization (like replacing characters other than letters, numbers and underscores etc.)
 
-                First convert all the keys to lowercase, and all the keys should only contain letters, numbers and
+                All the keys are converted to lowercase, and should only contain letters, numbers and
                 underscores(_).
                 """
                 transformed_record = {"tenant_name": self.source}
-                for key, value in data.items():
+                for key in data if fields is None else fields:
+                    if key not in data:
+                        continue
+                    value = data[key]
 
                     # Check whether the value exceeds the size limit of each field (32KB). Reference:
                     # https://docs.microsoft.com/en-us/azure/azure-monitor/platform/data-collector-api#data-limits
-                    val_size = self._utf8len(str(value)) / 1000
-
-                    # Skip the field and issue a log
-                    if val_size > 32:
-                        self.logger.warn(
-                            'The size of the value for the key "{}" is {}KB which exceeds the maximum '
-                            "threshold allowed of 32KB. Field will be skipped.".format(
-                                key, val_size
+                    # Only the values which may exceed it are encoded.
+                    if not (
+                        isinstance(value, str) and len(value) <= max_field_chars
+                    ) and not isinstance(value, (int, float, type(None))):
+                        val_size = self._utf8len(str(value)) / 1000
+
+                        # Skip the field and issue a log
+                        if val_size > MAX_FIELD_SIZE:
+                            self.logger.warn(
+                                'The size of the value for the key "{}" is {}KB which exceeds the maximum '
+                                "threshold allowed of 32KB. Field will be skipped.".format(
+                                    key, val_size
+                                )
                             )
-                        )
-                        continue
-
-                    # Before normalization, first convert the data types of ID and timestamps to corresponding strings
-                    value = self._convert_dtype(key, value)
+                            continue
 
-                    # Convert the key to lowercase
-                    key = str(key).lower()
-
-                    # Now check if it contains characters other than alphanumeric and underscores
-                    key = self._normalize_key(key, transform_map)
+                    normalized_key, converter = self._get_field_normalization(
+                        key
+                    )
+                    if converter is not None:
+                        value = converter(value)
 
-                    transformed_record[key] = value
+                    transformed_record[normalized_key] = value
 
                 transformed_data.append(transformed_record)
             except Exception as err:
+                if fields is not None:
+                    data = {key: data[key] for key in fields if key in data}
                 self.logger.error(
                     "Could not transform data \n{}.\n Error:{}".format(
                         data, err
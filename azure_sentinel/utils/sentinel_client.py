@@ -40,6 +40,10 @@ import datetime
 import hashlib
 import hmac
 import base64
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 from netskope.common.utils import add_user_agent
 from enum import Enum
 from binascii import Error
@@ -54,8 +58,18 @@ from .sentinel_constants import (
     API_BASE_URL,
     MAX_RETRIES,
     RETRY_SLEEP_TIME,
+    RETRY_BACKOFF,
+    MAX_PAYLOAD_SIZE,
+    POST_CONCURRENCY,
+    REQUEST_TIMEOUT,
+    MAX_CACHED_SESSIONS,
 )
 
+# HTTP sessions are shared by every instance of the plugin in this process,
+# so that the connections to the workspaces are kept alive across pushes.
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
 
 class DataTypes(Enum):
     """Data Type Class."""
@@ -81,6 +95,82 @@ class AzureSentinelClient:
         else:
             self.verify_ssl = False
 
+        self._signing_key = None
+        self._signing_hmac = None
+
+    def _get_session(self, workspace_id):
+        """Get the keep-alive HTTP session of the given workspace.
+
+        :param workspace_id: The ID of workspace to which the data is to be ingested
+        :return: requests.Session shared across pushes
+        """
+        key = (
+            workspace_id,
+            self.verify_ssl,
+            tuple(sorted((self.proxy or {}).items())),
+        )
+        evicted = []
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is not None:
+                _sessions.move_to_end(key)
+                return session
+            session = requests.Session()
+            session.mount(
+                "https://",
+                HTTPAdapter(pool_connections=1, pool_maxsize=POST_CONCURRENCY),
+            )
+            session.verify = self.verify_ssl
+            session.proxies.update(self.proxy or {})
+            _sessions[key] = session
+            while len(_sessions) > MAX_CACHED_SESSIONS:
+                evicted.append(_sessions.popitem(last=False)[1])
+
+        for evicted_session in evicted:
+            evicted_session.close()
+        return session
+
+    def _get_retry_delay(self, retry_count, response):
+        """Get the seconds to wait before retrying a post.
+
+        :param retry_count: Number of the post attempt which failed, starting at 1
+        :param response: The response of the failed post
+        :return: Retry-After of the response if any, else an exponential backoff
+        """
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(int(retry_after), RETRY_SLEEP_TIME)
+        return min(RETRY_BACKOFF * 2 ** (retry_count - 1), RETRY_SLEEP_TIME)
+
+    def _iter_batches(self, data):
+        """Encode the given records into JSON arrays of at most MAX_PAYLOAD_SIZE bytes.
+
+        :param data: The records to be ingested
+        :return: Generator of UTF-8 encoded JSON arrays
+        """
+        batch = []
+        batch_size = 2  # enclosing brackets
+        for record in data:
+            encoded = json.dumps(record).encode("utf-8")
+            if len(encoded) + 2 > MAX_PAYLOAD_SIZE:
+                self.logger.error(
+                    "Record of {} bytes exceeds the max post size of {} bytes. "
+                    "The record will be skipped.".format(
+                        len(encoded), MAX_PAYLOAD_SIZE
+                    )
+                )
+                continue
+            size = len(encoded) + (2 if batch else 0)  # ", " separator
+            if batch and batch_size + size > MAX_PAYLOAD_SIZE:
+                yield b"[" + b", ".join(batch) + b"]"
+                batch = []
+                batch_size = 2
+                size = len(encoded)
+            batch.append(encoded)
+            batch_size += size
+        if batch:
+            yield b"[" + b", ".join(batch) + b"]"
+
     def _build_signature(
         self, workspace_id, primary_key, date, content_length
     ):
@@ -106,12 +196,15 @@ class AzureSentinelClient:
                 + RESOURCE
             )
             bytes_to_hash = bytes(string_to_hash, encoding="utf-8")
-            decoded_key = base64.b64decode(primary_key)
-            encoded_hash = base64.b64encode(
-                hmac.new(
-                    decoded_key, bytes_to_hash, digestmod=hashlib.sha256
-                ).digest()
-            ).decode()
+            if primary_key != self._signing_key:
+                # Decode the key once and reuse it for every batch
+                self._signing_hmac = hmac.new(
+                    base64.b64decode(primary_key), digestmod=hashlib.sha256
+                )
+                self._signing_key = primary_key
+            signing_hmac = self._signing_hmac.copy()
+            signing_hmac.update(bytes_to_hash)
+            encoded_hash = base64.b64encode(signing_hmac.digest()).decode()
             authorization = "SharedKey {}:{}".format(
                 workspace_id, encoded_hash
             )
@@ -182,31 +275,30 @@ class AzureSentinelClient:
         :param log_type: The name of the log type in which the given data is to be ingested
         :raises MaxRetriesExceededError: When data ingestion fails even after max. number of retries
         """
-        rfc1123date = datetime.datetime.utcnow().strftime(
-            "%a, %d %b %Y %H:%M:%S GMT"
-        )
-        content_length = len(body)
-        signature = self._build_signature(
-            workspace_id, shared_key, rfc1123date, content_length
-        )
         uri = API_BASE_URL.format(workspace_id, RESOURCE)
-
-        headers = {
-            "content-type": CONTENT_TYPE,
-            "Authorization": signature,
-            "Log-Type": log_type,
-            "x-ms-date": rfc1123date,
-        }
+        session = self._get_session(workspace_id)
 
         retry, retry_count = True, 1
         try:
             while retry_count <= MAX_RETRIES:
-                response = requests.post(
+                # The signature covers the date, so it is built for every attempt
+                rfc1123date = datetime.datetime.utcnow().strftime(
+                    "%a, %d %b %Y %H:%M:%S GMT"
+                )
+                signature = self._build_signature(
+                    workspace_id, shared_key, rfc1123date, len(body)
+                )
+                headers = {
+                    "content-type": CONTENT_TYPE,
+                    "Authorization": signature,
+                    "Log-Type": log_type,
+                    "x-ms-date": rfc1123date,
+                }
+                response = session.post(
                     uri,
                     data=body,
                     headers=add_user_agent(headers),
-                    proxies=self.proxy,
-                    verify=self.verify_ssl,
+                    timeout=REQUEST_TIMEOUT,
                 )
                 status_code = response.status_code
                 response_body = response.text
@@ -220,13 +312,14 @@ class AzureSentinelClient:
                     )
                     return
 
+                retry_delay = self._get_retry_delay(retry_count, response)
                 self.logger.error(
                     "Could not ingest data into Azure Sentinel. Retrying in {} seconds. "
                     "Status Code: {}. Response: {}".format(
-                        RETRY_SLEEP_TIME, status_code, response_body
+                        retry_delay, status_code, response_body
                     )
                 )
-                time.sleep(RETRY_SLEEP_TIME)
+                time.sleep(retry_delay)
                 retry_count += 1
 
         except requests.exceptions.HTTPError as err:
@@ -265,14 +358,38 @@ class AzureSentinelClient:
         self.data_length = len(data)
         self.data_type = data_type
 
-        try:
-            self._post_data(
-                self.configuration.get("workspace_id"),
-                self.configuration.get("primary_key"),
-                json.dumps(data),
-                self.configuration.get("alerts_log_type_name")
-                if data_type == DataTypes.ALERT.value
-                else self.configuration.get("events_log_type_name"),
-            )
-        except MaxRetriesExceededError as err:
-            raise err
+        workspace_id = self.configuration.get("workspace_id")
+        shared_key = self.configuration.get("primary_key")
+        log_type = (
+            self.configuration.get("alerts_log_type_name")
+            if data_type == DataTypes.ALERT.value
+            else self.configuration.get("events_log_type_name")
+        )
+
+        # Post the batches in parallel, stopping at the first failed one. The
+        # batches posted before the failure are posted again when CE retries
+        # the push, so delivery is at least once.
+        errors = []
+
+        def collect(done):
+            for future in done:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+
+        with ThreadPoolExecutor(max_workers=POST_CONCURRENCY) as executor:
+            pending = set()
+            for body in self._iter_batches(data):
+                if len(pending) >= POST_CONCURRENCY:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                if errors:
+                    break
+                pending.add(
+                    executor.submit(
+                        self._post_data, workspace_id, shared_key, body, log_type
+                    )
+                )
+            collect(wait(pending)[0])
+
+        if errors:
+            raise errors[0]
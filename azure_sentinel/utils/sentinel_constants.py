@@ -39,6 +39,22 @@ RESOURCE = "/api/logs"
 API_BASE_URL = "https://{}.ods.opinsights.azure.com{}?api-version=2016-04-01"
 MAX_RETRIES = 3
 RETRY_SLEEP_TIME = 60
+# Seconds to wait before the first retry, doubled for each next retry up to
+# RETRY_SLEEP_TIME, unless the response tells how long to wait
+RETRY_BACKOFF = 5
+# Max size in bytes of a single post. The Data Collector API allows 30 MB.
+MAX_PAYLOAD_SIZE = 30 * 1000 * 1000
+# Max posts in flight at the same time
+POST_CONCURRENCY = 4
+# Seconds to wait for a response of a post
+REQUEST_TIMEOUT = 120
+# Max HTTP sessions kept alive, one per workspace
+MAX_CACHED_SESSIONS = 16
+# Max size in KB of the value of a single field. Reference:
+# https://docs.microsoft.com/en-us/azure/azure-monitor/platform/data-collector-api#data-limits
+MAX_FIELD_SIZE = 32
+# Max fields whose normalized name and data type converter are cached
+FIELD_CACHE_SIZE = 4096
 attribute_dtype_map = {
     "dlp_incident_id": "string",
     "app_session_id": "string",
@@ -0,0 +1,98 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Benchmark of CEF event generation throughput.
+
+Times get_cef_event() of the syslog CEF generator on a 7-field event, which
+covers the syslog timestamp and hostname prefix of every event.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_cef_event.py [--repo PATH] [--events N]
+"""
+
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+import time
+
+from bench_cef_generator_cache import REPO_ROOT, get_default_extensions
+
+HEADERS = {
+    "Device Vendor": "Netskope",
+    "Device Product": "CE",
+    "Device Version": "1",
+    "Device Event Class ID": "DLP",
+    "Name": "name",
+    "Severity": "high",
+}
+EXTENSIONS = {
+    "suser": "bob@example.com",
+    "src": "10.0.0.1",
+    "cs1": "value one",
+    "request": "http://example.com/b?c=d",
+    "act": "allow",
+    "cn1": 5,
+    "msg": "some message text",
+}
+
+
+def main():
+    """To Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", default=REPO_ROOT)
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.repo))
+    module = importlib.import_module("syslog.utils.syslog_cef_generator")
+    generator = module.CEFGenerator(
+        get_default_extensions(args.repo),
+        "|",
+        "0",
+        logging.getLogger(__name__),
+    )
+
+    start = time.perf_counter()
+    for _ in range(args.events):
+        generator.get_cef_event(
+            dict(HEADERS), EXTENSIONS, "alerts", "dlp"
+        )
+    elapsed = time.perf_counter() - start
+    print("get_cef_event: {:.0f} events/sec".format(args.events / elapsed))
+
+
+if __name__ == "__main__":
+    main()
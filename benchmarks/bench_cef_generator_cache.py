@@ -0,0 +1,100 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Benchmark of building a CEF generator against fetching a cached one.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_cef_generator_cache.py [--repo PATH]
+
+--repo points at another checkout of this repository, e.g. one from
+before the cache, to compare with. Only the build time is reported for
+trees without get_cef_generator().
+"""
+
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_default_extensions(repo, plugin="syslog"):
+    """To Read the default valid_extensions CSV of given plugin."""
+    with open(os.path.join(repo, plugin, "manifest.json")) as manifest:
+        configuration = json.load(manifest)["configuration"]
+    return next(
+        field["default"]
+        for field in configuration
+        if field["key"] == "valid_extensions"
+    )
+
+
+def main():
+    """To Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", default=REPO_ROOT)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.repo))
+    module = importlib.import_module("syslog.utils.syslog_cef_generator")
+    extensions = get_default_extensions(args.repo)
+    logger = logging.getLogger(__name__)
+
+    build = timeit.timeit(
+        lambda: module.CEFGenerator(extensions, "|", "0", logger),
+        number=args.number,
+    )
+    print(
+        "build CEFGenerator: {:.2f} ms".format(build / args.number * 1000)
+    )
+    if hasattr(module, "get_cef_generator"):
+        module.get_cef_generator(extensions, "|", "0", logger)
+        hit = timeit.timeit(
+            lambda: module.get_cef_generator(extensions, "|", "0", logger),
+            number=args.number * 100,
+        )
+        print(
+            "get_cef_generator cache hit: {:.1f} us".format(
+                hit / (args.number * 100) * 1000000
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
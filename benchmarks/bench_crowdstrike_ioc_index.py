@@ -0,0 +1,178 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Benchmark of the duplicate check of the CrowdStrike plugin push.
+
+Indexes 100k existing IOCs (md5, sha256 and domain, in pages of 2000) with
+get_ioc_ids(), then runs prepare_payload() over 50k incoming indicators of
+which about half already exist. The CrowdStrike API calls are stubbed.
+
+The plugin imports the Netskope CE core, so the netskope package has to be
+importable, e.g. by running the script inside the Cloud Exchange container.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_crowdstrike_ioc_index.py [--repo PATH]
+        [--existing N] [--incoming N]
+"""
+
+
+import argparse
+import hashlib
+import importlib
+import logging
+import os
+import random
+import sys
+import time
+from unittest import mock
+
+from bench_cef_generator_cache import REPO_ROOT
+
+# IOCs returned per page of the indicator query endpoint
+PAGE_SIZE = 2000
+
+
+class StubResponse(object):
+    """Response of the stubbed indicator query endpoint."""
+
+    status_code = 200
+
+    def __init__(self, body):
+        """Init method."""
+        self.body = body
+
+    def json(self):
+        """To Get the JSON body."""
+        return self.body
+
+
+def get_hash(index, algorithm):
+    """To Get a distinct hash value for given index."""
+    return hashlib.new(algorithm, str(index).encode()).hexdigest()
+
+
+def build_existing(count):
+    """To Build the IOCs already on the CrowdStrike tenant."""
+    iocs = []
+    for index in range(count):
+        kind = index % 3
+        if kind == 0:
+            iocs.append({"type": "md5", "value": get_hash(index, "md5")})
+        elif kind == 1:
+            iocs.append({"type": "sha256", "value": get_hash(index, "sha256")})
+        else:
+            iocs.append(
+                {"type": "domain", "value": "host{}.example.com".format(index)}
+            )
+    return iocs
+
+
+def build_incoming(models, count, existing):
+    """To Build the incoming indicators, about half of them existing."""
+    generator = random.Random(5)
+    indicators = []
+    for position in range(count):
+        index = generator.randrange(2 * existing)
+        kind = index % 3
+        if kind == 0:
+            ioc_type, value = models.IndicatorType.MD5, get_hash(index, "md5")
+        elif kind == 1:
+            ioc_type = models.IndicatorType.SHA256
+            value = get_hash(index, "sha256")
+        else:
+            ioc_type = models.IndicatorType.URL
+            value = "https://host{}.example.com/p/{}".format(index, position)
+        indicators.append(models.Indicator(value=value, type=ioc_type))
+    return indicators
+
+
+def main():
+    """To Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", default=REPO_ROOT)
+    parser.add_argument("--existing", type=int, default=100000)
+    parser.add_argument("--incoming", type=int, default=50000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.repo))
+    module = importlib.import_module("crowdstrike.main")
+    models = importlib.import_module("netskope.integrations.cte.models")
+
+    existing = build_existing(args.existing)
+    incoming = build_incoming(models, args.incoming, args.existing)
+    # The last page is empty, as the endpoint answers past the end
+    pages = [
+        existing[start:start + PAGE_SIZE]
+        for start in range(0, len(existing), PAGE_SIZE)
+    ]
+    pages = iter(pages + [[]])
+
+    def get(*args, **kwargs):
+        return StubResponse(
+            {
+                "meta": {
+                    "pagination": {"after": "next", "total": len(existing)}
+                },
+                "resources": next(pages),
+            }
+        )
+
+    # Build the plugin without the CE core, the duplicate check only needs
+    # the configuration and the loggers
+    plugin = module.CrowdStrikePlugin.__new__(module.CrowdStrikePlugin)
+    plugin.configuration = {"base_url": "http://127.0.0.1"}
+    plugin.logger = plugin.notifier = logging.getLogger(__name__)
+    plugin.ssl_validation = True
+    plugin.proxy = {}
+    plugin.reload_auth_token = lambda headers: headers
+    plugin.handle_error = lambda response: response.json()
+
+    with mock.patch.object(module.requests, "get", get):
+        start = time.perf_counter()
+        ioc_ids = plugin.get_ioc_ids("Both", {})
+        index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    payload = plugin.prepare_payload(ioc_ids, incoming, {"action": "detect"})
+    payload_time = time.perf_counter() - start
+
+    print("get_ioc_ids: {:.2f} s".format(index_time))
+    print(
+        "prepare_payload: {:.2f} s, {} IOCs in the payload".format(
+            payload_time, len(payload)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
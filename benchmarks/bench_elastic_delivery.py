@@ -0,0 +1,253 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Benchmark of the Elastic plugin push over TCP and the _bulk API.
+
+Pushes chunks of ECS-like documents of about 1 KiB to a local TCP sink and
+to a fake Elasticsearch answering every _bulk request with success, and
+reports the documents delivered per second. The _bulk mode is skipped for
+checkouts of the repository without it.
+
+The plugin imports the Netskope CE core, so the netskope package has to be
+importable, e.g. by running the script inside the Cloud Exchange container.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_elastic_delivery.py [--repo PATH]
+        [--chunks N] [--documents N]
+"""
+
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_cef_generator_cache import REPO_ROOT
+
+# Seconds to wait for the sink to receive the pushed documents
+DRAIN_TIMEOUT = 10
+
+
+class Counter(object):
+    """Count of the documents received, shared with the server threads."""
+
+    def __init__(self):
+        """Init method."""
+        self.value = 0
+        self.received_at = time.perf_counter()
+        self.condition = threading.Condition()
+
+    def add(self, count):
+        """To Add given count."""
+        with self.condition:
+            self.value += count
+            self.received_at = time.perf_counter()
+            self.condition.notify_all()
+
+    def wait_for(self, count):
+        """To Wait until given count is reached, or the timeout."""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.value >= count, DRAIN_TIMEOUT
+            )
+            return self.value
+
+
+def start_sink(counter):
+    """To Start a TCP server counting the JSON lines it receives.
+
+    Returns:
+        Port the server listens on
+    """
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(4)
+
+    def serve():
+        while True:
+            connection, _ = server.accept()
+            threading.Thread(
+                target=drain, args=(connection,), daemon=True
+            ).start()
+
+    def drain(connection):
+        # A connection closed after a document without a trailing new line
+        # still delivered it
+        last = b"\n"
+        with connection:
+            while True:
+                data = connection.recv(1 << 20)
+                if not data:
+                    break
+                counter.add(data.count(b"\n"))
+                last = data[-1:]
+        if last != b"\n":
+            counter.add(1)
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def start_fake_elasticsearch(counter):
+    """To Start a fake Elasticsearch accepting every _bulk request.
+
+    Returns:
+        Port the server listens on
+    """
+
+    class FakeElasticsearch(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            # Every document follows an action line
+            count = body.count(b"\n") // 2
+            data = json.dumps(
+                {
+                    "errors": False,
+                    "items": [{"create": {"status": 201}}] * count,
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            counter.add(count)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeElasticsearch)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def build_documents(count):
+    """To Build ECS-like documents of about 1 KiB."""
+    return [
+        {
+            "@timestamp": "2024-01-01T00:00:{:02d}Z".format(index % 60),
+            "event": {
+                "kind": "alert",
+                "category": "network",
+                "id": "f3c1a2b4{:024x}".format(index),
+            },
+            "source": {
+                "ip": "10.0.{}.{}".format(index // 256 % 256, index % 256),
+                "port": 443,
+            },
+            "destination": {"domain": "host{}.example.com".format(index)},
+            "user": {"email": "user{}@example.com".format(index % 500)},
+            "url": {
+                "original": "https://host{}.example.com/".format(index)
+                + "path/" * 60
+            },
+            "rule": {"name": "DLP rule {}".format(index % 20)},
+            "message": "x" * 300,
+        }
+        for index in range(count)
+    ]
+
+
+def run(plugin, chunks, counter):
+    """To Push every chunk and wait for the documents to be received.
+
+    Returns:
+        Documents delivered and seconds elapsed until the last of them was
+        received
+    """
+    received = counter.value
+    pushed = sum(len(chunk) for chunk in chunks)
+    start = time.perf_counter()
+    for chunk in chunks:
+        plugin.push(chunk, "alerts", "dlp")
+    delivered = counter.wait_for(received + pushed) - received
+    return delivered, counter.received_at - start
+
+
+def main():
+    """To Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", default=REPO_ROOT)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=1000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.repo))
+    module = importlib.import_module("elastic.main")
+    client_module = importlib.import_module("elastic.utils.elastic_client")
+
+    documents = build_documents(args.documents)
+    chunks = [documents] * args.chunks
+    total = args.chunks * args.documents
+
+    modes = [("TCP", start_sink)]
+    if hasattr(client_module, "ElasticBulkClient"):
+        modes.append(("HTTP", start_fake_elasticsearch))
+
+    for mode, start_server in modes:
+        counter = Counter()
+        # Build the plugin without the CE core, push only needs the
+        # configuration and the logger
+        plugin = module.ElasticPlugin.__new__(module.ElasticPlugin)
+        plugin.configuration = {
+            "delivery_mode": mode,
+            "server_address": "127.0.0.1",
+            "server_port": start_server(counter),
+            "index_name": "netskope",
+        }
+        plugin.logger = logging.getLogger(__name__)
+        plugin.proxy = {}
+        plugin.ssl_validation = True
+        run(plugin, [documents[:10]], counter)
+
+        delivered, elapsed = run(plugin, chunks, counter)
+        print(
+            "{} push: {:.0f} docs/sec, {} of {} documents delivered".format(
+                "TCP" if mode == "TCP" else "_bulk",
+                delivered / elapsed,
+                delivered,
+                total,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Benchmark of the nesting of the ECS and UDM events.
+
+Times json_converter() of the Elastic ECS generator and of the Chronicle
+UDM generator on a realistic 80-field alert: 6 header fields and 74 dotted
+fields up to 4 levels deep.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_event_nesting.py [--repo PATH] [--events N]
+"""
+
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+import time
+
+from bench_cef_generator_cache import REPO_ROOT, get_default_extensions
+
+# Plugin, generator module and class of each generator benchmarked
+GENERATORS = [
+    ("elastic", "elastic_ecs_generator", "ECSGenerator"),
+    ("chronicle_cls", "chronicle_udm_generator", "UDMGenerator"),
+]
+
+HEADERS = {
+    "metadata.event_timestamp": "2021-06-01T10:00:00Z",
+    "metadata.product_name": "Netskope Alert",
+    "metadata.product_version": "1.0",
+    "metadata.product_event_type": "dlp",
+    "metadata.event_type": "GENERIC_EVENT",
+    "security_result.severity": "HIGH",
+}
+FIELDS = (
+    [
+        "@timestamp",
+        "event.id",
+        "event.kind",
+        "event.category",
+        "event.action",
+        "event.outcome",
+        "event.severity",
+    ]
+    + [
+        "{}.{}".format(group, field)
+        for group in ["source", "destination"]
+        for field in [
+            "ip",
+            "port",
+            "domain",
+            "address",
+            "geo.country_name",
+            "geo.region_name",
+            "geo.city_name",
+            "geo.postal_code",
+            "geo.location.lat",
+            "geo.location.lon",
+            "geo.country_iso_code",
+            "user.name",
+        ]
+    ]
+    + [
+        "user." + field
+        for field in ["name", "email", "id", "domain", "roles", "full_name"]
+    ]
+    + [
+        "file." + field
+        for field in [
+            "name",
+            "path",
+            "size",
+            "mime_type",
+            "hash.md5",
+            "hash.sha1",
+            "hash.sha256",
+            "extension",
+        ]
+    ]
+    + [
+        "user_agent." + field
+        for field in [
+            "name",
+            "original",
+            "version",
+            "os.name",
+            "os.version",
+            "device.name",
+        ]
+    ]
+    + [
+        "cloud." + field
+        for field in [
+            "account.id",
+            "account.name",
+            "region",
+            "service.name",
+            "provider",
+        ]
+    ]
+    + [
+        "threat.indicator." + field
+        for field in [
+            "type",
+            "file.hash.md5",
+            "file.hash.sha1",
+            "file.hash.sha256",
+        ]
+    ]
+    + [
+        "netskope." + field
+        for field in [
+            "justification_type",
+            "justification_reason",
+            "policy",
+            "app",
+            "category",
+            "ccl",
+            "site",
+            "instance_id",
+            "access_method",
+            "traffic_type",
+            "alert_name",
+        ]
+    ]
+    + ["host.hostname", "host.os.name", "rule.id"]
+)
+EXTENSIONS = {
+    field: "value-{}".format(index) for index, field in enumerate(FIELDS)
+}
+
+
+def main():
+    """To Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", default=REPO_ROOT)
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.repo))
+    print("fields: {}".format(len(HEADERS) + len(EXTENSIONS)))
+    for plugin, module_name, class_name in GENERATORS:
+        module = importlib.import_module(
+            "{}.utils.{}".format(plugin, module_name)
+        )
+        generator = getattr(module, class_name)(
+            get_default_extensions(args.repo, plugin),
+            "1.0",
+            logging.getLogger(__name__),
+        )
+        start = time.perf_counter()
+        for _ in range(args.events):
+            generator.json_converter(HEADERS, EXTENSIONS)
+        elapsed = time.perf_counter() - start
+        print(
+            "{}.json_converter: {:.0f} events/sec".format(
+                class_name, args.events / elapsed
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Benchmark of the Azure Blob and Google Cloud Storage CLS clients.
+
+Times small pushes, each through a new client as the plugins create one per
+push, and a 12 MiB push uploaded in blocks or chunks of 1 MB.
+
+azure: runs against a minimal in-process Blob endpoint, which counts the
+requests and checks the uploaded object round-trips.
+
+gcs: runs against gcp-storage-emulator with a local OAuth token endpoint,
+so the gcp-storage-emulator and cryptography packages are needed.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_object_storage_clients.py {azure,gcs}
+        [--repo PATH] [--pushes N]
+"""
+
+
+import argparse
+import http.server
+import importlib
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from email.utils import formatdate
+
+from bench_cef_generator_cache import REPO_ROOT
+
+# Well known key of the Azure storage emulator account
+AZURE_ACCOUNT_KEY = (
+    "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZ"
+    "FPTOtr/KBHBeksoGMGw=="
+)
+GCS_EMULATOR_PORT = 9023
+BUCKET_NAME = "benchmark"
+SMALL_OBJECT_SIZE = 2000
+LARGE_OBJECT_SIZE = 12 * 1024 * 1024 + 5
+
+
+class FakeBlobHandler(http.server.BaseHTTPRequestHandler):
+    """Blob service endpoint serving the requests made by AzureClient."""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    containers = set()
+    blobs = {}
+    blocks = {}
+    calls = {}
+
+    def log_message(self, *args):
+        """To Keep the requests off the output."""
+
+    def _send(self, status, headers=None, body=b""):
+        self.send_response(status)
+        for key, value in {
+            "x-ms-request-id": "benchmark",
+            "x-ms-version": "2021-08-06",
+            "ETag": '"0x1"',
+            "Last-Modified": formatdate(usegmt=True),
+            "Date": formatdate(usegmt=True),
+            "Content-Length": str(len(body)),
+            **(headers or {}),
+        }.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, operation):
+        with self.lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def _parse(self):
+        url = urllib.parse.urlsplit(self.path)
+        # The path holds the account name, then the container and the blob
+        return (
+            [part for part in url.path.strip("/").split("/", 2)[1:] if part],
+            dict(urllib.parse.parse_qsl(url.query)),
+        )
+
+    def do_HEAD(self):
+        """To Serve the container existence checks."""
+        self.do_GET()
+
+    def do_GET(self):
+        """To Serve the container listings and properties."""
+        parts, query = self._parse()
+        if not parts:
+            self._count("list containers")
+            containers = "".join(
+                "<Container><Name>{}</Name><Properties><Last-Modified>{}"
+                "</Last-Modified><Etag>0x1</Etag></Properties>"
+                "</Container>".format(name, formatdate(usegmt=True))
+                for name in sorted(self.containers)
+            )
+            return self._send(
+                200,
+                {"Content-Type": "application/xml"},
+                (
+                    '<?xml version="1.0" encoding="utf-8"?>'
+                    '<EnumerationResults ServiceEndpoint="http://127.0.0.1/">'
+                    "<Containers>{}</Containers><NextMarker />"
+                    "</EnumerationResults>".format(containers)
+                ).encode(),
+            )
+        if len(parts) == 1 and query.get("restype") == "container":
+            self._count("get container properties")
+            if parts[0] in self.containers:
+                return self._send(200)
+            return self._send(
+                404, {"x-ms-error-code": "ContainerNotFound"}
+            )
+        self._send(404)
+
+    def do_PUT(self):
+        """To Create the containers and store the blobs and blocks."""
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        parts, query = self._parse()
+        comp = query.get("comp", "blob")
+        if query.get("restype") == "container":
+            self._count("create container")
+            if parts[0] in self.containers:
+                return self._send(
+                    409, {"x-ms-error-code": "ContainerAlreadyExists"}
+                )
+            self.containers.add(parts[0])
+            return self._send(201)
+        self._count("put " + comp)
+        key = "/".join(parts)
+        with self.lock:
+            if comp == "block":
+                self.blocks[(key, query["blockid"])] = body
+            elif comp == "blocklist":
+                block_ids = re.findall(
+                    rb"<(?:Latest|Uncommitted|Committed)>([^<]+)<", body
+                )
+                self.blobs[key] = b"".join(
+                    self.blocks.pop((key, block_id.decode()))
+                    for block_id in block_ids
+                )
+            else:
+                self.blobs[key] = body
+        self._send(201)
+
+
+class TokenHandler(http.server.BaseHTTPRequestHandler):
+    """OAuth token endpoint counting the token requests."""
+
+    requests = 0
+
+    def log_message(self, *args):
+        """To Keep the requests off the output."""
+
+    def do_POST(self):
+        """To Grant an access token."""
+        TokenHandler.requests += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps(
+            {
+                "access_token": "token",
+                "expires_in": 3600,
+                "token_type": "Bearer",
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(handler):
+    """To Serve given handler on a local port in a daemon thread.
+
+    Returns:
+        Port the server listens on
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def write_file(directory, data):
+    """To Write given data to a new file of given directory."""
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+        file.write(data)
+    return file.name
+
+
+def time_pushes(create_client, small_file, large_file, pushes):
+    """To Time the small pushes and the large one.
+
+    Args:
+        create_client: Callable returning a new client
+        small_file: File pushed pushes times
+        large_file: File pushed once
+        pushes: Number of small pushes
+    """
+    start = time.perf_counter()
+    for _ in range(pushes):
+        create_client().push(small_file, None, None)
+    print(
+        "small push: {:.1f} ms/push".format(
+            (time.perf_counter() - start) / pushes * 1000
+        )
+    )
+    start = time.perf_counter()
+    create_client().push(large_file, "alerts", "dlp")
+    print(
+        "12 MiB push: {:.2f} s".format(time.perf_counter() - start)
+    )
+
+
+def bench_azure(small_file, large_file, large_data, pushes):
+    """To Benchmark the Azure Blob client against the fake endpoint."""
+    module = importlib.import_module(
+        "azure_object_storage.utils.azure_client"
+    )
+    configuration = {
+        "azure_connection_string": (
+            "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+            "AccountKey={};BlobEndpoint=http://127.0.0.1:{}/devstoreaccount1;"
+        ).format(AZURE_ACCOUNT_KEY, serve(FakeBlobHandler)),
+        "container_name": BUCKET_NAME,
+        "obj_prefix": "benchmark",
+        "upload_block_size": 1,
+        "upload_concurrency": 4,
+    }
+    logger = logging.getLogger(__name__)
+    time_pushes(
+        lambda: module.AzureClient(configuration, logger, {}),
+        small_file,
+        large_file,
+        pushes,
+    )
+    print("requests: {}".format(dict(sorted(FakeBlobHandler.calls.items()))))
+    print(
+        "12 MiB object round-trips: {}".format(
+            large_data in FakeBlobHandler.blobs.values()
+        )
+    )
+
+
+def bench_gcs(small_file, large_file, large_data, pushes):
+    """To Benchmark the Google Cloud Storage client against the emulator."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from gcp_storage_emulator.server import create_server
+
+    server = create_server(
+        "127.0.0.1",
+        GCS_EMULATOR_PORT,
+        in_memory=True,
+        default_bucket=BUCKET_NAME,
+    )
+    server.start()
+    os.environ["STORAGE_EMULATOR_HOST"] = "http://127.0.0.1:{}".format(
+        GCS_EMULATOR_PORT
+    )
+    private_key = rsa.generate_private_key(
+        public_exponent=65537, key_size=2048
+    ).private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    key_file = {
+        "type": "service_account",
+        "project_id": "benchmark",
+        "private_key_id": "benchmark",
+        "private_key": private_key.decode(),
+        "client_email": "benchmark@benchmark.iam.gserviceaccount.com",
+        "client_id": "1",
+        "token_uri": "http://127.0.0.1:{}/token".format(serve(TokenHandler)),
+    }
+    module = importlib.import_module(
+        "google_cloud_storage_cls.utils.gcp_client"
+    )
+    configuration = {
+        "key_file": json.dumps(key_file),
+        "bucket_name": BUCKET_NAME,
+        "obj_prefix": "benchmark",
+        "upload_chunk_size": 1,
+    }
+    logger = logging.getLogger(__name__)
+    try:
+        time_pushes(
+            lambda: module.GCPClient(configuration, logger),
+            small_file,
+            large_file,
+            pushes,
+        )
+        print("token requests: {}".format(TokenHandler.requests))
+        blobs = (
+            module.GCPClient(configuration, logger)
+            .get_gcp_client()
+            .bucket(BUCKET_NAME)
+            .list_blobs()
+        )
+        print(
+            "12 MiB object round-trips: {}".format(
+                any(
+                    blob.download_as_bytes() == large_data
+                    for blob in blobs
+                    if blob.size == LARGE_OBJECT_SIZE
+                )
+            )
+        )
+    finally:
+        server.stop()
+
+
+def main():
+    """To Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("service", choices=["azure", "gcs"])
+    parser.add_argument("--repo", default=REPO_ROOT)
+    parser.add_argument("--pushes", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.repo))
+    large_data = os.urandom(LARGE_OBJECT_SIZE)
+    with tempfile.TemporaryDirectory() as directory:
+        small_file = write_file(directory, b"x" * SMALL_OBJECT_SIZE)
+        large_file = write_file(directory, large_data)
+        bench = bench_azure if args.service == "azure" else bench_gcs
+        bench(small_file, large_file, large_data, args.pushes)
+
+
+if __name__ == "__main__":
+    main()
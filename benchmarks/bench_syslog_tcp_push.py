@@ -0,0 +1,126 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Benchmark of the syslog plugin push over TCP.
+
+Pushes CEF records of about 300 bytes to a local TCP sink which discards
+them, and reports the records written per second.
+
+The plugin imports the Netskope CE core, so the netskope package has to be
+importable, e.g. by running the script inside the Cloud Exchange container.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_syslog_tcp_push.py [--repo PATH] [--records N]
+"""
+
+
+import argparse
+import importlib
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+from bench_cef_generator_cache import REPO_ROOT
+
+# Pushes timed after the warm up one
+PUSHES = 5
+
+
+def start_sink():
+    """To Start a TCP server reading and discarding everything it receives.
+
+    Returns:
+        Port the server listens on
+    """
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(4)
+
+    def serve():
+        while True:
+            connection, _ = server.accept()
+            threading.Thread(
+                target=drain, args=(connection,), daemon=True
+            ).start()
+
+    def drain(connection):
+        with connection:
+            while connection.recv(1 << 20):
+                pass
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def main():
+    """To Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", default=REPO_ROOT)
+    parser.add_argument("--records", type=int, default=20000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.repo))
+    module = importlib.import_module("syslog.main")
+
+    # Build the plugin without the CE core, push only needs the
+    # configuration and the logger
+    plugin = module.SyslogPlugin.__new__(module.SyslogPlugin)
+    plugin.configuration = {
+        "syslog_protocol": "TCP",
+        "syslog_server": "127.0.0.1",
+        "syslog_port": start_sink(),
+    }
+    plugin.logger = logging.getLogger(__name__)
+
+    records = [
+        "CEF:0|Netskope|CE|1.0|dlp|alert|5|" + "k=v " * 70 + str(index)
+        for index in range(args.records)
+    ]
+    plugin.push(records[:10], "alerts", "dlp")
+
+    start = time.perf_counter()
+    for _ in range(PUSHES):
+        plugin.push(records, "alerts", "dlp")
+    elapsed = time.perf_counter() - start
+    print(
+        "TCP push: {:.0f} records/sec".format(
+            PUSHES * args.records / elapsed
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
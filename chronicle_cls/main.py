@@ -199,10 +199,10 @@ class ChroniclePlugin(PluginBase):
             "Chronicle Plugin: Starting Pushing data for Chronicle plugin."
         )
         self.chronicle_client = ChronicleClient(
-            self.configuration, self.logger
+            self.configuration, self.logger, self.proxy, self.ssl_validation
         )
         try:
-            self.chronicle_client._api_request(transformed_data)
+            self.chronicle_client.push(transformed_data)
         except Exception as e:
             self.logger.error(f"Error while pushing to Chronicle Plugin: {e}")
             raise
@@ -256,7 +256,19 @@ class ChroniclePlugin(PluginBase):
         else:
             return mappings[subtype.upper()]
 
-    def get_headers(self, header_mappings, data, data_type, subtype):
+    def get_mapping_variables(self):
+        """To Resolve the values of the variables (e.g. $tenant_name) usable in header mappings.
+
+        Returns:
+            dict of variable name and its resolved value
+        """
+        helper = AlertsHelper()
+        tenant = helper.get_tenant_cls(self.source)
+        return {"$tenant_name": tenant.name}
+
+    def get_headers(
+        self, header_mappings, data, data_type, subtype, mapping_variables
+    ):
         """To Create a dictionary of UDM headers from given header mappings.
 
         Args:
@@ -264,15 +276,12 @@ class ChroniclePlugin(PluginBase):
             data_type: Data type for which the headers are being transformed
             header_mappings: UDM header mapping with Netskope fields
             data: The alert/event for which the UDM header is being generated
+            mapping_variables: Resolved values of the mapping variables (e.g. $tenant_name)
 
         Returns:
             header dict
         """
         headers = {}
-        helper = AlertsHelper()
-        tenant = helper.get_tenant_cls(self.source)
-        mapping_variables = {"$tenant_name": tenant.name}
-
         try:
             headers[
                 "metadata.event_timestamp"
@@ -468,6 +477,17 @@ class ChroniclePlugin(PluginBase):
             self.logger,
         )
 
+        # Resolve the mapping variables once for the whole chunk
+        try:
+            mapping_variables = self.get_mapping_variables()
+        except Exception as err:
+            self.logger.error(
+                f"[{data_type}][{subtype}]: Error occurred while resolving "
+                f"mapping variables: {str(err)}. Transformation of "
+                f"current chunk will be skipped."
+            )
+            return []
+
         for data in raw_data:
             # First retrieve the mapping of subtype being transformed
             try:
@@ -485,7 +505,11 @@ class ChroniclePlugin(PluginBase):
             # Generating the UDM header
             try:
                 header = self.get_headers(
-                    subtype_mapping["header"], data, data_type, subtype
+                    subtype_mapping["header"],
+                    data,
+                    data_type,
+                    subtype,
+                    mapping_variables,
                 )
             except Exception as err:
                 self.logger.error(
@@ -0,0 +1,191 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Tests of the Chronicle client against a fake ingestion API."""
+
+
+import gzip
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ..utils import chronicle_client
+from ..utils.chronicle_client import ChronicleClient
+
+
+class FakeChronicle(BaseHTTPRequestHandler):
+    """Request handler answering like the Chronicle ingestion API.
+
+    Each request is recorded in requests as its Content-Encoding and its
+    decoded JSON body. The statuses in statuses are answered in turn, then
+    every request is accepted.
+    """
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    requests = []
+    statuses = []
+    gzip_status = None
+
+    def log_message(self, format, *args):
+        """To Keep the test output clean."""
+
+    def do_POST(self):
+        """To Answer an ingestion request."""
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        encoding = self.headers.get("Content-Encoding")
+        with self.lock:
+            if encoding == "gzip" and self.gzip_status is not None:
+                status = self.gzip_status
+            elif self.statuses:
+                status = self.statuses.pop(0)
+            else:
+                status = 200
+            if encoding == "gzip":
+                body = gzip.decompress(body)
+            self.requests.append((encoding, json.loads(body)))
+        data = b"{}"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Fake Chronicle listening on a free local port."""
+    FakeChronicle.requests = []
+    FakeChronicle.statuses = []
+    FakeChronicle.gzip_status = None
+    monkeypatch.setattr(chronicle_client, "_gzip_unsupported", set())
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeChronicle)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    """Chronicle client of the fake ingestion API."""
+    return ChronicleClient(
+        {
+            "base_url": "http://127.0.0.1:{}".format(server.server_address[1]),
+            "api_key": "key",
+        },
+        logging.getLogger(__name__),
+    )
+
+
+def _events(count):
+    """To Build given number of distinct UDM events."""
+    return [
+        {"metadata": {"product_log_id": str(index)}, "padding": "x" * 100}
+        for index in range(count)
+    ]
+
+
+def _ingested_ids():
+    """To List the ids of the events received by the fake API."""
+    return [
+        event["metadata"]["product_log_id"]
+        for _, body in FakeChronicle.requests
+        for event in body["events"]
+    ]
+
+
+def test_push_batches(monkeypatch, client):
+    """Events are uploaded once each, in gzip bodies below the max size."""
+    monkeypatch.setattr(chronicle_client, "MAX_PAYLOAD_SIZE", 2000)
+    events = _events(100)
+
+    client.push(events)
+
+    assert sorted(_ingested_ids(), key=int) == [
+        str(index) for index in range(100)
+    ]
+    assert len(FakeChronicle.requests) > 1
+    for encoding, body in FakeChronicle.requests:
+        assert encoding == "gzip"
+        assert len(json.dumps(body).encode("utf-8")) <= 2000
+
+
+def test_push_skips_oversized_event(monkeypatch, client):
+    """An event larger than a whole body is skipped."""
+    monkeypatch.setattr(chronicle_client, "MAX_PAYLOAD_SIZE", 500)
+    events = _events(2)
+    events[0]["padding"] = "x" * 1000
+
+    client.push(events)
+
+    assert _ingested_ids() == ["1"]
+
+
+def test_push_without_gzip_support(client):
+    """A 415 switches the endpoint to uncompressed bodies."""
+    FakeChronicle.gzip_status = 415
+
+    client.push(_events(1))
+    client.push(_events(1))
+
+    assert [encoding for encoding, _ in FakeChronicle.requests] == [
+        "gzip",
+        None,
+        None,
+    ]
+
+
+def test_push_invalid_batch_posted_once(client):
+    """A 400 fails the push without posting the batch again uncompressed."""
+    FakeChronicle.statuses = [400]
+
+    with pytest.raises(Exception, match="Status code: 400"):
+        client.push(_events(1))
+
+    assert len(FakeChronicle.requests) == 1
+    assert chronicle_client._gzip_unsupported == set()
+
+
+def test_push_retries_throttled_batch(client):
+    """A 429 is retried and the batch is then ingested."""
+    FakeChronicle.statuses = [429, 503]
+
+    client.push(_events(1))
+
+    assert len(FakeChronicle.requests) == 3
+    assert _ingested_ids() == ["0", "0", "0"]
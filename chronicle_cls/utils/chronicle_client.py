@@ -33,37 +33,212 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """Chronicle CLient."""
 
 
-import requests
+import gzip
 import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
 from netskope.common.utils import add_user_agent
 
+from .chronicle_constants import (
+    COMPRESSION_LEVEL,
+    MAX_CACHED_SESSIONS,
+    MAX_PAYLOAD_SIZE,
+    MAX_RETRIES,
+    REQUEST_TIMEOUT,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
+    RETRY_STATUS_CODES,
+    UPLOAD_CONCURRENCY,
+)
+
+PAYLOAD_PREFIX = b'{"events": ['
+PAYLOAD_SEPARATOR = b", "
+PAYLOAD_SUFFIX = b"]}"
+
+# HTTP sessions are shared by every instance of the plugin in this process,
+# so that the connections to Chronicle are kept alive across pushes.
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+# Endpoints which rejected a gzip compressed body
+_gzip_unsupported = set()
+
 
 class ChronicleClient:
     """Chronicle Client."""
 
-    def __init__(self, configuration: dict, logger):
+    def __init__(
+        self, configuration: dict, logger, proxy=None, ssl_validation=True
+    ):
         """Initialize."""
         self.configuration = configuration
         self.logger = logger
+        self.proxy = proxy or {}
+        self.ssl_validation = ssl_validation
+        base_url = self.configuration["base_url"]
+        self.url = f"{base_url.strip().strip('/')}/v1/udmevents"
+
+    def _get_session(self):
+        """To Get the keep-alive HTTP session of the configured endpoint.
+
+        Returns:
+            requests.Session shared across pushes
+        """
+        key = (
+            self.url,
+            self.ssl_validation,
+            tuple(sorted(self.proxy.items())),
+        )
+        evicted = []
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is not None:
+                _sessions.move_to_end(key)
+                return session
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=UPLOAD_CONCURRENCY
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.verify = self.ssl_validation
+            session.proxies.update(self.proxy)
+            session.headers.update(
+                add_user_agent({"Content-Type": "application/json"})
+            )
+            _sessions[key] = session
+            while len(_sessions) > MAX_CACHED_SESSIONS:
+                evicted.append(_sessions.popitem(last=False)[1])
+
+        for evicted_session in evicted:
+            evicted_session.close()
+        return session
+
+    def _get_payload(self, events):
+        """To Get the request body ingesting given encoded events.
+
+        Args:
+            events: List of UTF-8 encoded JSON events
+
+        Returns:
+            UTF-8 encoded JSON request body
+        """
+        return b"".join(
+            (PAYLOAD_PREFIX, PAYLOAD_SEPARATOR.join(events), PAYLOAD_SUFFIX)
+        )
+
+    def _iter_payloads(self, transformed_data):
+        """To Encode given events into request bodies smaller than MAX_PAYLOAD_SIZE.
+
+        Args:
+            transformed_data: The transformed data to be ingested
+
+        Yields:
+            UTF-8 encoded JSON request body
+        """
+        empty_size = len(PAYLOAD_PREFIX) + len(PAYLOAD_SUFFIX)
+        batch = []
+        batch_size = empty_size
+        for event in transformed_data:
+            encoded = json.dumps(event).encode("utf-8")
+            if empty_size + len(encoded) > MAX_PAYLOAD_SIZE:
+                self.logger.error(
+                    f"Chronicle: Event of {len(encoded)} bytes exceeds the "
+                    f"max payload size of {MAX_PAYLOAD_SIZE} bytes. "
+                    "The event will be skipped."
+                )
+                continue
+            size = len(encoded) + (len(PAYLOAD_SEPARATOR) if batch else 0)
+            if batch and batch_size + size > MAX_PAYLOAD_SIZE:
+                yield self._get_payload(batch)
+                batch = []
+                batch_size = empty_size
+                size = len(encoded)
+            batch.append(encoded)
+            batch_size += size
+        if batch:
+            yield self._get_payload(batch)
 
-    def _api_request(self, transformed_data):
+    def _get_backoff(self, attempt, response=None):
+        """To Get the seconds to wait before given retry attempt.
+
+        Args:
+            attempt: Number of the retry, starting at 1
+            response: The response which is retried, if any
+
+        Returns:
+            Seconds to wait
+        """
+        retry_after = response is not None and response.headers.get(
+            "Retry-After"
+        )
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), RETRY_BACKOFF_MAX)
+        return random.uniform(
+            0, min(RETRY_BACKOFF * 2 ** (attempt - 1), RETRY_BACKOFF_MAX)
+        )
+
+    def _post(self, session, payload):
+        """To Post given body, compressed unless the endpoint does not support it.
+
+        Args:
+            session: requests.Session to post with
+            payload: UTF-8 encoded JSON request body
+
+        Returns:
+            requests.Response
+        """
+        params = {"key": self.configuration["api_key"].strip()}
+        if self.url not in _gzip_unsupported:
+            response = session.post(
+                self.url,
+                params=params,
+                headers={"Content-Encoding": "gzip"},
+                data=gzip.compress(payload, COMPRESSION_LEVEL),
+                timeout=REQUEST_TIMEOUT,
+            )
+            # Any other status, e.g. 400 for an invalid batch, is handled
+            # by the caller like the one of an uncompressed body
+            if response.status_code != 415:
+                return response
+            self.logger.info(
+                "Chronicle: Endpoint does not support compressed request "
+                "bodies. Request bodies will be sent uncompressed."
+            )
+            _gzip_unsupported.add(self.url)
+        return session.post(
+            self.url, params=params, data=payload, timeout=REQUEST_TIMEOUT
+        )
+
+    def _api_request(self, session, payload):
         """Call the API for data Ingestion.
 
-        :transformed_data : The transformed data to be ingested.
+        :session : requests.Session to call the API with.
+        :payload : UTF-8 encoded JSON request body.
         """
         try:
-            base_url = self.configuration["base_url"]
-            url = f"{base_url.strip().strip('/')}/v1/udmevents"
-            data = {"events": transformed_data}
-            payload = json.dumps(data)
-            headers = {"Content-Type": "application/json"}
-            response = requests.request(
-                "POST",
-                url,
-                params={"key": self.configuration["api_key"].strip()},
-                headers=add_user_agent(headers),
-                data=payload,
-            )
+            for attempt in range(MAX_RETRIES + 1):
+                response = None
+                try:
+                    response = self._post(session, payload)
+                except (
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                ):
+                    if attempt == MAX_RETRIES:
+                        raise
+                if response is not None and (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt == MAX_RETRIES
+                ):
+                    break
+                time.sleep(self._get_backoff(attempt + 1, response))
+
             status_code = response.status_code
             response_body = response.text
             if status_code >= 500:
@@ -96,7 +271,6 @@ class ChronicleClient:
                         status_code, response_body
                     )
                 )
-
         except requests.exceptions.HTTPError as err:
             self.logger.error(
                 "Chronicle: HTTP error occurred: {}.".format(err)
@@ -122,3 +296,38 @@ class ChronicleClient:
                 f"API response: {err}."
             )
             raise
+
+    def push(self, transformed_data):
+        """To Ingest given events in size bounded batches, uploaded concurrently.
+
+        No new batch is uploaded once an upload has failed. The batches
+        ingested before the failure are uploaded again when CE retries the
+        push, so delivery is at least once.
+
+        Args:
+            transformed_data: The transformed data to be ingested
+        """
+        session = self._get_session()
+        errors = []
+
+        def collect(done):
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    errors.append(error)
+
+        with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+            pending = set()
+            for payload in self._iter_payloads(transformed_data):
+                if len(pending) >= UPLOAD_CONCURRENCY:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                if errors:
+                    break
+                pending.add(
+                    executor.submit(self._api_request, session, payload)
+                )
+            collect(wait(pending)[0])
+
+        if errors:
+            raise errors[0]
@@ -58,3 +58,24 @@ SEVERITY_MAP = {
     "9": SEVERITY_VERY_HIGH,
     "10": SEVERITY_VERY_HIGH,
 }
+
+# Max nesting templates kept per UDM generator, one per distinct set of fields
+NESTING_TEMPLATE_CACHE_SIZE = 1024
+
+# Max size in bytes of the JSON body of a single ingestion request
+MAX_PAYLOAD_SIZE = 1000000
+# Max ingestion requests in flight at the same time
+UPLOAD_CONCURRENCY = 4
+# Seconds to wait for a response of an ingestion request
+REQUEST_TIMEOUT = 60
+# Status codes for which an ingestion request is retried
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 3
+# Seconds of the first retry backoff, doubled for each next retry up to
+# RETRY_BACKOFF_MAX. The actual wait is a random value below it.
+RETRY_BACKOFF = 1
+RETRY_BACKOFF_MAX = 30
+# Level of the gzip compression of the request bodies
+COMPRESSION_LEVEL = 5
+# Max HTTP sessions kept alive, one per Chronicle endpoint
+MAX_CACHED_SESSIONS = 16
@@ -41,6 +41,7 @@ import datetime as dt
 import re
 
 from .chronicle_constants import (
+    NESTING_TEMPLATE_CACHE_SIZE,
     SEVERITY_MAP,
     SEVERITY_UNKNOWN,
 )
@@ -73,6 +74,7 @@ class UDMGenerator(object):
         )
         self.valid_extensions = self._valid_extensions()
         self.extension_converters = self._type_converter()
+        self._nesting_templates = {}  # field names -> nesting template
 
     def escaper(self, special_chars):
         """Escapes the given special characters.
@@ -490,29 +492,83 @@ class UDMGenerator(object):
         )
         return udm_field_data
 
+    def _compile_nesting_template(self, fields):
+        """To Compile the steps nesting the values of given dotted UDM fields.
+
+        Every field is split only once. An event is then assembled by running
+        the steps, without splitting any field name again.
+
+        Args:
+            fields: Tuple of dotted UDM field names, in the order their values
+                are set
+
+        Returns:
+            List of (parent object, name, value index) steps. The value index
+            is None for a step creating a nested object. None if a field is
+            both a value and a nested object, e.g. "user" and "user.name".
+        """
+        objects = {(): 0}  # path of nested object -> its index
+        values = set()
+        steps = []
+        for index, field in enumerate(fields):
+            levels = tuple(field.split("."))
+            for depth in range(1, len(levels)):
+                path = levels[:depth]
+                if path in values:
+                    return None
+                if path not in objects:
+                    objects[path] = len(objects)
+                    steps.append((objects[path[:-1]], path[-1], None))
+            if levels in objects:
+                return None
+            values.add(levels)
+            steps.append((objects[levels[:-1]], levels[-1], index))
+        return steps
+
     def json_converter(self, header_pairs, extension_pairs):
         """JSON Converter."""
+        fields = (*header_pairs, *extension_pairs)
+        try:
+            template = self._nesting_templates[fields]
+        except KeyError:
+            if len(self._nesting_templates) >= NESTING_TEMPLATE_CACHE_SIZE:
+                self._nesting_templates.clear()
+            template = self._compile_nesting_template(fields)
+            self._nesting_templates[fields] = template
+
         udm_data = {}
-        for key, value in header_pairs.items():
-            levels = key.split(".")
-            if len(levels) == 1:
-                udm_data[levels[0]] = value
-            else:
-                data = udm_data.get(levels[0], {})
-                udm_data[levels[0]] = self.get_json_structure(
-                    data, ".".join(levels[1:]), value
-                )
+        if template is None:
+            # Conflicting fields, nest them one by one as they come
+            for key, value in header_pairs.items():
+                levels = key.split(".")
+                if len(levels) == 1:
+                    udm_data[levels[0]] = value
+                else:
+                    data = udm_data.get(levels[0], {})
+                    udm_data[levels[0]] = self.get_json_structure(
+                        data, ".".join(levels[1:]), value
+                    )
 
-        for key, value in extension_pairs.items():
-            levels = key.split(".")
-            if len(levels) == 1:
-                udm_data[levels[0]] = value
+            for key, value in extension_pairs.items():
+                levels = key.split(".")
+                if len(levels) == 1:
+                    udm_data[levels[0]] = value
+                else:
+                    data = udm_data.get(levels[0], {})
+                    udm_data[levels[0]] = self.get_json_structure(
+                        data, ".".join(levels[1:]), value
+                    )
+            return udm_data
+
+        values = (*header_pairs.values(), *extension_pairs.values())
+        objects = [udm_data]
+        for parent, name, index in template:
+            if index is None:
+                nested = {}
+                objects[parent][name] = nested
+                objects.append(nested)
             else:
-                data = udm_data.get(levels[0], {})
-                udm_data[levels[0]] = self.get_json_structure(
-                    data, ".".join(levels[1:]), value
-                )
-
+                objects[parent][name] = values[index]
         return udm_data
 
     def get_udm_event(self, headers, extensions, data_type, subtype):
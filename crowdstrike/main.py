@@ -67,6 +67,46 @@ INTERNAL_TYPES_TO_CROWDSTRIKE = {
 }
 
 
+class CrowdStrikeIOCIndex:
+    """Set of IOCs keyed by CrowdStrike IOC type and normalized value."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._iocs = set()
+
+    @staticmethod
+    def normalize(ioc_type, value):
+        """Get the key of an IOC, hashes and domains are case insensitive.
+
+        Args:
+            ioc_type (str): CrowdStrike IOC type.
+            value (str): IOC value.
+        Returns:
+            tuple: IOC type and normalized value.
+        """
+        value = (value or "").strip().lower()
+        if ioc_type == "domain":
+            value = value.rstrip(".")
+        return ioc_type, value
+
+    def add(self, ioc_type, value):
+        """Add an IOC to the index.
+
+        Args:
+            ioc_type (str): CrowdStrike IOC type.
+            value (str): IOC value.
+        """
+        self._iocs.add(self.normalize(ioc_type, value))
+
+    def __contains__(self, ioc):
+        """Check whether an (IOC type, value) tuple is in the index."""
+        return self.normalize(*ioc) in self._iocs
+
+    def __len__(self):
+        """Get the number of IOCs in the index."""
+        return len(self._iocs)
+
+
 class CrowdStrikePlugin(PluginBase):
     """CrowdStrikePlugin class having concrete implementation for pulling and pushing threat information."""
 
@@ -232,13 +272,13 @@ class CrowdStrikePlugin(PluginBase):
         return indicator_list
 
     def get_ioc_ids(self, threat_type, headers):
-        """Get the all the IOC ID list from the Indicator Query Endpoint.
+        """Get the index of all the IOCs from the Indicator Query Endpoint.
 
         Args:
             threat_type (string): Type of threat data to pull.
             headers (dict): Header dict object having OAUTH2 access token.
         Returns:
-            dict: JSON response dict received from query Indicator endpoint.
+            CrowdStrikeIOCIndex: Index of the IOCs, built while paging through the endpoint.
         """
         # Query endpoint, this will return all the indicator IDs.
         query_endpoint = (
@@ -252,7 +292,8 @@ class CrowdStrikePlugin(PluginBase):
         elif threat_type == "URL":
             query_params["types"] = "domain"
         query_params["limit"] = 2000
-        ioc_ids = []
+        ioc_ids = CrowdStrikeIOCIndex()
+        total_received_iocs = 0
         while True:
             headers = self.reload_auth_token(headers)
             all_ioc_resp = requests.get(
@@ -284,13 +325,13 @@ class CrowdStrikePlugin(PluginBase):
             total = meta.get("pagination", {}).get("total")
             resources = ioc_resp_json.get("resources", [])
             for resource in resources:
-                ioc_ids.append(
-                    f"{resource.get('type', '')}"
-                    ":"
-                    f"{resource.get('value', '')}"
+                ioc_ids.add(
+                    resource.get("type", ""), resource.get("value", "")
                 )
-            total_received_iocs = len(ioc_ids)
-            if total_received_iocs == total:
+            total_received_iocs += len(resources)
+            if not resources or (
+                total is not None and total_received_iocs >= total
+            ):
                 break
         return ioc_ids
 
@@ -628,14 +669,13 @@ class CrowdStrikePlugin(PluginBase):
         """Prepare the JSON payload for Push.
 
         Args:
-            ioc_ids (List[str]):
+            ioc_ids (CrowdStrikeIOCIndex): Index of the IOCs on CrowdStrike, the IOCs of the payload are added to it.
             indicators (List[cte.models.Indicators]): List of Indicator objects to be pushed.
             action_dict (Dict) : Dictionary contains the action and plateforms for sharing.
         Returns:
             List[dict]: List of python dict object of JSON response model as per CrowdStrike API.
         """
         payload_list = []
-        ioc = set()
         source = self.configuration.get("source", "")
         action = action_dict.get("action", "")
         platforms = action_dict.get("platforms", ["windows", "mac", "linux"])
@@ -649,28 +689,22 @@ class CrowdStrikePlugin(PluginBase):
                 "applied_globally": True,
                 "severity": indicator.severity,
             }
-            if (
-                f"{INTERNAL_TYPES_TO_CROWDSTRIKE[indicator.type]}:{indicator.value}"
-                not in ioc_ids
-            ):
-                json_body["type"] = INTERNAL_TYPES_TO_CROWDSTRIKE[
-                    indicator.type
-                ]
-                if indicator.type == IndicatorType.URL:
-                    value = self._extract_host(indicator.value)
-                    if (
-                        f"{INTERNAL_TYPES_TO_CROWDSTRIKE[indicator.type]}:{value}"
-                        in ioc_ids
-                        or value in ioc
-                        or not self.validate_domain(value)
-                    ):
-                        continue
-                    else:
-                        ioc.add(value)
-                        json_body["value"] = value
-                else:
-                    json_body["value"] = indicator.value
-                payload_list.append(json_body.copy())
+            ioc_type = INTERNAL_TYPES_TO_CROWDSTRIKE[indicator.type]
+            if (ioc_type, indicator.value) in ioc_ids:
+                continue
+            json_body["type"] = ioc_type
+            if indicator.type == IndicatorType.URL:
+                value = self._extract_host(indicator.value)
+                if (ioc_type, value) in ioc_ids or not self.validate_domain(
+                    value
+                ):
+                    continue
+            else:
+                value = indicator.value
+            # Skip the duplicates of this IOC later in the same push
+            ioc_ids.add(ioc_type, value)
+            json_body["value"] = value
+            payload_list.append(json_body.copy())
         return payload_list
 
     def validate(self, data):
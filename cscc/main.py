@@ -39,6 +39,7 @@ import re
 import datetime
 from netskope.integrations.cls.plugin_base import PluginBase, ValidationResult
 from .utils.cscc_constants import (
+    CHUNK_SIZE,
     GCP_URL,
     RESOURCE_NAME_URL,
 )
@@ -50,6 +51,7 @@ from .utils.cscc_helper import (
     DataTypes,
 )
 from .utils.cscc_exceptions import (
+    IngestionError,
     MaxRetriesExceededError,
 )
 from .utils.gcp_client import GCPClient
@@ -79,8 +81,11 @@ class CSCCPlugin(PluginBase):
     def push(self, transformed_data, data_type, subtype):
         """Transform and ingests the given data chunks to GCP by creating a authenticated session with GCP.
 
+        The authenticated session and the project number are shared across pushes,
+        and the findings of the chunk are posted in parallel.
+
         :param data_type: The type of data being pushed. Current possible values: alerts and events
-        :param transformed_data: Transformed data to be ingested to GCP in chunks of 1
+        :param transformed_data: Transformed data to be ingested to GCP in chunks of CHUNK_SIZE
         :param subtype: The subtype of data being pushed. E.g. subtypes of alert is "dlp", "policy" etc.
         """
         self.create_gcp_client()
@@ -88,21 +93,20 @@ class CSCCPlugin(PluginBase):
         self.gcp_client.set_gcp_session()
         try:
             # Ingest the given data
-            for data in transformed_data:
-                self.gcp_client.ingest(
-                    data["fid"], data["finding"], data_type, subtype
-                )
-        except MaxRetriesExceededError as err:
+            self.gcp_client.ingest_findings(
+                transformed_data, data_type, subtype
+            )
+        except (MaxRetriesExceededError, IngestionError) as err:
             self.logger.error(f"Error while pushing data: {err}")
             raise err
 
     @staticmethod
     def chunk_size():
-        """Get chunk_size would be 1 in this case.
+        """Get chunk_size, the findings of a chunk are ingested in parallel.
 
         :return: data chunk size
         """
-        return 1
+        return CHUNK_SIZE
 
     def get_subtype_mapping(self, mappings, subtype):
         """Retrieve subtype mappings (mappings for subtypes of alerts/events) case insensitively.
@@ -39,3 +39,15 @@ RESOURCE_NAME_URL = "//cloudresourcemanager.googleapis.com/projects"
 GET_PROJECT_NUMBER_URL = (
     "https://cloudresourcemanager.googleapis.com/v1beta1/projects"
 )
+# Findings per chunk handed to push
+CHUNK_SIZE = 500
+# Max findings posted at the same time
+INGEST_CONCURRENCY = 8
+# Max attempts to post a finding
+MAX_RETRIES = 4
+# Seconds of the first retry backoff, doubled for each next retry up to
+# RETRY_BACKOFF_MAX, unless the response tells how long to wait
+RETRY_BACKOFF = 2
+RETRY_BACKOFF_MAX = 60
+# Max authorized sessions kept, one per service account and proxy
+MAX_CACHED_SESSIONS = 16
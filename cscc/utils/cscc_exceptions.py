@@ -56,3 +56,11 @@ class MaxRetriesExceededError(Error):
     def __init__(self, message):
         """Initialize."""
         self.message = message
+
+
+class IngestionError(Error):
+    """Exception raised when GCP rejects a finding for a reason retries cannot fix."""
+
+    def __init__(self, message):
+        """Initialize."""
+        self.message = message
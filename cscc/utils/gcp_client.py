@@ -33,20 +33,57 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """GCP Client."""
 
 
+import json
+import random
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+
+import requests as http_requests
+from requests.adapters import HTTPAdapter
 from google.auth.exceptions import TransportError
 from google.oauth2 import service_account
 from google.auth.transport import requests
 from .cscc_exceptions import (
+    IngestionError,
     MaxRetriesExceededError,
 )
 from .cscc_constants import (
     GCP_SCOPE,
     GET_PROJECT_NUMBER_URL,
+    INGEST_CONCURRENCY,
+    MAX_CACHED_SESSIONS,
+    MAX_RETRIES,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
 )
 
-RETRY_COUNT = 2
-RETRY_SLEEP_TIME = 60  # seconds
+# Authorized sessions are shared by every instance of the plugin in this
+# process, so that the credentials, access token, project number and the
+# connections to GCP are reused across pushes.
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+class _SharedSession:
+    """Authorized session and the state shared by its users."""
+
+    def __init__(self, credentials, session, auth_request):
+        """Initialize with the scoped credentials and their session.
+
+        :param credentials: Scoped service account credentials
+        :param session: AuthorizedSession used to make requests
+        :param auth_request: Transport used to refresh the access token
+        """
+        self.credentials = credentials
+        self.session = session
+        self.auth_request = auth_request
+        self.lock = threading.Lock()
+        self.project_number = None
+        # monotonic time before which no finding is posted after a 429
+        self.resume_at = 0.0
 
 
 class GCPClient:
@@ -65,6 +102,17 @@ class GCPClient:
         self.gcp_session = None
         self.logger = logger
         self.proxy = proxy
+        self._shared = None
+
+    def _get_cache_key(self):
+        """Get the key of the shared session of this client.
+
+        :return: tuple of the service account and the proxy configuration
+        """
+        return (
+            json.dumps(self.key_file, sort_keys=True),
+            tuple(sorted((self.proxy or {}).items())),
+        )
 
     def set_gcp_session(self):
         """Set GCP authenticated session.
@@ -72,12 +120,38 @@ class GCPClient:
         :return session (object): GCP authenticated session object to make request
         """
         try:
-            creds = service_account.Credentials.from_service_account_info(
-                self.key_file
-            )
-            scoped = creds.with_scopes(self.gcp_scope)
-            self.gcp_session = requests.AuthorizedSession(scoped)
-            self.gcp_session.proxies = self.proxy
+            key = self._get_cache_key()
+            with _sessions_lock:
+                shared = _sessions.get(key)
+                if shared is not None:
+                    _sessions.move_to_end(key)
+                else:
+                    creds = (
+                        service_account.Credentials.from_service_account_info(
+                            self.key_file
+                        )
+                    )
+                    scoped = creds.with_scopes(self.gcp_scope)
+                    auth_session = http_requests.Session()
+                    auth_session.proxies.update(self.proxy or {})
+                    auth_request = requests.Request(auth_session)
+                    session = requests.AuthorizedSession(
+                        scoped, auth_request=auth_request
+                    )
+                    session.mount(
+                        "https://",
+                        HTTPAdapter(
+                            pool_connections=1,
+                            pool_maxsize=INGEST_CONCURRENCY,
+                        ),
+                    )
+                    session.proxies = self.proxy
+                    shared = _SharedSession(scoped, session, auth_request)
+                    _sessions[key] = shared
+                    while len(_sessions) > MAX_CACHED_SESSIONS:
+                        _sessions.popitem(last=False)[1].session.close()
+            self._shared = shared
+            self.gcp_session = shared.session
         except Exception as err:
             self.logger.error(
                 "Could not create authenticated session object. Error:{}".format(
@@ -92,26 +166,28 @@ class GCPClient:
         :return Project number: Project number of given Google service account
         """
         try:
-            credentials = (
-                service_account.Credentials.from_service_account_info(
-                    self.key_file, scopes=GCP_SCOPE
-                )
-            )
             self.set_gcp_session()
-            res = self.gcp_session.get(
-                "{}/{}".format(GET_PROJECT_NUMBER_URL, credentials.project_id)
-            )
-            res = res.json()
-            project_number = res.get("projectNumber")
-            if project_number:
-                return project_number
-            else:
-                self.logger.error(
-                    "Getting invalid response for project number. Error: {}".format(
-                        res
+            shared = self._shared
+            with shared.lock:
+                if shared.project_number:
+                    return shared.project_number
+                res = self.gcp_session.get(
+                    "{}/{}".format(
+                        GET_PROJECT_NUMBER_URL, shared.credentials.project_id
                     )
                 )
-                raise Exception("Invalid project number in response.")
+                res = res.json()
+                project_number = res.get("projectNumber")
+                if project_number:
+                    shared.project_number = project_number
+                    return project_number
+                else:
+                    self.logger.error(
+                        "Getting invalid response for project number. Error: {}".format(
+                            res
+                        )
+                    )
+                    raise Exception("Invalid project number in response.")
 
         except TransportError:
             self.logger.error("Found invalid proxy configurations.")
@@ -124,10 +200,59 @@ class GCPClient:
             )
             raise
 
+    def _refresh_token(self):
+        """Refresh the access token of the session unless it is still valid.
+
+        Done once before posting findings in parallel, so that the workers do
+        not all request a new token at the same time.
+        """
+        shared = self._shared
+        with shared.lock:
+            if not shared.credentials.valid:
+                shared.credentials.refresh(shared.auth_request)
+
+    def _get_retry_delay(self, retry_count, response):
+        """Get the seconds to wait before retrying a post.
+
+        :param retry_count: Number of the post attempt which failed, starting at 0
+        :param response: The response of the failed post
+        :return: Retry-After of the response if any, else a jittered exponential backoff
+        """
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(int(retry_after), RETRY_BACKOFF_MAX)
+        if retry_after:
+            try:
+                delay = (
+                    parsedate_to_datetime(retry_after).timestamp() - time.time()
+                )
+                return min(max(delay, 0), RETRY_BACKOFF_MAX)
+            except (TypeError, ValueError):
+                pass
+        return random.uniform(
+            RETRY_BACKOFF / 2,
+            min(RETRY_BACKOFF * 2 ** retry_count, RETRY_BACKOFF_MAX),
+        )
+
+    def _wait_for_quota(self):
+        """Wait until the session is no longer throttled by a 429 response."""
+        delay = self._shared.resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _throttle(self, delay):
+        """Hold back every post of the session for the given seconds.
+
+        :param delay: Seconds to wait before the next post
+        """
+        shared = self._shared
+        with shared.lock:
+            shared.resume_at = max(shared.resume_at, time.monotonic() + delay)
+
     def _check_for_retries(self, retry_count):
-        if retry_count + 1 == RETRY_COUNT:
+        if retry_count + 1 == MAX_RETRIES:
             raise MaxRetriesExceededError(
-                "Could not ingest data after {} retries".format(RETRY_COUNT)
+                "Could not ingest data after {} retries".format(MAX_RETRIES)
             )
 
     def ingest(self, fid, finding, data_type, subtype):
@@ -140,43 +265,61 @@ class GCPClient:
         """
         param = {"findingId": fid}
         try:
-            for retry_count in range(RETRY_COUNT):
+            for retry_count in range(MAX_RETRIES):
+                self._wait_for_quota()
                 res = self.gcp_session.post(
                     self.gcp_post_url, params=param, json=finding
                 )
 
                 if res.status_code == 200:
                     break
-                # elif res.status_code in [401, 403, 404]:
+                elif res.status_code == 409:
+                    # The finding was created by an earlier post, e.g. by
+                    # a retry of the chunk or of a post whose response was lost
+                    self.logger.info(
+                        "[{}][{}]: Finding {} already exists, the record "
+                        "will be skipped.".format(data_type, subtype, fid)
+                    )
+                    break
                 elif res.status_code == 429 or res.status_code >= 500:
                     self._check_for_retries(retry_count)
+                    retry_delay = self._get_retry_delay(retry_count, res)
                     self.logger.error(
-                        "Could not ingest data to GCP. Retrying again in {} seconds".format(
-                            RETRY_SLEEP_TIME
+                        "Could not ingest data to GCP. Retrying again in {:.1f} seconds".format(
+                            retry_delay
                         )
                     )
                     self.logger.error(
                         "[{}][{}]: Error occurred in ingestion. Error: "
                         "{}".format(data_type, subtype, res.text)
                     )
-                    time.sleep(RETRY_SLEEP_TIME)
+                    if res.status_code == 429:
+                        # Quota is per source, hold back the other posts too
+                        self._throttle(retry_delay)
+                    else:
+                        time.sleep(retry_delay)
+                elif res.status_code == 400:
+                    self.logger.error(
+                        "[{}][{}]: Error occurred in ingestion, the record will be skipped. Status "
+                        "code: {}. Error: {}".format(
+                            data_type, subtype, res.status_code, res.text
+                        )
+                    )
+                    break
                 else:
-                    if res.status_code != 400:
-                        self.logger.error(
-                            "[{}][{}]: Error occurred in ingestion, exiting from script. Status code: {}."
-                            " Error: {}".format(
-                                data_type, subtype, res.status_code, res.text
-                            )
+                    # Posting again cannot help, e.g. on 401, 403 or 404
+                    self.logger.error(
+                        "[{}][{}]: Error occurred in ingestion, exiting from script. Status code: {}."
+                        " Error: {}".format(
+                            data_type, subtype, res.status_code, res.text
                         )
-                    else:
-                        self.logger.error(
-                            "[{}][{}]: Error occurred in ingestion, the record will be skipped. Status "
-                            "code: {}. Error: {}".format(
-                                data_type, subtype, res.status_code, res.text
-                            )
+                    )
+                    raise IngestionError(
+                        "Could not ingest data, status code: {}".format(
+                            res.status_code
                         )
-                        break
-        except MaxRetriesExceededError as err:
+                    )
+        except (MaxRetriesExceededError, IngestionError) as err:
             raise err
         except TransportError:
             self.logger.error("Found invalid proxy configurations.")
@@ -187,3 +330,43 @@ class GCPClient:
                 "of the record will be skipped. Error:{}".format(err)
             )
             raise err
+
+    def ingest_findings(self, findings, data_type, subtype):
+        """Ingest the given findings on google CSCC in parallel.
+
+        At most INGEST_CONCURRENCY findings are posted at the same time. No
+        new finding is posted once one has failed, and the first error is raised.
+
+        :param findings: Iterable of dicts with the finding Id ("fid") and the finding ("finding")
+        :param data_type: The data type being ingested
+        :param subtype: The subtype of data type being ingested
+        """
+        self._refresh_token()
+        errors = []
+
+        def collect(done):
+            for future in done:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+
+        with ThreadPoolExecutor(max_workers=INGEST_CONCURRENCY) as executor:
+            pending = set()
+            for data in findings:
+                if len(pending) >= INGEST_CONCURRENCY:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                if errors:
+                    break
+                pending.add(
+                    executor.submit(
+                        self.ingest,
+                        data["fid"],
+                        data["finding"],
+                        data_type,
+                        subtype,
+                    )
+                )
+            collect(wait(pending)[0])
+
+        if errors:
+            raise errors[0]
@@ -33,6 +33,9 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """AWS S3 Plugin."""
 
 
+import itertools
+import os
+import socket
 import time
 from typing import List
 from os import path
@@ -43,6 +46,32 @@ from netskope.integrations.cls.plugin_base import (
     PushResult,
 )
 
+from .utils.disk_constants import (
+    COMPRESSION_LEVELS,
+    COMPRESSION_NONE,
+    COMPRESSION_ZSTD,
+    DEFAULT_COMPRESSION_LEVEL,
+    DEFAULT_FSYNC_INTERVAL,
+    FSYNC_NEVER,
+    FSYNC_POLICIES,
+    FSYNC_SEGMENT,
+    SPOOL_DIRECTORY_NAME,
+    SWEEP_INTERVAL,
+)
+from .utils.disk_encoder import (
+    count_records,
+    get_encoder,
+    get_extension,
+    zstandard,
+)
+from .utils.disk_partitions import DiskPartitionIndex
+from .utils.disk_spool_writer import DiskSpoolWriter, sync_dir
+
+# Sequence number of the files stored by this process
+_file_sequence = itertools.count()
+# Time of the last retention sweep of this process per (path, prefix)
+_last_sweeps = {}
+
 
 class DiskPlugin(PluginBase):
     """The AWS S3 plugin implementation class."""
@@ -66,19 +95,182 @@ class DiskPlugin(PluginBase):
     def push(self, transformed_data, data_type, subtype) -> PushResult:
         """Push the transformed_data to the 3rd party platform."""
         try:
-            with open(
-                path.join(
-                    self.configuration.get("storage_path"),
-                    f"{self.configuration.get('obj_prefix', 'default')}_webtx_{int(time.time())}.txt.gz",
+            storage_path = self.configuration.get("storage_path")
+            spool_writer = DiskSpoolWriter(
+                DiskSpoolWriter.get_spool_dir(
+                    path.join(storage_path, SPOOL_DIRECTORY_NAME),
+                    self.configuration.get("obj_prefix", "default"),
                 ),
-                "wb",
-            ) as out:
-                for data in transformed_data:
-                    out.write(data)
+                self.configuration.get("max_file_size"),
+                self.configuration.get("max_duration"),
+                self._store,
+                self.logger,
+                self.configuration.get("fsync_policy") or FSYNC_SEGMENT,
+                self.configuration.get("fsync_interval")
+                or DEFAULT_FSYNC_INTERVAL,
+            )
+            compression = (
+                self.configuration.get("compression") or COMPRESSION_NONE
+            )
+            encoder = get_encoder(
+                compression,
+                self.configuration.get("compression_level")
+                or DEFAULT_COMPRESSION_LEVEL,
+            )
+            spool_writer.write(
+                encoder.encode(transformed_data),
+                data_type,
+                subtype,
+                compression,
+            )
         except Exception as e:
             self.logger.error(f"Error while storing to disk: {e}")
             raise
 
+    def _store(self, file_name, data_type, subtype):
+        """Move a rotated spool file into its time partition.
+
+        The file is named after the time, a sequence number and the worker
+        (host and process) storing it, so that names never collide across
+        CE workers. The rename is atomic: readers never see a partial file.
+        It is then added to the manifest of the partition.
+
+        Args:
+            file_name (str): Path of the spool file
+            data_type (str): The type of data stored (None for webtx)
+            subtype (str): The subtype of data stored
+        """
+        obj_prefix = self.configuration.get("obj_prefix", "default")
+        fsync_policy = self.configuration.get("fsync_policy") or FSYNC_SEGMENT
+        index = DiskPartitionIndex(
+            self.configuration.get("storage_path"),
+            obj_prefix,
+            fsync_policy != FSYNC_NEVER,
+        )
+        stored_at = time.time()
+        partition = index.get_partition(stored_at)
+        name = (
+            f"{obj_prefix}_webtx_{int(stored_at)}_{next(_file_sequence):06d}_"
+            f"{socket.gethostname()}-{os.getpid()}"
+            f".txt{get_extension(file_name)}"
+        )
+        length = os.path.getsize(file_name)
+        records = count_records(file_name)
+        min_time = DiskSpoolWriter.get_start_time(file_name)
+        max_time = os.path.getmtime(file_name)
+        os.replace(file_name, path.join(partition, name))
+        if fsync_policy != FSYNC_NEVER:
+            sync_dir(partition)
+        index.add(partition, name, length, records, min_time, max_time)
+        self._sweep(index, stored_at)
+
+    def _sweep(self, index, now):
+        """Remove the partitions beyond retention, every SWEEP_INTERVAL.
+
+        Args:
+            index (DiskPartitionIndex): Partitions of the configuration
+            now (float): Current epoch time
+        """
+        retention_hours = self.configuration.get("retention_hours") or 0
+        retention_size = self.configuration.get("retention_size") or 0
+        key = (index.storage_path, index.obj_prefix)
+        if not (retention_hours or retention_size) or (
+            now - _last_sweeps.get(key, 0) < SWEEP_INTERVAL
+        ):
+            return
+        _last_sweeps[key] = now
+        try:
+            removed = index.sweep(retention_hours, retention_size)
+        except Exception as e:
+            self.logger.error(f"Error while removing expired files: {e}")
+            return
+        if removed:
+            self.logger.info(
+                f"Local Export Plugin: Removed {removed} file(s) beyond retention."
+            )
+
     def validate(self, configuration: dict) -> ValidationResult:
         """Validate the configuration parameters dict."""
+        try:
+            max_file_size = int(configuration.get("max_file_size"))
+        except (TypeError, ValueError):
+            max_file_size = 0
+        if not 0 < max_file_size <= 100:
+            self.logger.error(
+                "Local Export Plugin: Validation error occurred. Error: "
+                "Invalid Max File Size found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False, message="Invalid Max File Size provided."
+            )
+
+        try:
+            max_duration = int(configuration.get("max_duration"))
+        except (TypeError, ValueError):
+            max_duration = 0
+        if max_duration <= 0:
+            self.logger.error(
+                "Local Export Plugin: Validation error occurred. Error: "
+                "Invalid Max Duration found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False, message="Invalid Max Duration provided."
+            )
+
+        fsync_policy = configuration.get("fsync_policy") or FSYNC_SEGMENT
+        try:
+            fsync_interval = int(
+                configuration.get("fsync_interval") or DEFAULT_FSYNC_INTERVAL
+            )
+        except (TypeError, ValueError):
+            fsync_interval = 0
+        if fsync_policy not in FSYNC_POLICIES or fsync_interval <= 0:
+            self.logger.error(
+                "Local Export Plugin: Validation error occurred. Error: "
+                "Invalid Fsync Policy or Fsync Interval found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False,
+                message="Invalid Fsync Policy or Fsync Interval provided.",
+            )
+
+        for key, label in (
+            ("retention_hours", "Retention Period"),
+            ("retention_size", "Retention Size"),
+        ):
+            try:
+                valid = int(configuration.get(key) or 0) >= 0
+            except (TypeError, ValueError):
+                valid = False
+            if not valid:
+                self.logger.error(
+                    "Local Export Plugin: Validation error occurred. Error: "
+                    f"Invalid {label} found in the configuration parameters."
+                )
+                return ValidationResult(
+                    success=False, message=f"Invalid {label} provided."
+                )
+
+        compression = configuration.get("compression") or COMPRESSION_NONE
+        if compression != COMPRESSION_NONE:
+            try:
+                compression_level = int(
+                    configuration.get("compression_level")
+                    or DEFAULT_COMPRESSION_LEVEL
+                )
+            except (TypeError, ValueError):
+                compression_level = 0
+            low, high = COMPRESSION_LEVELS.get(compression, (1, 0))
+            if not low <= compression_level <= high or (
+                compression == COMPRESSION_ZSTD and zstandard is None
+            ):
+                self.logger.error(
+                    "Local Export Plugin: Validation error occurred. Error: "
+                    "Invalid Compression or Compression Level found in the configuration parameters."
+                )
+                return ValidationResult(
+                    success=False,
+                    message="Invalid Compression or Compression Level provided.",
+                )
+
         return ValidationResult(success=True, message="Validation successful.")
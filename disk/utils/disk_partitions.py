@@ -0,0 +1,240 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Local Export Plugin time partitioned storage layout."""
+
+
+import calendar
+import json
+import os
+import time
+
+from .disk_constants import (
+    BYTES_PER_GB,
+    MANIFEST_SUFFIX,
+    PARTITION_FORMAT,
+)
+from .disk_spool_writer import sync_dir
+
+
+class DiskPartitionIndex(object):
+    """Time partitioned directories of the stored files, with a manifest.
+
+    Stored files go into "<storage_path>/yyyy/mm/dd/hh" (UTC) after the
+    time they are stored at. Each partition gets an append-only JSON lines
+    manifest per object prefix, "<obj_prefix>_manifest.jsonl", with one
+    entry per file: name, byte range, record count and the time range in
+    which its data was received. Readers can seek to the partitions of a
+    time range and read their manifests without listing the files.
+
+    The manifests are also what the retention sweeper relies on, so it
+    only removes files of its own object prefix.
+    """
+
+    def __init__(self, storage_path, obj_prefix, fsync=True):
+        """Init method.
+
+        Args:
+            storage_path: Root directory of the partitions
+            obj_prefix: Object prefix of the stored files
+            fsync: Whether to sync the manifests to disk
+        """
+        self.storage_path = storage_path
+        self.obj_prefix = obj_prefix
+        self.fsync = fsync
+        self.manifest_name = f"{obj_prefix}{MANIFEST_SUFFIX}"
+
+    def get_partition(self, timestamp):
+        """To Get the partition directory of a time, creating it if needed.
+
+        Args:
+            timestamp: Epoch time
+
+        Returns:
+            Path of the partition directory
+        """
+        partition = os.path.join(
+            self.storage_path,
+            *time.strftime(PARTITION_FORMAT, time.gmtime(timestamp)).split("/"),
+        )
+        os.makedirs(partition, exist_ok=True)
+        return partition
+
+    def add(self, partition, file_name, length, records, min_time, max_time):
+        """To Append the entry of a stored file to the partition manifest.
+
+        Args:
+            partition: Path of the partition directory
+            file_name: Name of the stored file, in the partition
+            length: Size of the file
+            records: Number of records in the file
+            min_time: Epoch time at which its first record was received
+            max_time: Epoch time at which its last record was received
+        """
+        entry = {
+            "file": file_name,
+            "offset": 0,
+            "length": length,
+            "records": records,
+            "min_timestamp": int(min_time),
+            "max_timestamp": int(max_time),
+        }
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        # A single O_APPEND write keeps concurrent entries whole
+        fd = os.open(
+            os.path.join(partition, self.manifest_name),
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+            0o644,
+        )
+        try:
+            os.write(fd, line)
+            if self.fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self.fsync:
+            sync_dir(partition)
+
+    def read_manifest(self, partition):
+        """To Read the entries of the partition manifest.
+
+        Args:
+            partition: Path of the partition directory
+
+        Returns:
+            List of the manifest entries, oldest first
+        """
+        try:
+            with open(os.path.join(partition, self.manifest_name), "rb") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # Entry cut short by a power loss
+        return entries
+
+    def iter_partitions(self):
+        """To Iterate over the partitions holding a manifest of the prefix.
+
+        Yields:
+            Tuple of the epoch time at which the partition starts and the
+            path of the partition directory, oldest first
+        """
+        for year in self._list_numeric(self.storage_path):
+            for month in self._list_numeric(year):
+                for day in self._list_numeric(month):
+                    for hour in self._list_numeric(day):
+                        if not os.path.exists(
+                            os.path.join(hour, self.manifest_name)
+                        ):
+                            continue
+                        start = time.strptime(
+                            os.path.relpath(hour, self.storage_path),
+                            os.path.join(*PARTITION_FORMAT.split("/")),
+                        )
+                        yield calendar.timegm(start), hour
+
+    @staticmethod
+    def _list_numeric(directory):
+        """To List the numeric sub directories of a directory, sorted."""
+        try:
+            names = os.listdir(directory)
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+        return [
+            os.path.join(directory, name)
+            for name in sorted(filter(str.isdigit, names), key=int)
+        ]
+
+    def _remove_partition(self, partition):
+        """To Remove the files of the prefix from a partition.
+
+        The partition directory and its parents are removed once empty.
+
+        Returns:
+            Number of files removed
+        """
+        entries = self.read_manifest(partition)
+        for entry in entries:
+            try:
+                os.remove(os.path.join(partition, entry["file"]))
+            except FileNotFoundError:
+                pass
+        os.remove(os.path.join(partition, self.manifest_name))
+        directory = partition
+        while directory != self.storage_path:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break  # Not empty, e.g. files of another prefix
+            directory = os.path.dirname(directory)
+        return len(entries)
+
+    def sweep(self, retention_hours, retention_size):
+        """To Remove the oldest partitions beyond the retention limits.
+
+        Whole partitions are removed, the newest one is always kept.
+
+        Args:
+            retention_hours: Age (in hours) after which a partition is
+                removed, 0 to keep partitions regardless of their age
+            retention_size: Total size (in GBs) of the files of the prefix
+                above which the oldest partitions are removed, 0 for no limit
+
+        Returns:
+            Number of files removed
+        """
+        # The newest partition is never removed
+        partitions = list(self.iter_partitions())[:-1]
+        removed = 0
+        if retention_hours:
+            cutoff = time.time() - int(retention_hours) * 3600
+            while partitions and partitions[0][0] + 3600 <= cutoff:
+                removed += self._remove_partition(partitions.pop(0)[1])
+        if retention_size:
+            sizes = {
+                partition: sum(
+                    entry["length"] for entry in self.read_manifest(partition)
+                )
+                for _, partition in self.iter_partitions()
+            }
+            total = sum(sizes.values())
+            for _, partition in partitions:
+                if total <= int(retention_size) * BYTES_PER_GB:
+                    break
+                removed += self._remove_partition(partition)
+                total -= sizes[partition]
+        return removed
@@ -0,0 +1,448 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Local Export Plugin rolling spool writer."""
+
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from .disk_constants import (
+    BYTES_PER_MB,
+    DEFAULT_FSYNC_INTERVAL,
+    FSYNC_NEVER,
+    FSYNC_SEGMENT,
+    FSYNC_SIZE,
+    READY_SUFFIX,
+    SPOOL_CLAIM_TIMEOUT,
+    SPOOL_FLUSH_INTERVAL,
+    SPOOL_LOCK_FILE,
+    SPOOL_SUFFIX,
+    STORING_SUFFIX,
+)
+
+# Latest writer of each spool directory written by this process, flushed by
+# a background thread so that spools of idle keys are stored on time.
+_flush_writers = {}
+_flush_lock = threading.Lock()
+_flush_thread = None
+
+
+def _flush_loop():
+    """To Flush the registered spool writers every SPOOL_FLUSH_INTERVAL."""
+    while True:
+        time.sleep(SPOOL_FLUSH_INTERVAL)
+        with _flush_lock:
+            writers = list(_flush_writers.values())
+        for writer in writers:
+            try:
+                writer.flush()
+            except Exception as e:
+                writer.logger.error(
+                    f"Error while flushing spool {writer.spool_dir}: {e}"
+                )
+
+
+def _reset_flusher():
+    """To Forget the flush thread of the parent in a forked process."""
+    global _flush_lock, _flush_thread
+    _flush_writers.clear()
+    _flush_lock = threading.Lock()
+    _flush_thread = None
+
+
+os.register_at_fork(after_in_child=_reset_flusher)
+
+
+def sync_dir(dir_path):
+    """To Persist the renames done in a directory.
+
+    Args:
+        dir_path: Path of the directory
+    """
+    fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class DiskSpoolWriter(object):
+    """Rolling local spool of pushed chunks, one per (data_type, subtype).
+
+    A spool is rotated and stored as a single file once it reaches
+    max_file_size or gets older than max_duration. The state lives on disk
+    only, so spools left behind by a crashed or restarted worker are picked
+    up by the next push of the same configuration.
+
+    Active spools are named "<key>.<start_ns>.<committed>.spool", where
+    committed is the size of the fully written data; bytes of a partially
+    written push past it are truncated on recovery. Rotated spools are
+    named "<key>.<start_ns>.ready" until they are stored. A push raises if
+    the spool holding its data fails to store, so that it is retried.
+
+    A worker claims ready spools under the lock by renaming them to
+    "<key>.<start_ns>.<claim_ns>.storing", then stores them after releasing
+    it. Claims older than SPOOL_CLAIM_TIMEOUT, left by a crashed worker,
+    are claimed again.
+
+    Writers are also flushed every SPOOL_FLUSH_INTERVAL by a background
+    thread, so a spool is stored once it gets older than max_duration even
+    if no more data is pushed to it.
+
+    The fsync policy controls durability against power loss: FSYNC_SEGMENT
+    syncs a spool once when it is rotated, FSYNC_SIZE also syncs it every
+    fsync_interval MBs written, and FSYNC_NEVER leaves it to the kernel.
+    A process crash loses nothing with any of them.
+    """
+
+    def __init__(
+        self,
+        spool_dir,
+        max_file_size,
+        max_duration,
+        store,
+        logger,
+        fsync_policy=FSYNC_SEGMENT,
+        fsync_interval=DEFAULT_FSYNC_INTERVAL,
+    ):
+        """Init method.
+
+        Args:
+            spool_dir: Directory holding the spools of the configuration
+            max_file_size: Size (in MBs) after which a spool is stored
+            max_duration: Age (in seconds) after which a spool is stored
+            store: Callable(file_name, data_type, subtype) storing a spool
+            logger: Logger object
+            fsync_policy: FSYNC_SEGMENT, FSYNC_SIZE or FSYNC_NEVER
+            fsync_interval: MBs written between syncs with FSYNC_SIZE
+        """
+        self.spool_dir = spool_dir
+        self.max_file_size = int(max_file_size) * BYTES_PER_MB
+        self.max_duration = int(max_duration) * 1000000000
+        self.store = store
+        self.logger = logger
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = int(fsync_interval) * BYTES_PER_MB
+
+    @staticmethod
+    def get_spool_dir(root, *identifiers):
+        """To Get the spool directory of a destination.
+
+        Args:
+            root: Directory holding the spools of the plugin
+            identifiers: Configuration values identifying the destination
+
+        Returns:
+            Path of the spool directory
+        """
+        digest = hashlib.sha256(json.dumps(identifiers).encode("utf-8"))
+        return os.path.join(root, digest.hexdigest()[:16])
+
+    @staticmethod
+    def get_start_time(file_name):
+        """To Get the time at which data was first written to a spool.
+
+        Args:
+            file_name: Path of a ready spool
+
+        Returns:
+            Epoch time
+        """
+        return int(os.path.basename(file_name).split(".")[1]) / 1000000000
+
+    @staticmethod
+    def _encode_key(data_type, subtype, compression):
+        """To Encode the identity of a spool into a file name safe key.
+
+        The compression is part of the key, so that chunks encoded with
+        different codecs are never concatenated into the same spool.
+        """
+        key = json.dumps([data_type, subtype, compression])
+        return key.encode("utf-8").hex()
+
+    @staticmethod
+    def _decode_key(key):
+        """To Decode a spool key back into (data_type, subtype)."""
+        parts = json.loads(bytes.fromhex(key).decode("utf-8"))
+        return parts[0], parts[1]
+
+    @contextmanager
+    def _lock(self):
+        """To Hold the lock of the spool directory, shared across workers."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with open(os.path.join(self.spool_dir, SPOOL_LOCK_FILE), "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _list_spools(self):
+        """To List the spools of the spool directory.
+
+        Returns:
+            Tuple of the active spools, as a dict of key to
+            (start_ns, committed), and the names of the ready spools
+            (including stale claims)
+        """
+        active, ready = {}, []
+        stale = time.time_ns() - SPOOL_CLAIM_TIMEOUT * 1000000000
+        for name in os.listdir(self.spool_dir):
+            parts = name.split(".")
+            if name.endswith(SPOOL_SUFFIX) and len(parts) == 4:
+                active[parts[0]] = (int(parts[1]), int(parts[2]))
+            elif name.endswith(READY_SUFFIX) and len(parts) == 3:
+                ready.append(name)
+            elif name.endswith(STORING_SUFFIX) and len(parts) == 4:
+                if int(parts[2]) < stale:
+                    ready.append(name)
+        ready.sort(key=lambda name: int(name.split(".")[1]))
+        return active, ready
+
+    def _get_path(self, key, start, committed=None):
+        """To Get the path of an active (committed given) or ready spool."""
+        if committed is None:
+            name = f"{key}.{start}{READY_SUFFIX}"
+        else:
+            name = f"{key}.{start}.{committed}{SPOOL_SUFFIX}"
+        return os.path.join(self.spool_dir, name)
+
+    def _append(self, active, key, chunks):
+        """To Append the chunks to the active spool of the key.
+
+        Args:
+            active: Active spools, updated in place
+            key: Key of the spool
+            chunks: Iterable of bytes to be appended
+
+        Returns:
+            True if the spool was synced to disk
+        """
+        start, committed = active.get(key, (time.time_ns(), 0))
+        path = self._get_path(key, start, committed)
+        synced = False
+        with open(path, "ab") as spool:
+            # Unsynced data may be shorter than its name says after a power loss
+            committed = min(committed, os.fstat(spool.fileno()).st_size)
+            spool.truncate(committed)
+            spool.seek(committed)
+            for chunk in chunks:
+                spool.write(chunk)
+            spool.flush()
+            size = spool.tell()
+            if (
+                self.fsync_policy == FSYNC_SIZE
+                and size // self.fsync_interval > committed // self.fsync_interval
+            ):
+                os.fsync(spool.fileno())
+                synced = True
+        os.replace(path, self._get_path(key, start, size))
+        active[key] = (start, size)
+        return synced
+
+    def _rotate(self, key, start, committed):
+        """To Turn an active spool into a ready one.
+
+        Returns:
+            Name of the ready spool, None if the spool was empty
+        """
+        path = self._get_path(key, start, committed)
+        committed = min(committed, os.path.getsize(path))
+        if not committed:
+            os.remove(path)
+            return None
+        with open(path, "r+b") as spool:
+            spool.truncate(committed)
+            if self.fsync_policy != FSYNC_NEVER:
+                os.fsync(spool.fileno())
+        ready = self._get_path(key, start)
+        os.replace(path, ready)
+        return os.path.basename(ready)
+
+    def _rotate_due(self, active, ready, key=None):
+        """To Rotate the active spools which reached max_file_size or max_duration.
+
+        Must be called with the lock held.
+
+        Args:
+            active: Active spools
+            ready: Names of the ready spools, updated in place
+            key: Key of the spool holding the data of this push, if any
+
+        Returns:
+            Name of the ready spool holding the data of this push, if rotated
+        """
+        own = None
+        now = time.time_ns()
+        for active_key, (start, committed) in active.items():
+            if (
+                committed >= self.max_file_size
+                or now - start >= self.max_duration
+            ):
+                name = self._rotate(active_key, start, committed)
+                if name is not None:
+                    ready.append(name)
+                    if active_key == key:
+                        own = name
+        return own
+
+    def _register(self):
+        """To Register the writer for the background flush of its spool directory."""
+        global _flush_thread
+        with _flush_lock:
+            _flush_writers[self.spool_dir] = self
+            if _flush_thread is None:
+                _flush_thread = threading.Thread(
+                    target=_flush_loop, name="spool-flush", daemon=True
+                )
+                _flush_thread.start()
+
+    def _claim(self, ready):
+        """To Claim the ready spools for storing by this worker.
+
+        Must be called with the lock held.
+
+        Args:
+            ready: Names of the ready spools
+
+        Returns:
+            Dict of the names of the claimed spools to their new paths
+        """
+        claimed = {}
+        now = time.time_ns()
+        for name in ready:
+            key, start = name.split(".")[:2]
+            path = os.path.join(
+                self.spool_dir, f"{key}.{start}.{now}{STORING_SUFFIX}"
+            )
+            try:
+                os.replace(os.path.join(self.spool_dir, name), path)
+            except FileNotFoundError:  # Stale claim stored meanwhile
+                continue
+            claimed[name] = path
+        return claimed
+
+    def _release(self, claimed):
+        """To Give claimed spools back as ready ones, for a later retry."""
+        for path in claimed:
+            key, start = os.path.basename(path).split(".")[:2]
+            try:
+                os.replace(path, self._get_path(key, start))
+            except FileNotFoundError:  # Claimed again as stale meanwhile
+                pass
+
+    def _store_claimed(self, claimed, own=None):
+        """To Store the claimed spools, oldest first.
+
+        A spool that fails to store is kept on disk and retried by the
+        next push.
+
+        Args:
+            claimed: Paths of the claimed spools
+            own: Path of the claimed spool holding the data of this push
+
+        Raises:
+            Exception: When the spool holding the data of this push is not stored
+
+        Returns:
+            Number of spools stored
+        """
+        for count, path in enumerate(claimed):
+            data_type, subtype = self._decode_key(
+                os.path.basename(path).split(".")[0]
+            )
+            try:
+                self.store(path, data_type, subtype)
+            except Exception as e:
+                self.logger.error(
+                    f"Error while storing spooled data, {len(claimed) - count} "
+                    f"spool(s) kept in {self.spool_dir} for retry: {e}"
+                )
+                self._release(claimed[count:])
+                if own in claimed[count:]:
+                    raise
+                return count
+            if os.path.exists(path):  # Unless moved away by the store callable
+                os.remove(path)
+        return len(claimed)
+
+    def write(self, chunks, data_type, subtype, compression):
+        """To Spool the chunks and store the spools which are due.
+
+        The spools are rotated and claimed with the lock held, and stored
+        once it is released.
+
+        Args:
+            chunks: Iterable of bytes to be spooled
+            data_type: The type of data being pushed (None for webtx)
+            subtype: The subtype of data being pushed
+            compression: Compression the chunks are encoded with
+
+        Raises:
+            Exception: When the spool holding the data is not stored
+
+        Returns:
+            Number of files stored
+        """
+        with self._lock():
+            active, ready = self._list_spools()
+            pending = len(ready)
+            key = self._encode_key(data_type, subtype, compression)
+            synced = self._append(active, key, chunks)
+            own = self._rotate_due(active, ready, key)
+            rotated = len(ready) > pending
+            if synced or (rotated and self.fsync_policy != FSYNC_NEVER):
+                sync_dir(self.spool_dir)
+            claimed = self._claim(ready)
+        self._register()
+        return self._store_claimed(list(claimed.values()), claimed.get(own))
+
+    def flush(self):
+        """To Store the spools which are due, without spooling new data.
+
+        Returns:
+            Number of files stored
+        """
+        with self._lock():
+            active, ready = self._list_spools()
+            pending = len(ready)
+            self._rotate_due(active, ready)
+            if len(ready) > pending and self.fsync_policy != FSYNC_NEVER:
+                sync_dir(self.spool_dir)
+            claimed = self._claim(ready)
+        return self._store_claimed(list(claimed.values()))
@@ -44,8 +44,14 @@ from netskope.integrations.cls.plugin_base import (
     PushResult,
 )
 from .utils.elastic_client import (
+    ElasticBulkClient,
     ElasticClient,
 )
+from .utils.elastic_constants import (
+    DEFAULT_INDEX_NAME,
+    DELIVERY_MODE_TCP,
+    DELIVERY_MODES,
+)
 from .utils.elastic_helper import (
     get_elastic_mappings,
 )
@@ -67,6 +73,20 @@ class ElasticPlugin(PluginBase):
 
     def test_server_connectivity(self, configuration):
         """Tests whether the configured server is reachable or not."""
+        delivery_mode = configuration.get("delivery_mode", DELIVERY_MODE_TCP)
+        if delivery_mode != DELIVERY_MODE_TCP:
+            try:
+                ElasticBulkClient(
+                    configuration, self.logger, self.proxy, self.ssl_validation
+                ).test_connectivity()
+            except Exception as e:
+                self.logger.error(
+                    f"Elastic Plugin: Validation error occurred. "
+                    f"While establishing connection with server: {e}."
+                )
+                raise
+            return
+
         elastic_client = ElasticClient(configuration, self.logger)
         try:
             # Elastic Client
@@ -112,6 +132,29 @@ class ElasticPlugin(PluginBase):
                 success=False, message="Invalid Server port provided."
             )
 
+        delivery_mode = configuration.get("delivery_mode", DELIVERY_MODE_TCP)
+        if delivery_mode not in DELIVERY_MODES:
+            self.logger.error(
+                "Elastic Plugin: Validation error occurred. Error: "
+                "Invalid Delivery Mode found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False, message="Invalid Delivery Mode provided."
+            )
+
+        if delivery_mode != DELIVERY_MODE_TCP:
+            index_name = configuration.get("index_name") or DEFAULT_INDEX_NAME
+            if type(index_name) != str or not ecs_validator.validate_index_name(
+                index_name.strip()
+            ):
+                self.logger.error(
+                    "Elastic Plugin: Validation error occurred. Error: "
+                    "Invalid Index Name found in the configuration parameters."
+                )
+                return ValidationResult(
+                    success=False, message="Invalid Index Name provided."
+                )
+
         mappings = self.mappings.get("jsonData", None)
         mappings = json.loads(mappings)
         if type(mappings) != dict or not ecs_validator.validate_elastic_map(
@@ -148,7 +191,8 @@ class ElasticPlugin(PluginBase):
             return ValidationResult(
                 success=False,
                 message="Error occurred while establishing connection with Server. "
-                "Make sure you have provided correct Server Address and Port.",
+                "Make sure you have provided correct Server Address, Port "
+                "and credentials.",
             )
 
         return ValidationResult(success=True, message="Validation successful.")
@@ -165,23 +209,31 @@ class ElasticPlugin(PluginBase):
         Returns:
             PushResult: Result indicating ingesting outcome and message
         """
-        elastic_client = ElasticClient(self.configuration, self.logger)
+        delivery_mode = self.configuration.get(
+            "delivery_mode", DELIVERY_MODE_TCP
+        )
         try:
-            # Elastic Client
-            elastic_client.get_socket()
-
-            # Prepare data to push (String of events/alerts seperated by '\n'.
-            data = []
-            for json_data in transformed_data:
-                data.append(json.dumps(json_data))
-
-            final_data = "\n".join(data)
-            elastic_client.push_data(final_data)
+            if delivery_mode == DELIVERY_MODE_TCP:
+                # Events/alerts are streamed as JSON lines.
+                ElasticClient(self.configuration, self.logger).stream(
+                    transformed_data
+                )
+                return
+
+            failed = ElasticBulkClient(
+                self.configuration,
+                self.logger,
+                self.proxy,
+                self.ssl_validation,
+            ).bulk(transformed_data)
+            if failed:
+                self.logger.error(
+                    f"Elastic Plugin: {failed} record(s) could not be "
+                    "indexed and will be skipped."
+                )
         except Exception as e:
             self.logger.error(f"Error while pushing data: {e}")
             raise
-        finally:
-            elastic_client.close()
 
     def get_mapping_value_from_json_path(self, data, json_path):
         """To Fetch the value from given JSON object using given JSON path.
@@ -227,7 +279,19 @@ class ElasticPlugin(PluginBase):
         else:
             return mappings[subtype.upper()]
 
-    def get_headers(self, header_mappings, data, data_type, subtype):
+    def get_mapping_variables(self):
+        """To Resolve the values of the variables (e.g. $tenant_name) usable in header mappings.
+
+        Returns:
+            dict of variable name and its resolved value
+        """
+        helper = AlertsHelper()
+        tenant = helper.get_tenant_cls(self.source)
+        return {"$tenant_name": tenant.name}
+
+    def get_headers(
+        self, header_mappings, data, data_type, subtype, mapping_variables
+    ):
         """To Create a dictionary of ECS headers from given header mappings for given Netskope alert/event record.
 
         Args:
@@ -235,14 +299,12 @@ class ElasticPlugin(PluginBase):
             data_type: Data type for which the headers are being transformed
             header_mappings: ECS header mapping with Netskope fields
             data: The alert/event for which the ECS header is being generated
+            mapping_variables: Resolved values of the mapping variables (e.g. $tenant_name)
 
         Returns:
             header dict
         """
         headers = {}
-        helper = AlertsHelper()
-        tenant = helper.get_tenant_cls(self.source)
-        mapping_variables = {"$tenant_name": tenant.name}
 
         missing_fields = []
         # Iterate over mapped headers
@@ -401,6 +463,18 @@ class ElasticPlugin(PluginBase):
             self.logger,
         )
 
+        # Resolve the mapping variables once for the whole chunk
+        try:
+            mapping_variables = self.get_mapping_variables()
+        except Exception as err:
+            self.logger.error(
+                "[{}][{}]: Error occurred while resolving mapping variables: {}. "
+                "Transformation of current chunk will be skipped.".format(
+                    data_type, subtype, str(err)
+                )
+            )
+            return []
+
         for data in raw_data:
             # First retrieve the mapping of subtype being transformed
             try:
@@ -419,7 +493,11 @@ class ElasticPlugin(PluginBase):
             # Generating the ECS header
             try:
                 header = self.get_headers(
-                    subtype_mapping["header"], data, data_type, subtype
+                    subtype_mapping["header"],
+                    data,
+                    data_type,
+                    subtype,
+                    mapping_variables,
                 )
             except Exception as err:
                 self.logger.error(
@@ -0,0 +1,321 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Tests of the Elastic clients against a fake Elasticsearch."""
+
+
+import json
+import logging
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ..utils import elastic_client
+from ..utils.elastic_client import ElasticBulkClient, ElasticClient
+from ..utils.elastic_connection_pool import ElasticConnectionPool
+
+# Seconds to wait for the fake servers
+TIMEOUT = 10
+
+
+class FakeElasticsearch(BaseHTTPRequestHandler):
+    """Request handler answering like an Elasticsearch node.
+
+    GET requests are answered with the status in get_status. _bulk requests
+    are recorded in bulk_bodies and answered with the entries of
+    bulk_responses in turn: a status rejecting the whole request, or the
+    list of the statuses of its items. Once they are used up, every request
+    is accepted.
+    """
+
+    protocol_version = "HTTP/1.1"
+    get_status = 200
+    bulk_bodies = []
+    bulk_responses = []
+
+    def log_message(self, format, *args):
+        """To Keep the test output clean."""
+
+    def _send(self, status, body):
+        """To Send a JSON response."""
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        """To Answer the connectivity check."""
+        self._send(self.get_status, {"version": {"number": "8.0.0"}})
+
+    def do_POST(self):
+        """To Answer a _bulk request."""
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.bulk_bodies.append(body)
+        response = self.bulk_responses.pop(0) if self.bulk_responses else []
+        if isinstance(response, int):
+            return self._send(response, {"error": "rejected"})
+        items = [
+            {
+                "create": {
+                    "status": status,
+                    "error": {"type": "error_{}".format(status)},
+                }
+            }
+            for status in response
+        ]
+        self._send(
+            200, {"errors": any(status >= 300 for status in response),
+                  "items": items}
+        )
+
+
+class TCPSink(object):
+    """TCP server recording the lines received on each connection."""
+
+    def __init__(self):
+        """Init method."""
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.address = self.sock.getsockname()
+        self.connections = []
+        self.condition = threading.Condition()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            lines = []
+            with self.condition:
+                self.connections.append((conn, lines))
+            threading.Thread(
+                target=self._serve, args=(conn, lines), daemon=True
+            ).start()
+
+    def _serve(self, conn, lines):
+        with conn:
+            for line in conn.makefile("rb"):
+                with self.condition:
+                    lines.append(json.loads(line))
+                    self.condition.notify_all()
+
+    def wait_for_lines(self, count):
+        """To Wait until given number of lines were received in total."""
+        with self.condition:
+            assert self.condition.wait_for(
+                lambda: sum(len(lines) for _, lines in self.connections)
+                >= count,
+                TIMEOUT,
+            )
+
+    def close(self):
+        """To Stop accepting connections."""
+        self.sock.close()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Fake Elasticsearch listening on a free local port."""
+    FakeElasticsearch.get_status = 200
+    FakeElasticsearch.bulk_bodies = []
+    FakeElasticsearch.bulk_responses = []
+    monkeypatch.setattr(elastic_client, "BULK_RETRY_BACKOFF", 0)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeElasticsearch)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    """_bulk client of the fake Elasticsearch."""
+    return ElasticBulkClient(
+        {
+            "delivery_mode": "HTTP",
+            "server_address": "127.0.0.1",
+            "server_port": server.server_address[1],
+            "index_name": "netskope",
+        },
+        logging.getLogger(__name__),
+    )
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    """TCP sink, with a connection pool of its own."""
+    monkeypatch.setattr(
+        elastic_client, "connection_pool", ElasticConnectionPool()
+    )
+    tcp_sink = TCPSink()
+    yield tcp_sink
+    tcp_sink.close()
+
+
+@pytest.fixture
+def stream_client(sink):
+    """TCP client of the sink."""
+    return ElasticClient(
+        {"server_address": sink.address[0], "server_port": sink.address[1]},
+        logging.getLogger(__name__),
+    )
+
+
+def _bulk_documents(body):
+    """To Parse the documents of a _bulk request body."""
+    return [json.loads(line) for line in body.splitlines()[1::2]]
+
+
+def test_connectivity(client):
+    """A 2xx response passes the connectivity check."""
+    client.test_connectivity()
+
+
+@pytest.mark.parametrize("status", [301, 401, 403, 404, 429, 500, 503])
+def test_connectivity_error(server, client, status):
+    """Every response other than 2xx fails the connectivity check."""
+    FakeElasticsearch.get_status = status
+    with pytest.raises(Exception, match="(?i)status code: {}".format(status)):
+        client.test_connectivity()
+
+
+def test_bulk_wire_format(server, client):
+    """Documents reach Elasticsearch as compact UTF-8 JSON lines."""
+    documents = [
+        {"city": "São Paulo", "score": float("nan")},
+        {"n": 2, "values": [1.5, float("inf")]},
+    ]
+    assert client.bulk(documents) == 0
+    assert FakeElasticsearch.bulk_bodies == [
+        '{"create":{}}\n{"city":"São Paulo","score":null}\n'
+        '{"create":{}}\n{"n":2,"values":[1.5,null]}\n'.encode("utf-8")
+    ]
+
+
+def test_bulk_item_errors_reported(server, client):
+    """Items rejected for good are counted and are not sent again."""
+    FakeElasticsearch.bulk_responses = [[201, 400, 201]]
+
+    assert client.bulk([{"n": 0}, {"n": 1}, {"n": 2}]) == 1
+    assert len(FakeElasticsearch.bulk_bodies) == 1
+
+
+def test_bulk_item_retry(server, client):
+    """Only the items rejected with a retryable status are sent again."""
+    FakeElasticsearch.bulk_responses = [[201, 429, 201, 503], [201, 201]]
+
+    assert client.bulk([{"n": index} for index in range(4)]) == 0
+    assert [
+        _bulk_documents(body) for body in FakeElasticsearch.bulk_bodies
+    ] == [
+        [{"n": 0}, {"n": 1}, {"n": 2}, {"n": 3}],
+        [{"n": 1}, {"n": 3}],
+    ]
+
+
+def test_bulk_item_retries_exhausted(server, client):
+    """Items still rejected after the retries are counted as failed."""
+    FakeElasticsearch.bulk_responses = [[201, 429]] + [[429]] * 10
+
+    assert client.bulk([{"n": 0}, {"n": 1}]) == 1
+    assert (
+        len(FakeElasticsearch.bulk_bodies)
+        == elastic_client.BULK_MAX_RETRIES + 1
+    )
+
+
+def test_bulk_request_429_retried(server, client):
+    """A _bulk request rejected with 429 is sent again."""
+    FakeElasticsearch.bulk_responses = [429, 429]
+
+    assert client.bulk([{"n": 0}]) == 0
+    assert len(FakeElasticsearch.bulk_bodies) == 3
+    assert len(set(FakeElasticsearch.bulk_bodies)) == 1
+
+
+def test_bulk_request_429_retries_exhausted(server, client):
+    """A _bulk request still rejected after the retries raises."""
+    FakeElasticsearch.bulk_responses = [429] * 10
+
+    with pytest.raises(Exception, match="Status Code: 429"):
+        client.bulk([{"n": 0}])
+    assert (
+        len(FakeElasticsearch.bulk_bodies)
+        == elastic_client.BULK_MAX_RETRIES + 1
+    )
+
+
+def test_stream_reuses_connection(sink, stream_client):
+    """Consecutive pushes are written as JSON lines on one connection."""
+    assert stream_client.stream([{"n": 0}, {"n": 1}]) == 2
+    assert stream_client.stream([{"n": 2}]) == 1
+
+    sink.wait_for_lines(3)
+    assert [lines for _, lines in sink.connections] == [
+        [{"n": 0}, {"n": 1}, {"n": 2}]
+    ]
+
+
+def test_stream_reconnects_after_close_by_peer(sink, stream_client):
+    """A pooled connection closed by the server is replaced."""
+    stream_client.stream([{"n": 0}])
+    sink.wait_for_lines(1)
+    sink.connections[0][0].shutdown(socket.SHUT_RDWR)
+
+    stream_client.stream([{"n": 1}])
+
+    sink.wait_for_lines(2)
+    assert [lines for _, lines in sink.connections] == [
+        [{"n": 0}],
+        [{"n": 1}],
+    ]
+
+
+def test_stream_reconnects_after_failed_write(sink, stream_client):
+    """A batch which cannot be written is written again on a new connection."""
+    broken = socket.create_connection(sink.address)
+    broken.shutdown(socket.SHUT_WR)
+    elastic_client.connection_pool.release(stream_client.destination, broken)
+
+    assert stream_client.stream([{"n": 0}, {"n": 1}]) == 2
+
+    sink.wait_for_lines(2)
+    assert [lines for _, lines in sink.connections] == [
+        [],
+        [{"n": 0}, {"n": 1}],
+    ]
@@ -0,0 +1,109 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Tests of the Elastic NDJSON serializer."""
+
+
+import json
+
+import pytest
+
+from ..utils import elastic_serializer
+from ..utils.elastic_serializer import NDJSONSerializer, dumps
+
+DOCUMENTS = [
+    {"user": "bob@example.com", "count": 3, "score": 1.5, "ok": True},
+    {"city": "São Paulo", "name": "日本語", "emoji": "😀", "none": None},
+    {"quote": 'a "b" \\ c', "control": "line\nbreak\ttab\x00\x1f"},
+    {"nested": {"list": [1, "two", {"three": [3.25, False]}]}, "empty": {}},
+    {"nan": float("nan"), "inf": [float("inf"), -float("inf")], "f": 0.5},
+    {"big": 2 ** 70, "negative": -(2 ** 63)},
+    {1: "int key", "k": []},
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def serializer_module(request, monkeypatch):
+    """The serializer module, with and without orjson."""
+    if request.param == "orjson":
+        if elastic_serializer.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(elastic_serializer, "orjson", None)
+    return elastic_serializer
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_dumps_wire_format(serializer_module, document):
+    """Both paths write compact UTF-8 JSON with NaN and Infinity as null."""
+    line = serializer_module.dumps(document)
+    text = line.decode("utf-8")
+    assert ", " not in text and ": " not in text
+    assert "NaN" not in text and "Infinity" not in text
+    assert "\\u00e3" not in text and "\\ud83d" not in text
+    expected = json.loads(
+        json.dumps(document),
+        parse_constant=lambda constant: None,
+    )
+    assert json.loads(text) == expected
+
+
+def test_dumps_same_bytes_with_and_without_orjson(monkeypatch):
+    """orjson and the json fallback put the same bytes on the wire."""
+    if elastic_serializer.orjson is None:
+        pytest.skip("orjson is not installed")
+    expected = [dumps(document) for document in DOCUMENTS]
+    monkeypatch.setattr(elastic_serializer, "orjson", None)
+    assert [dumps(document) for document in DOCUMENTS] == expected
+
+
+def test_dumps_fallback(monkeypatch):
+    """The json fallback writes the exact orjson output."""
+    monkeypatch.setattr(elastic_serializer, "orjson", None)
+    assert dumps(DOCUMENTS[1]) == (
+        '{"city":"São Paulo","name":"日本語","emoji":"😀","none":null}'
+    ).encode("utf-8")
+    assert dumps(DOCUMENTS[4]) == b'{"nan":null,"inf":[null,null],"f":0.5}'
+    # Lone surrogates can not be encoded in UTF-8, so they are escaped
+    assert dumps({"s": "\ud800"}) == b'{"s":"\\ud800"}'
+
+
+def test_iter_batches():
+    """Batches are bounded in size and hold every document once."""
+    serializer = NDJSONSerializer(64, b'{"create":{}}\n')
+    documents = [{"n": n, "value": "x" * n} for n in range(20)]
+    lines = []
+    for batch in serializer.iter_batches(documents):
+        assert len(batch) <= 64 or len(serializer) == 1
+        lines.extend(bytes(batch).split(b"\n")[:-1])
+    assert lines[0::2] == [b'{"create":{}}'] * len(documents)
+    assert [json.loads(line) for line in lines[1::2]] == documents
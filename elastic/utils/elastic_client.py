@@ -34,36 +34,110 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
 import socket
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from netskope.common.utils import add_user_agent
+
+from .elastic_connection_pool import connection_pool
+from .elastic_serializer import NDJSONSerializer
+from .elastic_constants import (
+    BULK_BATCH_SIZE,
+    BULK_FILTER_PATH,
+    BULK_MAX_RETRIES,
+    BULK_REQUEST_TIMEOUT,
+    BULK_RETRY_BACKOFF,
+    BULK_RETRY_STATUS_CODES,
+    DEFAULT_INDEX_NAME,
+    MAX_CACHED_SESSIONS,
+    SOCKET_TIMEOUT,
+    TCP_BATCH_SIZE,
+)
+
+# Action line preceding every document of a _bulk request. "create" works
+# for both regular indices and data streams.
+BULK_ACTION = b'{"create":{}}\n'
+
+# HTTP sessions are shared by every instance of the plugin in this process,
+# so that the connections to Elasticsearch are kept alive across pushes.
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
 
 
 class ElasticClient:
-    """Elastic Client."""
+    """Elastic Client streaming JSON lines over TCP."""
 
     def __init__(self, configuration: dict, logger):
         """Initialize."""
         self.configuration = configuration
         self.logger = logger
+        self.destination = (
+            configuration["server_address"],
+            configuration["server_port"],
+        )
+
+    def _connect(self):
+        """To Open a new TCP connection to the configured server.
+
+        Returns:
+            Connected socket
+        """
+        return socket.create_connection(
+            self.destination, timeout=SOCKET_TIMEOUT
+        )
 
     def get_socket(self):
         """To Get TCP socket."""
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect(
-                (
-                    self.configuration["server_address"],
-                    self.configuration["server_port"],
-                )
-            )
+            self.sock = self._connect()
         except Exception as e:
             self.logger.error(f"Error while connection to server: {e}")
             raise
 
     def push_data(self, data):
         """To Push the data to TCP server."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.sock.sendall(data)
+
+    def stream(self, documents):
+        """To Write given documents as JSON lines over a pooled TCP connection.
+
+        The documents are written in size bounded batches. If a batch cannot
+        be written, the connection is replaced once and the batch is
+        written again.
+
+        Args:
+            documents: Iterable of JSON serializable documents
+
+        Returns:
+            Number of documents written
+        """
+        sock = connection_pool.acquire(self.destination, self._connect)
+        serializer = NDJSONSerializer(TCP_BATCH_SIZE)
+        sent = 0
         try:
-            self.sock.send(bytes(data, encoding="utf-8"))
+            for buffer in serializer.iter_batches(documents):
+                try:
+                    sock.sendall(buffer)
+                except OSError as e:
+                    connection_pool.discard(sock)
+                    sock = None
+                    self.logger.info(
+                        f"Elastic Plugin: Connection to server lost: {e}. "
+                        "Reconnecting."
+                    )
+                    sock = self._connect()
+                    sock.sendall(buffer)
+                sent += len(serializer)
         except Exception:
+            if sock is not None:
+                connection_pool.discard(sock)
             raise
+        connection_pool.release(self.destination, sock)
+        return sent
 
     def close(self):
         """To Close socket connection."""
@@ -73,3 +147,198 @@ class ElasticClient:
             self.logger.error(
                 f"Elastic Plugin: Error while Closing socket connection: {e}"
             )
+
+
+class ElasticBulkClient:
+    """Elastic Client indexing documents with the _bulk API."""
+
+    def __init__(
+        self, configuration: dict, logger, proxy=None, ssl_validation=True
+    ):
+        """Initialize."""
+        self.configuration = configuration
+        self.logger = logger
+        self.proxy = proxy or {}
+        self.ssl_validation = ssl_validation
+        scheme = configuration["delivery_mode"].lower()
+        address = configuration["server_address"].strip().strip("/")
+        self.base_url = (
+            f"{scheme}://{address}:{configuration['server_port']}"
+        )
+        index_name = (
+            configuration.get("index_name") or DEFAULT_INDEX_NAME
+        ).strip()
+        self.url = f"{self.base_url}/{index_name}/_bulk"
+        username = (configuration.get("username") or "").strip()
+        self.auth = (
+            (username, configuration.get("password") or "")
+            if username
+            else None
+        )
+
+    def _get_session(self):
+        """To Get the keep-alive HTTP session of the configured endpoint.
+
+        Returns:
+            requests.Session shared across pushes
+        """
+        key = (
+            self.base_url,
+            self.auth,
+            self.ssl_validation,
+            tuple(sorted(self.proxy.items())),
+        )
+        evicted = []
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is not None:
+                _sessions.move_to_end(key)
+                return session
+            session = requests.Session()
+            session.auth = self.auth
+            session.verify = self.ssl_validation
+            session.proxies.update(self.proxy)
+            session.headers.update(
+                add_user_agent({"Content-Type": "application/x-ndjson"})
+            )
+            _sessions[key] = session
+            while len(_sessions) > MAX_CACHED_SESSIONS:
+                evicted.append(_sessions.popitem(last=False)[1])
+
+        for evicted_session in evicted:
+            evicted_session.close()
+        return session
+
+    def _raise_for_status(self, response, api="_bulk"):
+        """To Raise an error if given response is not successful (2xx).
+
+        Args:
+            response: requests.Response of the request
+            api: Name of the requested API, for the error message
+        """
+        status_code = response.status_code
+        if 200 <= status_code < 300:
+            return
+        response_body = response.text
+        if status_code == 429:
+            raise Exception(
+                "Elasticsearch is rejecting requests as its write queue is "
+                f"full. Status Code: {status_code}. Response: {response_body}"
+            )
+        elif status_code >= 500:
+            raise Exception(
+                f"Server Error : Status Code: {status_code}. "
+                f"Response: {response_body}"
+            )
+        elif status_code in [401, 403]:
+            raise Exception(
+                f"Invalid Authorization. Status code: {status_code}. "
+                f"Response: {response_body}"
+            )
+        raise Exception(
+            f"Invalid {api} request. Status code: {status_code}. "
+            f"Response: {response_body}"
+        )
+
+    def _post(self, body):
+        """To Send given _bulk request body, retrying while Elasticsearch pushes back.
+
+        Args:
+            body: NDJSON body of the _bulk request
+
+        Returns:
+            Parsed _bulk response
+        """
+        session = self._get_session()
+        for attempt in range(BULK_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(BULK_RETRY_BACKOFF * 2 ** (attempt - 1))
+            try:
+                response = session.post(
+                    self.url,
+                    params={"filter_path": BULK_FILTER_PATH},
+                    data=body,
+                    timeout=BULK_REQUEST_TIMEOUT,
+                )
+            except requests.exceptions.ConnectionError as e:
+                if attempt == BULK_MAX_RETRIES:
+                    raise
+                self.logger.info(
+                    f"Elastic Plugin: Connection error occurred while "
+                    f"calling the _bulk API: {e}. Retrying."
+                )
+                continue
+            if response.status_code not in BULK_RETRY_STATUS_CODES:
+                break
+            self.logger.info(
+                f"Elastic Plugin: The _bulk API responded with status code "
+                f"{response.status_code}. Retrying."
+            )
+        self._raise_for_status(response)
+        return response.json()
+
+    def _send_batch(self, serializer):
+        """To Index the batch in given serializer, sending the documents rejected with a retryable status again.
+
+        Args:
+            serializer: NDJSONSerializer holding the batch
+
+        Returns:
+            Number of documents which could not be indexed
+        """
+        failed = 0
+        body = serializer.buffer
+        indexes = range(len(serializer))
+        for attempt in range(BULK_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(BULK_RETRY_BACKOFF * 2 ** (attempt - 1))
+            result = self._post(body)
+            if not result.get("errors"):
+                return failed
+
+            retry = []
+            errors = []
+            for index, item in zip(indexes, result.get("items", [])):
+                outcome = next(iter(item.values()), {})
+                status = outcome.get("status", 0)
+                if status in BULK_RETRY_STATUS_CODES:
+                    retry.append(index)
+                elif status >= 300:
+                    errors.append(outcome.get("error"))
+            if errors:
+                failed += len(errors)
+                self.logger.error(
+                    f"Elastic Plugin: {len(errors)} document(s) were "
+                    f"rejected by Elasticsearch. Error: {errors[0]}"
+                )
+            if not retry:
+                return failed
+            indexes = retry
+            body = b"".join(serializer.get_line(index) for index in retry)
+        self.logger.error(
+            f"Elastic Plugin: {len(indexes)} document(s) were still rejected "
+            f"after {BULK_MAX_RETRIES} retries."
+        )
+        return failed + len(indexes)
+
+    def bulk(self, documents):
+        """To Index given documents with the _bulk API in size bounded batches.
+
+        Args:
+            documents: Iterable of JSON serializable documents
+
+        Returns:
+            Number of documents which could not be indexed
+        """
+        serializer = NDJSONSerializer(BULK_BATCH_SIZE, BULK_ACTION)
+        failed = 0
+        for _ in serializer.iter_batches(documents):
+            failed += self._send_batch(serializer)
+        return failed
+
+    def test_connectivity(self):
+        """To Check that the endpoint is reachable with the configured credentials."""
+        response = self._get_session().get(
+            self.base_url, timeout=BULK_REQUEST_TIMEOUT
+        )
+        self._raise_for_status(response, "connectivity check")
@@ -0,0 +1,195 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Elastic Plugin connection pool."""
+
+
+import select
+import socket
+import threading
+import time
+
+from .elastic_constants import (
+    CONNECTION_IDLE_TIMEOUT,
+    MAX_IDLE_CONNECTIONS,
+)
+
+
+def is_connection_alive(sock):
+    """To Check whether given socket can still be written to.
+
+    A TCP input of Logstash never sends data back. So a socket that is
+    readable has either been closed by the peer or is in an unexpected
+    state. Either way it must not be reused.
+
+    Args:
+        sock: The socket to be checked
+
+    Returns:
+        True if the connection can be reused, False otherwise
+    """
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        return not readable
+    except (OSError, ValueError):
+        return False
+
+
+def close_socket(sock):
+    """To Close given socket, ignoring any error raised while doing so.
+
+    Args:
+        sock: The socket to be closed
+    """
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    try:
+        sock.close()
+    except OSError:
+        pass
+
+
+class ElasticConnectionPool(object):
+    """Pool of TCP connections kept alive across pushes, per destination."""
+
+    def __init__(
+        self,
+        idle_timeout=CONNECTION_IDLE_TIMEOUT,
+        max_idle_connections=MAX_IDLE_CONNECTIONS,
+    ):
+        """Init method.
+
+        Args:
+            idle_timeout: Seconds after which an unused connection is closed
+            max_idle_connections: Max unused connections kept per destination
+        """
+        self.idle_timeout = idle_timeout
+        self.max_idle_connections = max_idle_connections
+        self._idle = {}  # destination -> list of (socket, last used time)
+        self._lock = threading.Lock()
+
+    def _pop_expired(self, now):
+        """To Remove the connections idle for longer than idle_timeout.
+
+        Must be called with the lock held.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            List of removed sockets
+        """
+        expired = []
+        for destination in list(self._idle):
+            connections = self._idle[destination]
+            alive = []
+            for sock, last_used in connections:
+                if now - last_used > self.idle_timeout:
+                    expired.append(sock)
+                else:
+                    alive.append((sock, last_used))
+            if alive:
+                self._idle[destination] = alive
+            else:
+                del self._idle[destination]
+        return expired
+
+    def acquire(self, destination, factory):
+        """To Fetch a healthy connection to given destination, creating one if needed.
+
+        The returned socket is owned by the caller until it is handed back
+        with release() or discard().
+
+        Args:
+            destination: Hashable key identifying the destination
+            factory: Callable creating a new connected socket
+
+        Returns:
+            Connected socket
+        """
+        sock = None
+        with self._lock:
+            stale = self._pop_expired(time.monotonic())
+            connections = self._idle.get(destination, [])
+            while connections:
+                candidate, _ = connections.pop()
+                if is_connection_alive(candidate):
+                    sock = candidate
+                    break
+                stale.append(candidate)
+
+        for stale_sock in stale:
+            close_socket(stale_sock)
+
+        if sock is None:
+            sock = factory()
+        return sock
+
+    def release(self, destination, sock):
+        """To Hand back a connection for later reuse.
+
+        Args:
+            destination: Hashable key identifying the destination
+            sock: The socket obtained from acquire()
+        """
+        surplus = []
+        with self._lock:
+            connections = self._idle.setdefault(destination, [])
+            connections.append((sock, time.monotonic()))
+            while len(connections) > self.max_idle_connections:
+                surplus.append(connections.pop(0)[0])
+
+        for surplus_sock in surplus:
+            close_socket(surplus_sock)
+
+    def discard(self, sock):
+        """To Close a connection which must not be reused.
+
+        Args:
+            sock: The socket obtained from acquire()
+        """
+        close_socket(sock)
+
+    def close_all(self):
+        """Close every idle connection of the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+
+        for connections in idle.values():
+            for sock, _ in connections:
+                close_socket(sock)
+
+
+# Connections are shared by every instance of the plugin in this process.
+connection_pool = ElasticConnectionPool()
@@ -58,3 +58,38 @@ SEVERITY_MAP = {
     "9": SEVERITY_VERY_HIGH,
     "10": SEVERITY_VERY_HIGH,
 }
+
+DELIVERY_MODE_TCP = "TCP"
+DELIVERY_MODE_HTTP = "HTTP"
+DELIVERY_MODE_HTTPS = "HTTPS"
+DELIVERY_MODES = [DELIVERY_MODE_TCP, DELIVERY_MODE_HTTP, DELIVERY_MODE_HTTPS]
+DEFAULT_INDEX_NAME = "netskope-ce"
+# Characters Elasticsearch does not allow in an index name
+INVALID_INDEX_NAME_CHARS = set('\\/*?"<>| ,#:')
+MAX_INDEX_NAME_LENGTH = 255
+
+# Max size in bytes of the JSON lines written to the TCP stream at once
+TCP_BATCH_SIZE = 1024 * 1024
+# Seconds after which a blocked TCP send or connect is given up
+SOCKET_TIMEOUT = 60
+# Seconds after which an unused pooled TCP connection is closed
+CONNECTION_IDLE_TIMEOUT = 300
+# Max unused TCP connections kept open per destination
+MAX_IDLE_CONNECTIONS = 8
+
+# Max size in bytes of the body of a single _bulk request
+BULK_BATCH_SIZE = 5 * 1024 * 1024
+# Seconds to wait for a response of a _bulk request
+BULK_REQUEST_TIMEOUT = 120
+# Status codes for which a _bulk request or a rejected document is retried
+BULK_RETRY_STATUS_CODES = (429, 502, 503, 504)
+BULK_MAX_RETRIES = 3
+# Seconds to wait before the first retry, doubled for each next retry
+BULK_RETRY_BACKOFF = 2
+# Only the fields needed to find the rejected documents are returned
+BULK_FILTER_PATH = "errors,items.*.status,items.*.error"
+# Max HTTP sessions kept alive, one per Elasticsearch endpoint
+MAX_CACHED_SESSIONS = 16
+
+# Max nesting templates kept per ECS generator, one per distinct set of fields
+NESTING_TEMPLATE_CACHE_SIZE = 1024
@@ -0,0 +1,180 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Elastic Plugin NDJSON serializer."""
+
+
+import json
+import math
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Encoders writing what orjson writes: compact separators, UTF-8 and no
+# NaN or Infinity, created once instead of for every call
+_json_encoder = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), allow_nan=False
+)
+# For strings which can not be encoded in UTF-8, i.e. lone surrogates
+_ascii_json_encoder = json.JSONEncoder(
+    separators=(",", ":"), allow_nan=False
+)
+
+
+def _replace_non_finite(document):
+    """To Replace NaN and Infinity in given document with None, as orjson does.
+
+    Args:
+        document: JSON serializable document
+
+    Returns:
+        Document without NaN and Infinity
+    """
+    if isinstance(document, float):
+        return document if math.isfinite(document) else None
+    if isinstance(document, dict):
+        return {
+            key: _replace_non_finite(value) for key, value in document.items()
+        }
+    if isinstance(document, (list, tuple)):
+        return [_replace_non_finite(value) for value in document]
+    return document
+
+
+def dumps(document):
+    """To Serialize given document into UTF-8 encoded JSON.
+
+    orjson is used when it is installed. Documents it cannot serialize,
+    e.g. integers larger than 64 bits, are serialized with the json module,
+    which writes the same output: no whitespace, non-ASCII characters as
+    they are and NaN and Infinity as null, since Elasticsearch rejects
+    them. Only some floats are written in another notation, e.g. "1e+16"
+    instead of "1e16", which is the same JSON number.
+
+    Args:
+        document: JSON serializable document
+
+    Returns:
+        Serialized document
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(document, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    try:
+        serialized = _json_encoder.encode(document)
+    except ValueError:
+        document = _replace_non_finite(document)
+        serialized = _json_encoder.encode(document)
+    try:
+        return serialized.encode("utf-8")
+    except UnicodeEncodeError:
+        return _ascii_json_encoder.encode(document).encode("utf-8")
+
+
+class NDJSONSerializer(object):
+    """Serializer writing documents as JSON lines into a reusable buffer."""
+
+    def __init__(self, max_batch_size, action=b""):
+        """Init method.
+
+        Args:
+            max_batch_size: Max size in bytes of the buffer, unless a
+                single line is larger
+            action: Line written before every document, e.g. the action of
+                a _bulk request
+        """
+        self.max_batch_size = max_batch_size
+        self.action = action
+        self.buffer = bytearray()
+        self.offsets = []  # start offset of every line in the buffer
+
+    def __len__(self):
+        """To Get the number of documents in the buffer."""
+        return len(self.offsets)
+
+    def clear(self):
+        """To Empty the buffer."""
+        del self.buffer[:]
+        del self.offsets[:]
+
+    def get_line(self, index):
+        """To Get the serialized document at given index of the buffer.
+
+        Args:
+            index: Index of the document in the buffer
+
+        Returns:
+            The document line, including the action line and newline
+        """
+        end = (
+            self.offsets[index + 1]
+            if index + 1 < len(self.offsets)
+            else len(self.buffer)
+        )
+        return bytes(self.buffer[self.offsets[index]:end])
+
+    def iter_batches(self, documents):
+        """To Serialize given documents, yielding the buffer every time it is full.
+
+        The yielded buffer is emptied and refilled once the iteration is
+        resumed, so it must be consumed before that.
+
+        Args:
+            documents: Iterable of JSON serializable documents
+
+        Yields:
+            Buffer holding newline terminated documents
+        """
+        self.clear()
+        buffer = self.buffer
+        offsets = self.offsets
+        action = self.action
+        for document in documents:
+            line = dumps(document)
+            if (
+                offsets
+                and len(buffer) + len(action) + len(line) + 1
+                > self.max_batch_size
+            ):
+                yield buffer
+                self.clear()
+            offsets.append(len(buffer))
+            buffer += action
+            buffer += line
+            buffer += b"\n"
+        if offsets:
+            yield buffer
+            self.clear()
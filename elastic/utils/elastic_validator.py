@@ -38,6 +38,11 @@ import csv
 from jsonschema import validate
 from jsonschema.exceptions import ValidationError as JsonSchemaValidationError
 
+from .elastic_constants import (
+    INVALID_INDEX_NAME_CHARS,
+    MAX_INDEX_NAME_LENGTH,
+)
+
 
 class ElasticValidator(object):
     """Elastic validator class."""
@@ -47,6 +52,25 @@ class ElasticValidator(object):
         super().__init__()
         self.logger = logger
 
+    def validate_index_name(self, index_name):
+        """Validate Elasticsearch index name.
+
+        Args:
+            index_name: the index name to be validated
+
+        Returns:
+            Whether the provided value is valid or not. True in case of valid value, False otherwise
+        """
+        if (
+            not index_name
+            or len(index_name.encode("utf-8")) > MAX_INDEX_NAME_LENGTH
+            or index_name in (".", "..")
+            or index_name[0] in "-_+"
+            or index_name != index_name.lower()
+        ):
+            return False
+        return not INVALID_INDEX_NAME_CHARS.intersection(index_name)
+
     def validate_server_port(self, server_port):
         """Validate server port.
 
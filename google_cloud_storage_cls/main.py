@@ -33,9 +33,7 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """GCP Storage Plugin."""
 
 
-import os
 from typing import List
-from tempfile import NamedTemporaryFile
 from netskope.integrations.cls.plugin_base import PluginBase, ValidationResult
 from .utils.gcp_validator import (
     GCPValidator,
@@ -43,6 +41,15 @@ from .utils.gcp_validator import (
 from .utils.gcp_client import (
     GCPClient,
 )
+from .utils.gcp_constant import (
+    COMPRESSION_NONE,
+    DEFAULT_COMPRESSION_LEVEL,
+    DEFAULT_MAX_SPOOL_SIZE,
+    DEFAULT_UPLOAD_CHUNK_SIZE,
+    SPOOL_DIRECTORY,
+)
+from .utils.gcp_encoder import get_encoder
+from .utils.gcp_spool_writer import GCPSpoolWriter
 
 
 class GCPStoragePlugin(PluginBase):
@@ -57,19 +64,34 @@ class GCPStoragePlugin(PluginBase):
         """
         try:
             gcp_client = GCPClient(self.configuration, self.logger)
-
-            temp_obj_file = NamedTemporaryFile("wb", delete=False)
-            for data in transformed_data:
-                temp_obj_file.write(data)
-            temp_obj_file.flush()
-
-            try:
-                gcp_client.push(temp_obj_file.name, data_type, subtype)
-            except Exception:
-                raise
-            finally:
-                temp_obj_file.close()
-                os.unlink(temp_obj_file.name)
+            spool_writer = GCPSpoolWriter(
+                GCPSpoolWriter.get_spool_dir(
+                    self.configuration.get("spool_directory")
+                    or SPOOL_DIRECTORY,
+                    self.configuration["bucket_name"],
+                    self.configuration["obj_prefix"],
+                ),
+                self.configuration["max_file_size"],
+                self.configuration["max_duration"],
+                gcp_client.push,
+                self.logger,
+                self.configuration.get("max_spool_size")
+                or DEFAULT_MAX_SPOOL_SIZE,
+            )
+            compression = (
+                self.configuration.get("compression") or COMPRESSION_NONE
+            )
+            encoder = get_encoder(
+                compression,
+                self.configuration.get("compression_level")
+                or DEFAULT_COMPRESSION_LEVEL,
+            )
+            spool_writer.write(
+                encoder.encode(transformed_data),
+                data_type,
+                subtype,
+                compression,
+            )
         except Exception as e:
             self.logger.error(f"Error while pushing to GCP Storage: {e}")
             raise
@@ -185,6 +207,40 @@ class GCPStoragePlugin(PluginBase):
             return ValidationResult(
                 success=False, message="Invalid Maximum Duration provided."
             )
+        if not gcp_validator.validate_compression(
+            configuration.get("compression") or COMPRESSION_NONE,
+            configuration.get("compression_level") or DEFAULT_COMPRESSION_LEVEL,
+        ):
+            self.logger.error(
+                "GCP Storage Plugin: Validation error occurred. Error: "
+                "Invalid Compression or Compression Level found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False,
+                message="Invalid Compression or Compression Level provided.",
+            )
+        if not gcp_validator.validate_spool_settings(
+            configuration.get("spool_directory"),
+            configuration.get("max_spool_size") or DEFAULT_MAX_SPOOL_SIZE,
+        ):
+            self.logger.error(
+                "GCP Storage Plugin: Validation error occurred. Error: "
+                "Invalid Spool Directory or Maximum Spool Size found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False,
+                message="Invalid Spool Directory or Maximum Spool Size provided.",
+            )
+        if not gcp_validator.validate_upload_chunk_size(
+            configuration.get("upload_chunk_size") or DEFAULT_UPLOAD_CHUNK_SIZE
+        ):
+            self.logger.error(
+                "GCP Storage Plugin: Validation error occurred. Error: "
+                "Invalid Upload Chunk Size found in the configuration parameters."
+            )
+            return ValidationResult(
+                success=False, message="Invalid Upload Chunk Size provided."
+            )
         try:
             gcp_validator.auth_key_file_and_create_bucket(
                 configuration["key_file"].strip(),
@@ -0,0 +1,222 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Tests of the Google Cloud Storage client against gcp-storage-emulator.
+
+The service account tokens are granted by a local OAuth token endpoint.
+"""
+
+
+import http.server
+import json
+import logging
+import socket
+import threading
+
+import pytest
+
+pytest.importorskip("gcp_storage_emulator")
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+from gcp_storage_emulator.server import create_server  # noqa: E402
+from google.api_core.exceptions import NotFound  # noqa: E402
+
+from ..utils import gcp_client  # noqa: E402
+from ..utils.gcp_client import GCPClient  # noqa: E402
+from ..utils.gcp_constant import BYTES_PER_MB  # noqa: E402
+
+pytestmark = pytest.mark.emulator
+
+BUCKET = "netskope-logs"
+
+
+class TokenHandler(http.server.BaseHTTPRequestHandler):
+    """OAuth token endpoint counting the token requests."""
+
+    requests = 0
+
+    def log_message(self, *args):
+        """To Keep the test output clean."""
+
+    def do_POST(self):
+        """To Grant an access token."""
+        TokenHandler.requests += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps(
+            {
+                "access_token": "token",
+                "expires_in": 3600,
+                "token_type": "Bearer",
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _get_free_port():
+    """To Get a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def emulator():
+    """gcp-storage-emulator, keeping the objects in memory."""
+    port = _get_free_port()
+    server = create_server(
+        "127.0.0.1", port, in_memory=True, default_bucket=BUCKET
+    )
+    server.start()
+    yield "http://127.0.0.1:{}".format(port)
+    server.stop()
+
+
+@pytest.fixture(scope="module")
+def token_endpoint():
+    """OAuth token endpoint on a free local port."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), TokenHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:{}/token".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="module")
+def key_file(token_endpoint):
+    """Service account key of a new private key."""
+    private_key = rsa.generate_private_key(
+        public_exponent=65537, key_size=2048
+    ).private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return json.dumps(
+        {
+            "type": "service_account",
+            "project_id": "test",
+            "private_key_id": "test",
+            "private_key": private_key.decode(),
+            "client_email": "test@test.iam.gserviceaccount.com",
+            "client_id": "1",
+            "token_uri": token_endpoint,
+        }
+    )
+
+
+@pytest.fixture
+def configuration(emulator, key_file, monkeypatch):
+    """Plugin configuration, with empty client caches."""
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", emulator)
+    monkeypatch.setattr(gcp_client, "_clients", gcp_client.OrderedDict())
+    monkeypatch.setattr(gcp_client, "_buckets", {})
+    TokenHandler.requests = 0
+    return {
+        "key_file": key_file,
+        "bucket_name": BUCKET,
+        "obj_prefix": "ns",
+        "upload_chunk_size": 1,
+    }
+
+
+def _push(configuration, file_name, data_type="alerts", subtype="dlp"):
+    """To Push a file with a new client, as every plugin push does."""
+    GCPClient(configuration, logging.getLogger(__name__)).push(
+        file_name, data_type, subtype
+    )
+
+
+def _blobs(configuration, prefix):
+    """To Get the names and contents of the objects of given prefix."""
+    client = GCPClient(configuration, logging.getLogger(__name__))
+    return {
+        blob.name: blob.download_as_bytes()
+        for blob in client.get_bucket().list_blobs(prefix=prefix)
+    }
+
+
+def test_push_small_file(configuration, tmp_path):
+    """A file is uploaded under the object prefix, data type and subtype."""
+    configuration["obj_prefix"] = "small"
+    path = tmp_path / "chunk"
+    path.write_bytes(b'{"alert": 1}\n')
+
+    _push(configuration, str(path))
+
+    (name, data), = _blobs(configuration, "small").items()
+    assert name.startswith("small_alerts_dlp_")
+    assert data == b'{"alert": 1}\n'
+
+
+def test_push_large_file_in_chunks(configuration, tmp_path):
+    """A file above the chunk size is uploaded in chunks and round-trips."""
+    configuration["obj_prefix"] = "large"
+    data = bytes(range(256)) * (3 * BYTES_PER_MB // 256) + b"end"
+    path = tmp_path / "chunk"
+    path.write_bytes(data)
+
+    _push(configuration, str(path), None, None)
+
+    (name, stored), = _blobs(configuration, "large").items()
+    assert name.startswith("large_webtx_")
+    assert stored == data
+
+
+def test_client_and_bucket_cached(configuration, tmp_path):
+    """Pushes share one client and its access token."""
+    configuration["obj_prefix"] = "cached"
+    path = tmp_path / "chunk"
+    path.write_bytes(b"data")
+
+    for _ in range(3):
+        _push(configuration, str(path))
+
+    assert len(_blobs(configuration, "cached")) == 3
+    assert len(gcp_client._clients) == 1
+    assert len(gcp_client._buckets) == 1
+    assert TokenHandler.requests == 1
+
+
+def test_missing_bucket(configuration, tmp_path):
+    """Pushing to a missing bucket raises."""
+    configuration["bucket_name"] = "missing"
+    path = tmp_path / "chunk"
+    path.write_bytes(b"data")
+
+    with pytest.raises(NotFound):
+        _push(configuration, str(path))
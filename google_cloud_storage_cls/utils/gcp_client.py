@@ -33,10 +33,28 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """GCP client class."""
 
 
+import threading
 import time
 import json
 import uuid
+from collections import OrderedDict
 from google.cloud import storage
+from google.cloud.storage.retry import DEFAULT_RETRY
+
+from .gcp_constant import (
+    BYTES_PER_MB,
+    DEFAULT_UPLOAD_CHUNK_SIZE,
+    MAX_CACHED_BUCKETS,
+    MAX_CACHED_CLIENTS,
+)
+from .gcp_encoder import get_extension
+
+# Storage clients keep their credentials and session, so they are shared
+# across pushes instead of being rebuilt from the key file every time.
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+# Buckets already known to exist, keyed by (key file, bucket name)
+_buckets = {}
 
 
 class GCPClient:
@@ -48,41 +66,72 @@ class GCPClient:
         self.logger = logger
 
     def get_gcp_client(self):
-        """To get gcp client."""
+        """To get gcp client, cached per service account key."""
+        key_file = self.configuration["key_file"]
+        with _clients_lock:
+            client = _clients.get(key_file)
+            if client is not None:
+                _clients.move_to_end(key_file)
+                return client
         try:
-            key = json.loads(self.configuration["key_file"])
+            key = json.loads(key_file)
             client = storage.Client.from_service_account_info(key)
-            return client
         except json.decoder.JSONDecodeError as err:
             self.logger.error(
                 f"GCP Storage Plugin: Error occurred while decoding JSON key: {err}"
             )
             raise
-        except Exception:
-            raise
+        with _clients_lock:
+            client = _clients.setdefault(key_file, client)
+            _clients.move_to_end(key_file)
+            while len(_clients) > MAX_CACHED_CLIENTS:
+                _clients.popitem(last=False)
+        return client
 
     def get_bucket(self):
-        """To get bucket if exists."""
+        """To get bucket if exists, checked once per process."""
+        key = (self.configuration["key_file"], self.configuration["bucket_name"])
+        bucket = _buckets.get(key)
+        if bucket is not None:
+            return bucket
         try:
             client = self.get_gcp_client()
-            bucket_name = self.configuration["bucket_name"]
-            bucket = client.get_bucket(bucket_name)
-            return bucket
+            bucket = client.get_bucket(self.configuration["bucket_name"])
         except Exception as e:
             self.logger.error(f"Error occurred while getting bucket: {e}")
             raise
+        if len(_buckets) >= MAX_CACHED_BUCKETS:
+            _buckets.clear()
+        _buckets[key] = bucket
+        return bucket
 
     def push(self, file_name, data_type, subtype):
-        """Push method."""
+        """Push method.
+
+        The file is sent with a resumable upload, in chunks of
+        upload_chunk_size MBs. A chunk which fails is retried on its own
+        instead of restarting the whole upload.
+        """
         cur_time = int(time.time())
         if data_type is None:
             object_name = f'{self.configuration["obj_prefix"]}_webtx_{cur_time}_{str(uuid.uuid1())}'
         else:
             object_name = f'{self.configuration["obj_prefix"]}_{data_type}_{subtype}_{cur_time}_{str(uuid.uuid1())}'
         try:
+            object_name += get_extension(file_name)
             bucket = self.get_bucket()
-            blob_object = bucket.blob(object_name)
-            blob_object.upload_from_filename(filename=file_name)
+            chunk_size = (
+                int(
+                    self.configuration.get("upload_chunk_size")
+                    or DEFAULT_UPLOAD_CHUNK_SIZE
+                )
+                * BYTES_PER_MB
+            )
+            blob_object = bucket.blob(object_name, chunk_size=chunk_size)
+            # Object names are unique, retrying the upload is always safe
+            blob_object.upload_from_filename(
+                filename=file_name, retry=DEFAULT_RETRY
+            )
             self.logger.info(
                 f"Successfully Uploaded to GCP Storage as blob file. {object_name}"
             )
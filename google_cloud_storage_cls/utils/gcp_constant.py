@@ -33,6 +33,9 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """GCP Storage Constant."""
 
 
+import os
+
+
 locations_list = [
     "US",
     "EU",
@@ -76,3 +79,33 @@ storage_classes_list = [
     "COLDLINE",
     "ARCHIVE",
 ]
+
+# Rolling spool of pushed chunks, uploaded once max_file_size/max_duration is hit.
+# It lives in the plugin directory, which CE keeps on its persistent volume,
+# unless the Spool Directory configuration parameter is set.
+SPOOL_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".spool"
+)
+SPOOL_SUFFIX = ".spool"  # Spool still being appended to
+READY_SUFFIX = ".ready"  # Rotated spool waiting to be uploaded
+UPLOADING_SUFFIX = ".uploading"  # Ready spool claimed by a worker uploading it
+SPOOL_CLAIM_TIMEOUT = 3600  # Seconds after which a claim is considered stale
+SPOOL_FLUSH_INTERVAL = 10  # Seconds between two background flushes of the spools
+SPOOL_LOCK_FILE = ".lock"
+DEFAULT_MAX_SPOOL_SIZE = 1024  # MBs of spooled data above which pushes fail
+BYTES_PER_MB = 1024 * 1024
+
+# Compression of the stored data
+COMPRESSION_NONE = "none"  # Data is stored as it is received
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+COMPRESSION_LEVELS = {COMPRESSION_GZIP: (1, 9), COMPRESSION_ZSTD: (1, 22)}
+DEFAULT_COMPRESSION_LEVEL = 6
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Cached clients and resumable uploads
+MAX_CACHED_CLIENTS = 16
+MAX_CACHED_BUCKETS = 256
+DEFAULT_UPLOAD_CHUNK_SIZE = 8  # In MBs, a multiple of 256 KB
+MAX_UPLOAD_CHUNK_SIZE = 100  # In MBs
@@ -0,0 +1,207 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""GCP Storage Plugin streaming encoders."""
+
+
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .gcp_constant import (
+    COMPRESSION_GZIP,
+    COMPRESSION_ZSTD,
+    GZIP_MAGIC,
+    ZSTD_MAGIC,
+)
+
+
+def iter_gunzip(data):
+    """To Decompress gzip data, which may hold several gzip members.
+
+    Args:
+        data: gzip compressed bytes
+
+    Yields:
+        Decompressed bytes
+    """
+    while data:
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        yield decompressor.decompress(data)
+        yield decompressor.flush()
+        data = decompressor.unused_data
+
+
+def get_extension(data):
+    """To Get the file name extension matching the content of the data.
+
+    Args:
+        data: Path of a file, or a seekable binary file-like object
+
+    Returns:
+        ".gz", ".zst" or "" for uncompressed data
+    """
+    if isinstance(data, str):
+        with open(data, "rb") as data_file:
+            magic = data_file.read(len(ZSTD_MAGIC))
+    else:
+        position = data.tell()
+        magic = data.read(len(ZSTD_MAGIC))
+        data.seek(position)
+    if magic.startswith(GZIP_MAGIC):
+        return ".gz"
+    if magic.startswith(ZSTD_MAGIC):
+        return ".zst"
+    return ""
+
+
+class RawEncoder(object):
+    """Encoder keeping the chunks as they are received."""
+
+    def encode(self, chunks):
+        """To Encode the chunks of a push.
+
+        Args:
+            chunks: Iterable of bytes
+
+        Returns:
+            Iterable of encoded bytes
+        """
+        return chunks
+
+
+class GzipEncoder(object):
+    """Encoder compressing the chunks of a push into gzip members.
+
+    Concatenated gzip members are a valid gzip file, so the encoded pushes
+    can be appended to the same spool. Chunks which already are gzip
+    compressed are kept as they are instead of being compressed twice.
+    """
+
+    def __init__(self, level):
+        """Init method.
+
+        Args:
+            level: Compression level (1-9)
+        """
+        self.level = level
+
+    def encode(self, chunks):
+        """To Encode the chunks of a push.
+
+        Args:
+            chunks: Iterable of bytes
+
+        Yields:
+            gzip compressed bytes
+        """
+        compressor = None
+        for chunk in chunks:
+            if chunk[:2] == GZIP_MAGIC:
+                if compressor is not None:
+                    yield compressor.flush()
+                    compressor = None
+                yield chunk
+                continue
+            if compressor is None:
+                compressor = zlib.compressobj(
+                    self.level, zlib.DEFLATED, zlib.MAX_WBITS | 16
+                )
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        if compressor is not None:
+            yield compressor.flush()
+
+
+class ZstdEncoder(object):
+    """Encoder compressing the chunks of a push into a zstd frame.
+
+    Concatenated zstd frames are a valid zstd file, so the encoded pushes
+    can be appended to the same spool. Chunks which are gzip compressed
+    are decompressed first.
+    """
+
+    def __init__(self, level):
+        """Init method.
+
+        Args:
+            level: Compression level (1-22)
+        """
+        if zstandard is None:
+            raise ImportError(
+                "The zstandard package is required for zstd compression."
+            )
+        self._compressor = zstandard.ZstdCompressor(level=level)
+
+    def encode(self, chunks):
+        """To Encode the chunks of a push.
+
+        The push is compressed in one call, so that zstd knows the size of
+        the frame and tunes its parameters to it. Streaming small pushes
+        into a compressobj is much slower with the high compression levels.
+
+        Args:
+            chunks: Iterable of bytes
+
+        Yields:
+            zstd compressed bytes
+        """
+        data = bytearray()
+        for chunk in chunks:
+            if chunk[:2] == GZIP_MAGIC:
+                for part in iter_gunzip(chunk):
+                    data += part
+            else:
+                data += chunk
+        if data:
+            yield self._compressor.compress(data)
+
+
+def get_encoder(compression, level):
+    """To Get the encoder of the configured compression.
+
+    Args:
+        compression: COMPRESSION_NONE, COMPRESSION_GZIP or COMPRESSION_ZSTD
+        level: Compression level
+
+    Returns:
+        Encoder object
+    """
+    if compression == COMPRESSION_GZIP:
+        return GzipEncoder(int(level))
+    if compression == COMPRESSION_ZSTD:
+        return ZstdEncoder(int(level))
+    return RawEncoder()
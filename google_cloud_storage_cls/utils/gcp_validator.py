@@ -34,12 +34,18 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
 import json
+import os
 from google.cloud import storage
 from google.cloud import exceptions
 from .gcp_constant import (
+    COMPRESSION_LEVELS,
+    COMPRESSION_NONE,
+    COMPRESSION_ZSTD,
+    MAX_UPLOAD_CHUNK_SIZE,
     locations_list,
     storage_classes_list,
 )
+from .gcp_encoder import zstandard
 
 
 class GCPValidator(object):
@@ -118,6 +124,73 @@ class GCPValidator(object):
         else:
             return False
 
+    def validate_compression(self, compression, compression_level):
+        """Validate compression and compression level.
+
+        Args:
+            compression: the compression to be validated
+            compression_level: the compression level to be validated
+
+        Returns:
+            Whether the provided values are valid or not. True in case of valid values, False otherwise
+        """
+        if compression == COMPRESSION_NONE:
+            return True
+        if compression not in COMPRESSION_LEVELS:
+            return False
+        if compression == COMPRESSION_ZSTD and zstandard is None:
+            self.logger.error(
+                "GCP Storage Plugin: The zstandard package is required for zstd compression."
+            )
+            return False
+        try:
+            compression_level = int(compression_level)
+        except (TypeError, ValueError):
+            return False
+        low, high = COMPRESSION_LEVELS[compression]
+        return low <= compression_level <= high
+
+    def validate_spool_settings(self, spool_directory, max_spool_size):
+        """Validate spool directory and max spool size.
+
+        Args:
+            spool_directory: the spool directory to be validated, empty for the default one
+            max_spool_size: the max spool size (in MBs) to be validated
+
+        Returns:
+            Whether the provided values are valid or not. True in case of valid values, False otherwise
+        """
+        try:
+            if int(max_spool_size) <= 0:
+                return False
+        except (TypeError, ValueError):
+            return False
+        if not spool_directory:
+            return True
+        if not isinstance(spool_directory, str) or not os.path.isabs(
+            spool_directory
+        ):
+            return False
+        try:
+            os.makedirs(spool_directory, exist_ok=True)
+        except OSError:
+            return False
+        return os.access(spool_directory, os.W_OK | os.X_OK)
+
+    def validate_upload_chunk_size(self, chunk_size):
+        """Validate upload chunk size.
+
+        Args:
+            chunk_size: the chunk size (in MBs) to be validated
+
+        Returns:
+            Whether the provided value is valid or not. True in case of valid value, False otherwise
+        """
+        try:
+            return 0 < int(chunk_size) <= MAX_UPLOAD_CHUNK_SIZE
+        except (TypeError, ValueError):
+            return False
+
     def auth_key_file_and_create_bucket(
         self, json_key_file, bucket_name, location, storage_class_for_object
     ):
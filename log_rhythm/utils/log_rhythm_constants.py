@@ -61,3 +61,22 @@ SEVERITY_MAP = {
     "9": SEVERITY_VERY_HIGH,
     "10": SEVERITY_VERY_HIGH,
 }
+
+# Seconds after which the hostname used in the CEF prefix is resolved again
+HOSTNAME_REFRESH_INTERVAL = 3600
+# Max characters cached by the translate table of a CEF string sanitizer
+ESCAPE_TABLE_SIZE = 4096
+
+# Seconds after which an unused pooled LogRhythm connection is closed
+CONNECTION_IDLE_TIMEOUT = 300
+# Max unused connections kept open per LogRhythm destination
+MAX_IDLE_CONNECTIONS = 8
+# Bytes read at once while draining the post-handshake records of a pooled
+# TLS connection
+SSL_DRAIN_SIZE = 4096
+
+# Framing of syslog messages over TCP/TLS (RFC 6587)
+FRAMING_NEWLINE = "newline"
+FRAMING_OCTET_COUNTING = "octet-counting"
+# Buffered bytes after which framed syslog messages are written to the socket
+WRITE_BATCH_SIZE = 64 * 1024
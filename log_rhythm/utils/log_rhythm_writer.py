@@ -0,0 +1,121 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+"""LogRhythm Plugin framed stream writer."""
+
+
+from logging.handlers import SysLogHandler
+
+from .log_rhythm_constants import (
+    FRAMING_NEWLINE,
+    FRAMING_OCTET_COUNTING,
+    WRITE_BATCH_SIZE,
+)
+
+
+class LogRhythmStreamWriter(object):
+    """Buffered writer of framed syslog messages over a stream (TCP/TLS) socket."""
+
+    def __init__(
+        self,
+        sock,
+        framing=FRAMING_NEWLINE,
+        facility=SysLogHandler.LOG_USER,
+        severity=SysLogHandler.LOG_INFO,
+        batch_size=WRITE_BATCH_SIZE,
+    ):
+        """Init method.
+
+        Args:
+            sock: Connected stream socket to write to
+            framing: FRAMING_NEWLINE or FRAMING_OCTET_COUNTING (RFC 6587)
+            facility: Syslog facility of the messages
+            severity: Syslog severity of the messages
+            batch_size: Buffered bytes after which the writer is full
+        """
+        if framing not in (FRAMING_NEWLINE, FRAMING_OCTET_COUNTING):
+            raise ValueError("Invalid syslog framing: {}".format(framing))
+        self.sock = sock
+        self.framing = framing
+        self.batch_size = batch_size
+        self.pending = 0  # Number of buffered messages
+        self._pri = "<{}>".format((facility << 3) | severity).encode("utf-8")
+        self._buffer = bytearray()
+
+    def write(self, message):
+        """To Encode and buffer given message.
+
+        Args:
+            message: The message (str) to be sent
+        """
+        frame = self._pri + message.encode("utf-8")
+        if self.framing == FRAMING_OCTET_COUNTING:
+            self._buffer += b"%d " % len(frame)
+            self._buffer += frame
+        else:
+            self._buffer += frame
+            self._buffer += b"\n"
+        self.pending += 1
+
+    def is_full(self):
+        """To Check whether the buffered data should be flushed.
+
+        Returns:
+            True if at least batch_size bytes are buffered
+        """
+        return len(self._buffer) >= self.batch_size
+
+    def flush(self):
+        """To Send all the buffered messages with a single sendall call.
+
+        The buffer is kept intact if sending fails, so that it can be sent
+        again over a new connection.
+
+        Returns:
+            Number of messages sent
+        """
+        if not self._buffer:
+            return 0
+        self.sock.sendall(self._buffer)
+        return self.clear()
+
+    def clear(self):
+        """To Drop all the buffered messages.
+
+        Returns:
+            Number of messages dropped
+        """
+        count = self.pending
+        del self._buffer[:]
+        self.pending = 0
+        return count
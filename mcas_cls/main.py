@@ -34,12 +34,11 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
 import json
-import jsonpath
 
 from netskope.common.utils import AlertsHelper
 from netskope.integrations.cls.plugin_base import PluginBase, ValidationResult
 from .utils.mcas_helper import (
-    get_mcas_mappings,
+    get_mapping_plan,
 )
 from .utils.mcas_validator import (
     MCASValidator,
@@ -47,11 +46,11 @@ from .utils.mcas_validator import (
 from .utils.mcas_exceptions import (
     MappingValidationError,
     EmptyExtensionError,
-    FieldNotFoundError,
+    SubtypeMappingNotFoundError,
     MaxRetriesExceededError,
 )
 from .utils.mcas_cef_generator import (
-    CEFGenerator,
+    get_cef_generator,
 )
 
 from .utils.mcas_client import (
@@ -62,164 +61,46 @@ from .utils.mcas_client import (
 class MCASPlugin(PluginBase):
     """MCAS Plugin class."""
 
-    def get_mapping_value_from_json_path(self, data, json_path):
-        """Fetch the value from given JSON object using given JSON path.
+    def get_mapping_variables(self):
+        """Resolve the values of the variables (e.g. $tenant_name) usable in header mappings.
 
-        :param data: JSON object from which the value is to be fetched
-        :param json_path: JSON path indicating the path of the value in given JSON
-        :return: fetched value
+        :return: dict of variable name and its resolved value
         """
-        return jsonpath(data, json_path)
-
-    def get_mapping_value_from_field(self, data, field):
-        """Fetch the value from given field.
-
-        :param data: JSON object from which the value is to be fetched
-        :param field: Field whose value is to be fetched
-        :return: fetched value
-        """
-        return (
-            data[field]
-            if data[field] or isinstance(data[field], int)
-            else "null"
-        )
-
-    def get_subtype_mapping(self, mappings, subtype):
-        """Retrieve subtype mappings (mappings for subtypes of alerts/events) case insensitively.
-
-        :param mappings: Mapping JSON from which subtypes are to be retrieved
-        :param subtype: Subtype (e.g. DLP for alerts) for which the mapping is to be fetched
-        :return: Fetched mapping JSON object
-        """
-        mappings = {k.lower(): v for k, v in mappings.items()}
-        if subtype.lower() in mappings:
-            return mappings[subtype.lower()]
-        else:
-            return mappings[subtype.upper()]
-
-    def get_headers(self, header_mappings, data, data_type, subtype):
-        """Create a dictionary of CEF headers from given header mappings for given Netskope alert/event record.
-
-        :param subtype: Subtype for which the headers are being transformed
-        :param data_type: Data type for which the headers are being transformed
-        :param header_mappings: CEF header mapping with Netskope fields
-        :param data: The alert/event for which the CEF header is being generated
-        :return: header dict
-        """
-        headers = {}
         helper = AlertsHelper()
         tenant = helper.get_tenant_cls(self.source)
-        mapping_variables = {"$tenant_name": tenant.name}
-
-        missing_fields = []
-        # Iterate over mapped headers
-        for cef_header, header_mapping in header_mappings.items():
-            try:
-                headers[cef_header] = self.get_field_value_from_data(
-                    header_mapping, data, data_type, subtype, False
-                )
-
-                # Handle variable mappings
-                if (
-                    isinstance(headers[cef_header], str)
-                    and headers[cef_header].lower() in mapping_variables
-                ):
-                    headers[cef_header] = mapping_variables[
-                        headers[cef_header].lower()
-                    ]
-            except FieldNotFoundError as err:
-                missing_fields.append(str(err))
-
-        return headers
+        return {"$tenant_name": tenant.name}
 
-    def get_extensions(self, extension_mappings, data, data_type, subtype):
-        """Get extensions.
+    def get_headers(
+        self, mapping_plan, data, data_type, subtype, mapping_variables
+    ):
+        """Create a dictionary of CEF headers from given mapping plan for given Netskope alert/event record.
 
-        :param subtype: Subtype for which the extension are being transformed
+        :param mapping_plan: Compiled mapping plan of the subtype being transformed
+        :param data: The alert/event for which the CEF header is being generated
         :param data_type: Data type for which the headers are being transformed
-        :param extension_mappings: Mapping of extensions
-        :param data: The the to be transformed
-        :return:
+        :param subtype: Subtype for which the headers are being transformed
+        :param mapping_variables: Resolved values of the mapping variables (e.g. $tenant_name)
+        :return: header dict
         """
-        extension = {}
-        missing_fields = []
+        headers = mapping_plan.get_headers(data)
 
-        # Iterate over mapped extensions
-        for cef_extension, extension_mapping in extension_mappings.items():
-            try:
-                extension[cef_extension] = self.get_field_value_from_data(
-                    extension_mapping,
-                    data,
-                    data_type,
-                    subtype,
-                    is_json_path="is_json_path" in extension_mapping,
-                )
-            except FieldNotFoundError as err:
-                missing_fields.append(str(err))
+        # Handle variable mappings
+        for cef_header, value in headers.items():
+            if isinstance(value, str) and value.lower() in mapping_variables:
+                headers[cef_header] = mapping_variables[value.lower()]
 
-        return extension
+        return headers
 
-    def get_field_value_from_data(
-        self, extension_mapping, data, data_type, subtype, is_json_path=False
-    ):
-        """Fetch the value of extension based on "mapping" and "default" fields.
+    def get_extensions(self, mapping_plan, data, data_type, subtype):
+        """Get extensions from given mapping plan.
 
-        :param extension_mapping: Dict containing "mapping" and "default" fields
-        :param data: Data instance retrieved from Netskope
-        :param subtype: Subtype for which the extension are being transformed
-        :param data_type: Data type for which the headers are being transformed
-        :param is_json_path: Whether the mapped value is JSON path or direct field name
-        :return: Fetched values of extension
-
-        ---------------------------------------------------------------------
-             Mapping          |    Response    |    Retrieved Value
-        ----------------------|                |
-        default  |  Mapping   |                |
-        ---------------------------------------------------------------------
-           P     |     P      |        P       |           Mapped
-           P     |     P      |        NP      |           Default
-           P     |     NP     |        P       |           Default
-           NP    |     P      |        P       |           Mapped
-           P     |     NP     |        NP      |           Default
-           NP    |     P      |        NP      |           -
-           NP    |     NP     |        P       |           - (Not possible)
-           NP    |     NP     |        NP      |           - (Not possible)
-        -----------------------------------------------------------------------
+        :param mapping_plan: Compiled mapping plan of the subtype being transformed
+        :param data: The data to be transformed
+        :param data_type: Data type for which the extensions are being transformed
+        :param subtype: Subtype for which the extensions are being transformed
+        :return: extensions dict
         """
-        if (
-            "mapping_field" in extension_mapping
-            and extension_mapping["mapping_field"]
-        ):
-            if is_json_path:
-                # If mapping field specified by JSON path is present in data, map that field, else skip by raising
-                # exception:
-                value = self.get_mapping_value_from_json_path(
-                    data, extension_mapping["mapping_field"]
-                )
-                if value:
-                    return ",".join([str(val) for val in value])
-                else:
-                    raise FieldNotFoundError(
-                        extension_mapping["mapping_field"]
-                    )
-            else:
-                # If mapping is present in data, map that field, else skip by raising exception
-                if (
-                    extension_mapping["mapping_field"] in data
-                ):  # case #1 and case #4
-                    return self.get_mapping_value_from_field(
-                        data, extension_mapping["mapping_field"]
-                    )
-                elif "default_value" in extension_mapping:
-                    # If mapped value is not found in response and default is mapped, map the default value (case #2)
-                    return extension_mapping["default_value"]
-                else:  # case #6
-                    raise FieldNotFoundError(
-                        extension_mapping["mapping_field"]
-                    )
-        else:
-            # If mapping is not present, 'default_value' must be there because of validation (case #3 and case #5)
-            return extension_mapping["default_value"]
+        return mapping_plan.get_extensions(data)
 
     def transform(self, raw_data, data_type, subtype):
         """Transform the raw netskope JSON data to mcas CEF format.
@@ -230,9 +111,15 @@ class MCASPlugin(PluginBase):
         :return: list of transformed data
         """
         try:
-            delimiter, cef_version, mcas_mappings = get_mcas_mappings(
-                self.mappings, data_type
+            mapping_plan = get_mapping_plan(self.mappings, data_type, subtype)
+        except SubtypeMappingNotFoundError:
+            self.logger.error(
+                'Error occurred while retrieving mappings for subtype "{}". '
+                "Transformation of current chunk will be skipped.".format(
+                    subtype
+                )
             )
+            return []
         except KeyError as err:
             self.logger.error(
                 "Error in mcas mapping file. Error: {}".format(str(err))
@@ -249,35 +136,32 @@ class MCASPlugin(PluginBase):
             )
             raise
 
-        cef_generator = CEFGenerator(
+        cef_generator = get_cef_generator(
             self.configuration["valid_extensions"],
-            delimiter,
-            cef_version,
+            mapping_plan.delimiter,
+            mapping_plan.cef_version,
             self.logger,
         )
 
+        # Resolve the mapping variables once for the whole chunk
+        try:
+            mapping_variables = self.get_mapping_variables()
+        except Exception as err:
+            self.logger.error(
+                "[{}][{}]: Error occurred while resolving mapping variables: {}. "
+                "Transformation of current chunk will be skipped.".format(
+                    data_type, subtype, str(err)
+                )
+            )
+            return []
+
         transformed_data = []
 
         for data in raw_data:
-
-            # First retrieve the mapping of subtype being transformed
-            try:
-                subtype_mapping = self.get_subtype_mapping(
-                    mcas_mappings[data_type], subtype
-                )
-            except Exception:
-                self.logger.error(
-                    'Error occurred while retrieving mappings for subtype "{}". '
-                    "Transformation of current record will be skipped.".format(
-                        subtype
-                    )
-                )
-                continue
-
             # Generating the CEF header
             try:
                 header = self.get_headers(
-                    subtype_mapping["header"], data, data_type, subtype
+                    mapping_plan, data, data_type, subtype, mapping_variables
                 )
             except Exception as err:
                 self.logger.error(
@@ -290,7 +174,7 @@ class MCASPlugin(PluginBase):
 
             try:
                 extension = self.get_extensions(
-                    subtype_mapping["extension"], data, data_type, subtype
+                    mapping_plan, data, data_type, subtype
                 )
             except Exception as err:
                 self.logger.error(
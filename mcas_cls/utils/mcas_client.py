@@ -33,9 +33,13 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """MCAS CLient."""
 
 
+import base64
 import time
 import requests
+import tempfile
 import threading
+from collections import OrderedDict
+from urllib.parse import urlencode
 
 from .mcas_constants import (
     API_GET_URL,
@@ -43,12 +47,61 @@ from .mcas_constants import (
     MAX_RETRIES,
     RETRY_SLEEP_TIME,
     DATAFILE,
+    SPOOL_MAX_SIZE,
+    SINGLE_PUT_MAX_SIZE,
+    UPLOAD_BLOCK_SIZE,
+    MAX_CACHED_SESSIONS,
 )
 from .mcas_exceptions import (
     MaxRetriesExceededError,
 )
 from netskope.common.utils import add_user_agent
 
+# HTTP sessions are shared by every instance of the plugin in this process,
+# so that the connections to MCAS and its blob storage are kept alive.
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+class FileRange(object):
+    """Byte range of a file, streamed as the body of a request."""
+
+    def __init__(self, file, offset, length):
+        """Initialize.
+
+        :param file: Binary file to read from
+        :param offset: Offset of the first byte of the range
+        :param length: Number of bytes in the range
+        """
+        self.file = file
+        self.offset = offset
+        self.length = length
+        self.position = 0
+
+    def __len__(self):
+        """Length of the range, sent as the Content-Length of the request."""
+        return self.length
+
+    def rewind(self):
+        """Restart reading from the beginning of the range."""
+        self.position = 0
+
+    def read(self, size=-1):
+        """Read up to size bytes of the range.
+
+        :param size: Max number of bytes to read, all the remaining ones if negative
+        :return: The bytes read, empty at the end of the range
+        """
+        remaining = self.length - self.position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if not size:
+            return b""
+        self.file.seek(self.offset + self.position)
+        chunk = self.file.read(size)
+        self.position += len(chunk)
+        return chunk
+
 
 class MCASClient:
     """MCAS CLient."""
@@ -63,6 +116,30 @@ class MCASClient:
         self.proxy = proxy
         self.datafile = DATAFILE
 
+    def _get_session(self):
+        """Get the keep-alive HTTP session used for every step of the upload.
+
+        :return: requests.Session shared across pushes
+        """
+        key = (
+            str(self.verify_ssl),
+            tuple(sorted((self.proxy or {}).items())),
+        )
+        evicted = []
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is not None:
+                _sessions.move_to_end(key)
+                return session
+            session = requests.Session()
+            _sessions[key] = session
+            while len(_sessions) > MAX_CACHED_SESSIONS:
+                evicted.append(_sessions.popitem(last=False)[1])
+
+        for evicted_session in evicted:
+            evicted_session.close()
+        return session
+
     def _log_custom_error_message(self, status_code, response_body):
         """Log custom error message based on the status code.
 
@@ -151,11 +228,12 @@ class MCASClient:
             "Status Code: {}. Response: {}",
         }
 
+        session = self._get_session()
         retry, retry_count = True, 1
         try:
             while retry_count <= MAX_RETRIES:
                 if req_type == "get":
-                    response = requests.get(
+                    response = session.get(
                         uri,
                         params=params,
                         headers=add_user_agent(headers),
@@ -164,19 +242,19 @@ class MCASClient:
                     )
 
                 elif req_type == "put":
-                    put_data = str.encode("\n".join(data))
-                    file_name = self.datafile.format(threading.get_ident())
-                    files = {"file": (file_name, put_data)}
-                    response = requests.put(
+                    if isinstance(data, FileRange):
+                        # Stream the body again from its start on every retry
+                        data.rewind()
+                    response = session.put(
                         uri,
-                        files=files,
+                        data=data,
                         headers=add_user_agent(headers),
                         proxies=proxies,
                         verify=self.verify_ssl,
                     )
 
                 elif req_type == "post":
-                    response = requests.post(
+                    response = session.post(
                         uri,
                         data=data,
                         headers=add_user_agent(headers),
@@ -247,12 +325,83 @@ class MCASClient:
         except Exception:
             raise
 
+    def _spool_data(self, data):
+        """Write the given records into a temporary file, separated by newlines.
+
+        The file is kept in memory up to SPOOL_MAX_SIZE bytes and moved to disk beyond that.
+
+        :param data: The CEF records to be ingested
+        :return: The spooled file
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        for index, record in enumerate(data):
+            if index:
+                spool.write(b"\n")
+            spool.write(str.encode(record))
+        return spool
+
+    def _get_blob_url(self, upload_url, **params):
+        """Add the given query parameters to the SAS URL of the upload blob.
+
+        :param upload_url: SAS URL of the blob, returned by MCAS
+        :param params: Query parameters to be added
+        :return: The URL with the parameters
+        """
+        separator = "&" if "?" in upload_url else "?"
+        return upload_url + separator + urlencode(params)
+
+    def _upload_file(self, upload_url, spool):
+        """Upload the given file to the blob, in staged blocks if it is large.
+
+        :param upload_url: SAS URL of the blob, returned by MCAS
+        :param spool: The spooled file to be uploaded
+        """
+        size = spool.seek(0, 2)
+        if size <= SINGLE_PUT_MAX_SIZE:
+            self._api_request(
+                "put",
+                upload_url,
+                headers={"x-ms-blob-type": "BlockBlob"},
+                proxies=self.proxy,
+                data=FileRange(spool, 0, size),
+            )
+            return
+
+        block_ids = []
+        for offset in range(0, size, UPLOAD_BLOCK_SIZE):
+            # Block IDs must have the same length within a blob
+            block_id = base64.b64encode(
+                "{:010d}".format(len(block_ids)).encode()
+            ).decode()
+            self._api_request(
+                "put",
+                self._get_blob_url(upload_url, comp="block", blockid=block_id),
+                proxies=self.proxy,
+                data=FileRange(
+                    spool, offset, min(UPLOAD_BLOCK_SIZE, size - offset)
+                ),
+            )
+            block_ids.append(block_id)
+
+        block_list = "".join(
+            "<Latest>{}</Latest>".format(block_id) for block_id in block_ids
+        )
+        self._api_request(
+            "put",
+            self._get_blob_url(upload_url, comp="blocklist"),
+            proxies=self.proxy,
+            data=(
+                '<?xml version="1.0" encoding="utf-8"?>'
+                "<BlockList>{}</BlockList>".format(block_list)
+            ).encode(),
+        )
+
     def _post_data(self, portal_url, api_token, body, data_source):
         """Post the given data to MCAS Platform.
 
         :param portal_url: portal url to get the API url
         :param api_token: api token to access the MCAS
-        :param body: The actual data being ingested
+        :param body: The spooled file of the data being ingested
         :param data_source: Name of data source, where records to be ingested
         :raises MaxRetriesExceededError: When data ingestion fails even after max. number of retries
         """
@@ -270,14 +419,7 @@ class MCASClient:
         # Step 2 : Upload the file
         response_get = response_get.json()
         upload_url = response_get["url"]
-        headers_put = {"x-ms-blob-type": "BlockBlob"}
-        self._api_request(
-            "put",
-            upload_url,
-            headers=headers_put,
-            proxies=self.proxy,
-            data=body,
-        )
+        self._upload_file(upload_url, body)
 
         # Step 3 : Notify MCAS so that it can start processing the data
         post_uri = API_POST_URL.format(portal_url)
@@ -300,9 +442,14 @@ class MCASClient:
         self.data_length = len(data)
         self.data_type = data_type
 
-        self._post_data(
-            self.configuration.get("portal_url").strip(),
-            self.configuration.get("token").strip(),
-            data,
-            self.configuration.get("data_source").strip(),
-        )
+        # The file is built once and streamed on every upload attempt
+        spool = self._spool_data(data)
+        try:
+            self._post_data(
+                self.configuration.get("portal_url").strip(),
+                self.configuration.get("token").strip(),
+                spool,
+                self.configuration.get("data_source").strip(),
+            )
+        finally:
+            spool.close()
@@ -64,3 +64,16 @@ API_POST_URL = "https://{}/api/v1/discovery/done_upload/"
 MAX_RETRIES = 3
 RETRY_SLEEP_TIME = 60
 DATAFILE = '{}-ingestion_file.txt'
+# Bytes of the upload file kept in memory before it is spooled to disk
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+# Files larger than this are uploaded to the blob as staged blocks
+SINGLE_PUT_MAX_SIZE = 64 * 1024 * 1024
+# Size in bytes of a staged block
+UPLOAD_BLOCK_SIZE = 4 * 1024 * 1024
+# Max HTTP sessions kept alive
+MAX_CACHED_SESSIONS = 16
+
+# Seconds after which the hostname used in the CEF prefix is resolved again
+HOSTNAME_REFRESH_INTERVAL = 3600
+# Max characters cached by the translate table of a CEF string sanitizer
+ESCAPE_TABLE_SIZE = 4096
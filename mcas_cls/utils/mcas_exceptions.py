@@ -101,3 +101,15 @@ class MaxRetriesExceededError(Error):
     def __init__(self, message):
         """Initialize."""
         self.message = message
+
+
+class SubtypeMappingNotFoundError(Exception):
+    """Exception raised when no mapping is found for the subtype being transformed.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        """Initialize."""
+        self.message = message
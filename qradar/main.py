@@ -39,7 +39,6 @@ import threading
 import socket
 import json
 from typing import List
-from jsonpath import jsonpath
 
 from netskope.common.utils import AlertsHelper
 from netskope.integrations.cls.plugin_base import (
@@ -55,205 +54,84 @@ from .utils.qradar_validator import (
     QRadarValidator,
 )
 from .utils.qradar_helper import (
-    get_qradar_mappings,
+    get_mapping_plan,
 )
 from .utils.qradar_exceptions import (
     MappingValidationError,
     EmptyExtensionError,
-    FieldNotFoundError,
+    SubtypeMappingNotFoundError,
 )
 from .utils.qradar_cef_generator import (
-    CEFGenerator,
+    get_cef_generator,
 )
+from .utils.qradar_connection_pool import connection_pool
+from .utils.qradar_writer import QRadarStreamWriter
 from .utils.qradar_ssl import SSLQRadarHandler
 
 
 class QRadarPlugin(PluginBase):
     """The QRadar plugin implementation class."""
 
-    def get_mapping_value_from_json_path(self, data, json_path):
-        """To Fetch the value from given JSON object using given JSON path.
-
-        Args:
-            data: JSON object from which the value is to be fetched
-            json_path: JSON path indicating the path of the value in given JSON
-
-        Returns:
-            fetched value.
-        """
-        return jsonpath(data, json_path)
-
-    def get_mapping_value_from_field(self, data, field):
-        """To Fetch the value from given field.
-
-        Args:
-            data: JSON object from which the value is to be fetched
-            field: Field whose value is to be fetched
-
-        Returns:
-            fetched value.
-        """
-        return (
-            data[field]
-            if data[field] or isinstance(data[field], int)
-            else "null"
-        )
-
-    def get_subtype_mapping(self, mappings, subtype):
-        """To Retrieve subtype mappings (mappings for subtypes of alerts/events) case insensitively.
-
-        Args:
-            mappings: Mapping JSON from which subtypes are to be retrieved
-            subtype: Subtype (e.g. DLP for alerts) for which the mapping is to be fetched
+    def get_mapping_variables(self):
+        """To Resolve the values of the variables (e.g. $tenant_name) usable in header mappings.
 
         Returns:
-            Fetched mapping JSON object
+            dict of variable name and its resolved value
         """
-        mappings = {k.lower(): v for k, v in mappings.items()}
-        if subtype.lower() in mappings:
-            return mappings[subtype.lower()]
-        else:
-            return mappings[subtype.upper()]
+        helper = AlertsHelper()
+        tenant = helper.get_tenant_cls(self.source)
+        return {"$tenant_name": tenant.name}
 
-    def get_headers(self, header_mappings, data, data_type, subtype):
-        """To Create a dictionary of CEF headers from given header mappings for given Netskope alert/event record.
+    def get_headers(
+        self, mapping_plan, data, data_type, subtype, mapping_variables
+    ):
+        """To Create a dictionary of CEF headers from given mapping plan for given Netskope alert/event record.
 
         Args:
-            subtype: Subtype for which the headers are being transformed
-            data_type: Data type for which the headers are being transformed
-            header_mappings: CEF header mapping with Netskope fields
+            mapping_plan: Compiled mapping plan of the subtype being transformed
             data: The alert/event for which the CEF header is being generated
+            data_type: Data type for which the headers are being transformed
+            subtype: Subtype for which the headers are being transformed
+            mapping_variables: Resolved values of the mapping variables (e.g. $tenant_name)
 
         Returns:
             header dict
         """
-        headers = {}
-        helper = AlertsHelper()
-        tenant = helper.get_tenant_cls(self.source)
-        mapping_variables = {"$tenant_name": tenant.name}
+        headers = mapping_plan.get_headers(data)
 
-        missing_fields = []
-        # Iterate over mapped headers
-        for cef_header, header_mapping in header_mappings.items():
-            try:
-                headers[cef_header] = self.get_field_value_from_data(
-                    header_mapping, data, data_type, subtype, False
-                )
-
-                # Handle variable mappings
-                if (
-                    isinstance(headers[cef_header], str)
-                    and headers[cef_header].lower() in mapping_variables
-                ):
-                    headers[cef_header] = mapping_variables[
-                        headers[cef_header].lower()
-                    ]
-            except FieldNotFoundError as err:
-                missing_fields.append(str(err))
+        # Handle variable mappings
+        for cef_header, value in headers.items():
+            if isinstance(value, str) and value.lower() in mapping_variables:
+                headers[cef_header] = mapping_variables[value.lower()]
 
         return headers
 
-    def get_extensions(self, extension_mappings, data, data_type, subtype):
-        """Fetch extensions from given mappings.
+    def get_extensions(self, mapping_plan, data, data_type, subtype):
+        """Fetch extensions from given mapping plan.
 
         Args:
-            subtype: Subtype for which the headers are being transformed
-            data_type: Data type for which the headers are being transformed
-            extension_mappings: Mapping of extensions
+            mapping_plan: Compiled mapping plan of the subtype being transformed
             data: The data to be transformed
+            data_type: Data type for which the extensions are being transformed
+            subtype: Subtype for which the extensions are being transformed
 
         Returns:
             extensions (dict)
         """
-        extension = {}
-        missing_fields = []
-
-        # Iterate over mapped extensions
-        for cef_extension, extension_mapping in extension_mappings.items():
-            try:
-                extension[cef_extension] = self.get_field_value_from_data(
-                    extension_mapping,
-                    data,
-                    data_type,
-                    subtype,
-                    is_json_path="is_json_path" in extension_mapping,
-                )
-            except FieldNotFoundError as err:
-                missing_fields.append(str(err))
-
-        return extension
-
-    def get_field_value_from_data(
-        self, extension_mapping, data, data_type, subtype, is_json_path=False
-    ):
-        """To Fetch the value of extension based on "mapping" and "default" fields.
-
-        Args:
-            extension_mapping: Dict containing "mapping" and "default" fields
-            data: Data instance retrieved from Netskope
-            subtype: Subtype for which the extension are being transformed
-            data_type: Data type for which the headers are being transformed
-            is_json_path: Whether the mapped value is JSON path or direct field name
-
-        Returns:
-            Fetched values of extension
-
-        ---------------------------------------------------------------------
-             Mapping          |    Response    |    Retrieved Value
-        ----------------------|                |
-        default  |  Mapping   |                |
-        ---------------------------------------------------------------------
-           P     |     P      |        P       |           Mapped
-           P     |     P      |        NP      |           Default
-           P     |     NP     |        P       |           Default
-           NP    |     P      |        P       |           Mapped
-           P     |     NP     |        NP      |           Default
-           NP    |     P      |        NP      |           -
-           NP    |     NP     |        P       |           - (Not possible)
-           NP    |     NP     |        NP      |           - (Not possible)
-        -----------------------------------------------------------------------
-        """
-        if (
-            "mapping_field" in extension_mapping
-            and extension_mapping["mapping_field"]
-        ):
-            if is_json_path:
-                # If mapping field specified by JSON path is present in data, map that field, else skip by raising
-                # exception:
-                value = self.get_mapping_value_from_json_path(
-                    data, extension_mapping["mapping_field"]
-                )
-                if value:
-                    return ",".join([str(val) for val in value])
-                else:
-                    raise FieldNotFoundError(
-                        extension_mapping["mapping_field"]
-                    )
-            else:
-                # If mapping is present in data, map that field, else skip by raising exception
-                if (
-                    extension_mapping["mapping_field"] in data
-                ):  # case #1 and case #4
-                    return self.get_mapping_value_from_field(
-                        data, extension_mapping["mapping_field"]
-                    )
-                elif "default_value" in extension_mapping:
-                    # If mapped value is not found in response and default is mapped, map the default value (case #2)
-                    return extension_mapping["default_value"]
-                else:  # case #6
-                    raise FieldNotFoundError(
-                        extension_mapping["mapping_field"]
-                    )
-        else:
-            # If mapping is not present, 'default_value' must be there because of validation (case #3 and case #5)
-            return extension_mapping["default_value"]
+        return mapping_plan.get_extensions(data)
 
     def transform(self, raw_data, data_type, subtype) -> List:
         """To Transform the raw netskope JSON data into target platform supported data formats."""
         try:
-            delimiter, cef_version, qradar_mappings = get_qradar_mappings(
-                self.mappings, data_type
+            mapping_plan = get_mapping_plan(self.mappings, data_type, subtype)
+        except SubtypeMappingNotFoundError:
+            self.logger.error(
+                'Error occurred while retrieving mappings for subtype "{}". '
+                "Transformation of current chunk will be skipped.".format(
+                    subtype
+                )
             )
+            return []
         except KeyError as err:
             self.logger.error(
                 "Error in qradar mapping file. Error: {}".format(str(err))
@@ -270,34 +148,31 @@ class QRadarPlugin(PluginBase):
             )
             raise
 
-        cef_generator = CEFGenerator(
+        cef_generator = get_cef_generator(
             self.configuration["valid_extensions"],
-            delimiter,
-            cef_version,
+            mapping_plan.delimiter,
+            mapping_plan.cef_version,
             self.logger,
         )
 
-        transformed_data = []
-        for data in raw_data:
-
-            # First retrieve the mapping of subtype being transformed
-            try:
-                subtype_mapping = self.get_subtype_mapping(
-                    qradar_mappings[data_type], subtype
-                )
-            except Exception:
-                self.logger.error(
-                    'Error occurred while retrieving mappings for subtype "{}". '
-                    "Transformation of current record will be skipped.".format(
-                        subtype
-                    )
+        # Resolve the mapping variables once for the whole chunk
+        try:
+            mapping_variables = self.get_mapping_variables()
+        except Exception as err:
+            self.logger.error(
+                "[{}][{}]: Error occurred while resolving mapping variables: {}. "
+                "Transformation of current chunk will be skipped.".format(
+                    data_type, subtype, str(err)
                 )
-                continue
+            )
+            return []
 
+        transformed_data = []
+        for data in raw_data:
             # Generating the CEF header
             try:
                 header = self.get_headers(
-                    subtype_mapping["header"], data, data_type, subtype
+                    mapping_plan, data, data_type, subtype, mapping_variables
                 )
             except Exception as err:
                 self.logger.error(
@@ -310,7 +185,7 @@ class QRadarPlugin(PluginBase):
 
             try:
                 extension = self.get_extensions(
-                    subtype_mapping["extension"], data, data_type, subtype
+                    mapping_plan, data, data_type, subtype
                 )
             except Exception as err:
                 self.logger.error(
@@ -341,6 +216,39 @@ class QRadarPlugin(PluginBase):
                 )
         return transformed_data
 
+    def create_handler(self, configuration):
+        """Create QRadar handler based on configured protocol."""
+        if configuration["qradar_protocol"] == "TLS":
+            return SSLQRadarHandler(
+                address=(
+                    configuration["qradar_server"],
+                    configuration["qradar_port"],
+                ),
+                certs=configuration["qradar_certificate"],
+            )
+
+        socktype = socket.SOCK_DGRAM  # Set protocol to UDP by default
+        if configuration["qradar_protocol"] == "TCP":
+            socktype = socket.SOCK_STREAM
+
+        # Create a qradar handler with given configuration parameters
+        handler = logging.handlers.SysLogHandler(
+            address=(
+                configuration["qradar_server"],
+                configuration["qradar_port"],
+            ),
+            socktype=socktype,
+        )
+
+        if configuration["qradar_protocol"] == "TCP":
+            # This will add a line break to the message before it is 'emitted' which ensures that the messages are
+            # split up over multiple lines, see https://bugs.python.org/issue28404
+            handler.setFormatter(logging.Formatter("%(message)s\n"))
+            # In order for the above to work, then we need to ensure that the null terminator is not included
+            handler.append_nul = False
+
+        return handler
+
     def init_handler(self, configuration):
         """Initialize unique QRadar handler per thread based on configured protocol."""
         syslogger = logging.getLogger(
@@ -350,44 +258,35 @@ class QRadarPlugin(PluginBase):
         syslogger.handlers = []
         syslogger.propagate = False
 
-        if configuration["qradar_protocol"] == "TLS":
-            tls_handler = SSLQRadarHandler(
-                address=(
-                    configuration["qradar_server"],
-                    configuration["qradar_port"],
-                ),
-                certs=configuration["qradar_certificate"],
-            )
-            syslogger.addHandler(tls_handler)
-        else:
-            socktype = socket.SOCK_DGRAM  # Set protocol to UDP by default
-            if configuration["qradar_protocol"] == "TCP":
-                socktype = socket.SOCK_STREAM
+        syslogger.addHandler(self.create_handler(configuration))
 
-            # Create a qradar handler with given configuration parameters
-            handler = logging.handlers.SysLogHandler(
-                address=(
-                    configuration["qradar_server"],
-                    configuration["qradar_port"],
-                ),
-                socktype=socktype,
-            )
+        return syslogger
 
-            if configuration["qradar_protocol"] == "TCP":
-                # This will add a line break to the message before it is 'emitted' which ensures that the messages are
-                # split up over multiple lines, see https://bugs.python.org/issue28404
-                handler.setFormatter(logging.Formatter("%(message)s\n"))
-                # In order for the above to work, then we need to ensure that the null terminator is not included
-                handler.append_nul = False
+    def get_destination(self, configuration):
+        """To Fetch the key identifying the configured QRadar destination.
 
-            syslogger.addHandler(handler)
+        Args:
+            configuration: Plugin configuration
 
-        return syslogger
+        Returns:
+            Hashable destination key used by the connection pool
+        """
+        return (
+            configuration["qradar_protocol"],
+            configuration["qradar_server"],
+            configuration["qradar_port"],
+            configuration.get("qradar_certificate"),
+        )
 
     def push(self, transformed_data, data_type, subtype) -> PushResult:
         """Push the transformed_data to the 3rd party platform."""
+        destination = self.get_destination(self.configuration)
+
+        def connect():
+            return self.create_handler(self.configuration)
+
         try:
-            syslogger = self.init_handler(self.configuration)
+            handler = connection_pool.acquire(destination, connect)
         except Exception as err:
             self.logger.error(
                 "Error occurred during initializing connection. Error: {}".format(
@@ -397,25 +296,123 @@ class QRadarPlugin(PluginBase):
             raise
 
         # Log the transformed data to given qradar server
+        if self.configuration["qradar_protocol"] == "UDP":
+            handler = self._send_records(
+                handler, destination, connect, transformed_data
+            )
+        else:
+            handler = self._send_batched(
+                handler, destination, connect, transformed_data
+            )
+
+        # Keep the connection open for the next push
+        if handler is not None:
+            connection_pool.release(destination, handler)
+
+    def _send_records(self, handler, destination, connect, transformed_data):
+        """To Send the records one by one through the given handler.
+
+        Args:
+            handler: Pooled handler to send the records with
+            destination: Destination key of the connection pool
+            connect: Callable creating a new handler for the destination
+            transformed_data: The records to be sent
+
+        Returns:
+            The handler to be handed back to the pool, None if it was dropped
+        """
+        for data in transformed_data:
+            record = logging.makeLogRecord(
+                {"msg": data, "levelno": logging.INFO, "levelname": "INFO"}
+            )
+            try:
+                if handler is None:
+                    handler = connection_pool.acquire(destination, connect)
+                try:
+                    handler.handle(record)
+                except OSError:
+                    # The pooled connection may have been dropped by the
+                    # server, so reconnect once and retry the record
+                    connection_pool.discard(handler)
+                    handler = None
+                    handler = connection_pool.acquire(destination, connect)
+                    handler.handle(record)
+            except Exception as err:
+                if handler is not None:
+                    connection_pool.discard(handler)
+                    handler = None
+                self.logger.error(
+                    "Error occurred during data ingestion."
+                    " Error: {}. Record will be skipped".format(str(err))
+                )
+
+        return handler
+
+    def _send_batched(self, handler, destination, connect, transformed_data):
+        """To Send the records over a stream connection, many records per write.
+
+        Args:
+            handler: Pooled handler whose socket the records are written to
+            destination: Destination key of the connection pool
+            connect: Callable creating a new handler for the destination
+            transformed_data: The records to be sent
+
+        Returns:
+            The handler to be handed back to the pool, None if it was dropped
+        """
+        writer = QRadarStreamWriter(handler.socket)
         for data in transformed_data:
             try:
-                syslogger.info(data)
-                syslogger.handlers[0].flush()
+                writer.write(data)
             except Exception as err:
                 self.logger.error(
                     "Error occurred during data ingestion."
                     " Error: {}. Record will be skipped".format(str(err))
                 )
+                continue
+
+            if writer.is_full():
+                handler = self._flush_writer(
+                    writer, handler, destination, connect
+                )
+
+        return self._flush_writer(writer, handler, destination, connect)
+
+    def _flush_writer(self, writer, handler, destination, connect):
+        """To Write the buffered records, reconnecting once if the connection is broken.
 
-        # Clean up
+        Args:
+            writer: Writer holding the buffered records
+            handler: Pooled handler whose socket the writer writes to
+            destination: Destination key of the connection pool
+            connect: Callable creating a new handler for the destination
+
+        Returns:
+            The handler to be handed back to the pool, None if it was dropped
+        """
         try:
-            syslogger.handlers[0].close()
-            del syslogger.handlers[:]
-            del syslogger
+            if handler is None:
+                handler = connection_pool.acquire(destination, connect)
+                writer.sock = handler.socket
+            try:
+                writer.flush()
+            except OSError:
+                # The pooled connection may have been dropped by the
+                # server, so reconnect once and resend the batch
+                connection_pool.discard(handler)
+                handler = None
+                handler = connection_pool.acquire(destination, connect)
+                writer.sock = handler.socket
+                writer.flush()
         except Exception as err:
+            if handler is not None:
+                connection_pool.discard(handler)
+                handler = None
             self.logger.error(
-                "Error occurred during Clean up. Error: {}".format(str(err))
+                "Error occurred during data ingestion. Error: {}. "
+                "{} record(s) will be skipped".format(str(err), writer.clear())
             )
+        return handler
 
     def test_server_connectivity(self, configuration):
         """Tests whether the configured qradar server is reachable or not."""
@@ -35,14 +35,19 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import io
 import collections
+import copy
 import csv
 import datetime
 import datetime as dt
+import hashlib
 import re
 import socket
+import threading
 import time
 
 from .rapid7_constants import (
+    ESCAPE_TABLE_SIZE,
+    HOSTNAME_REFRESH_INTERVAL,
     SEVERITY_MAP,
     SEVERITY_UNKNOWN,
 )
@@ -52,9 +57,74 @@ from .rapid7_exceptions import (
 )
 
 
+def _is_translatable(special_chars):
+    """To Check whether escaper() can escape given characters with a translate table.
+
+    Letters and digits follow the backslash of the unicode_escape sequences
+    and the other excluded characters are special in a regex character
+    class, so the translate table would not match the regex based escaping.
+
+    Args:
+        special_chars: The special characters to be escaped
+
+    Returns:
+        True if a translate table gives the same result, False otherwise
+    """
+    return all(
+        " " <= char <= "~" and not char.isalnum() and char not in "\\[]^-"
+        for char in special_chars
+    )
+
+
+class _EscapeTable(dict):
+    """str.translate table doing unicode_escape and escaper() in one pass.
+
+    Printable ASCII characters are mapped up front, other characters are
+    mapped on first use.
+    """
+
+    def __init__(self, special_chars):
+        """Init method.
+
+        Args:
+            special_chars: The special characters to be escaped
+        """
+        super().__init__()
+        self.special_chars = special_chars
+        for code in range(0x20, 0x7F):
+            self[code] = self._escape(chr(code))
+
+    def _escape(self, char):
+        """To Map given character to its escaped form.
+
+        Args:
+            char: The character to be escaped
+
+        Returns:
+            Escaped character
+        """
+        if char == "\\" or char in self.special_chars:
+            return "\\" + char
+        if " " <= char <= "~":
+            return char
+        # unicode_escape sequence, whose backslash is escaped as well
+        return "\\" + char.encode("unicode_escape").decode("utf-8")
+
+    def __missing__(self, code):
+        """Map and cache a character not seen yet."""
+        value = self._escape(chr(code))
+        if len(self) < ESCAPE_TABLE_SIZE:
+            self[code] = value
+        return value
+
+
 class CEFGenerator(object):
     """CEF Generator class."""
 
+    # Seconds after which the cached hostname is resolved again, None to
+    # resolve it only once per generator.
+    hostname_refresh_interval = HOSTNAME_REFRESH_INTERVAL
+
     def __init__(self, extensions, delimiter, cef_version, logger):
         """Init method."""
         self.logger = logger
@@ -77,6 +147,10 @@ class CEFGenerator(object):
         self.valid_extensions = self._valid_extensions()
         self.extension_converters = self._type_converter()
         self.delimiter = delimiter
+        self._hostname = None
+        self._hostname_expiry = 0
+        self._prefix_second = None
+        self._prefix = None
 
     def escaper(self, special_chars):
         """Escapes the given special characters.
@@ -89,8 +163,14 @@ class CEFGenerator(object):
         """
         strip_escaped_re = re.compile(r"\\([{}\\])".format(special_chars))
         do_escape_re = re.compile(r"([{}\\])".format(special_chars))
+        table = None
+        if _is_translatable(special_chars):
+            table = str.maketrans({char: "\\" + char for char in special_chars})
 
         def escape(s):
+            if table is not None and "\\" not in s:
+                # Nothing to strip, so escaping is a plain translation
+                return s.translate(table)
             stripped = strip_escaped_re.sub(r"\1", s)
             return do_escape_re.sub(r"\\\1", stripped)
 
@@ -187,23 +267,44 @@ class CEFGenerator(object):
         Returns:
             Function to sanitize the given string
         """
-        regex = re.compile("^{}$".format(regex_str), re.DOTALL)
+        # ".*" matches every string, so there is no need to run it
+        regex = None
+        if regex_str != ".*":
+            regex = re.compile("^{}$".format(regex_str), re.DOTALL)
         escape = self.escaper(escape_chars)
+        table = special_search = None
+        if _is_translatable(escape_chars):
+            table = _EscapeTable(escape_chars)
+            if escape_chars:
+                special_search = re.compile(
+                    "[{}]".format(re.escape(escape_chars))
+                ).search
 
         def sanitize(s, debug_name):
             if not isinstance(s, str):
                 raise CEFTypeError(
                     "{}: Expected str, got {}".format(debug_name, type(s))
                 )
-            if not regex.match(s):
+            if regex is not None and not regex.match(s):
                 raise CEFTypeError(
                     "{}: {!r} did not match regex {!r}".format(
                         debug_name, s, regex_str
                     )
                 )
 
-            s = s.encode("unicode_escape").decode("utf-8")
-            escaped = escape(s)
+            if table is None:
+                s = s.encode("unicode_escape").decode("utf-8")
+                escaped = escape(s)
+            elif (
+                s.isascii()
+                and s.isprintable()
+                and "\\" not in s
+                and (special_search is None or special_search(s) is None)
+            ):
+                # Nothing to escape
+                escaped = s
+            else:
+                escaped = s.translate(table)
             if max_len is None and not min_len:
                 return escaped
 
@@ -485,6 +586,35 @@ class CEFGenerator(object):
 
         return hostname
 
+    def _get_prefix(self):
+        """To Fetch the CEF prefix (syslog timestamp, hostname and CEF version).
+
+        The hostname is resolved once per generator (and again every
+        hostname_refresh_interval seconds) and the prefix is rebuilt at most
+        once per wall-clock second.
+
+        Returns:
+            CEF prefix
+        """
+        now = time.time()
+        if self._hostname is None or (
+            self.hostname_refresh_interval is not None
+            and now >= self._hostname_expiry
+        ):
+            self._hostname = self._get_hostname()
+            self._hostname_expiry = now + (self.hostname_refresh_interval or 0)
+            self._prefix_second = None
+
+        second = int(now)
+        if second != self._prefix_second:
+            self._prefix = "{} {} CEF:{}".format(
+                time.strftime("%b %d %H:%M:%S", time.localtime(now)),
+                self._hostname,
+                self.cef_version,
+            )
+            self._prefix_second = second
+        return self._prefix
+
     def get_cef_event(self, headers, extensions, data_type, subtype):
         """To Produce a CEF compliant message from the arguments.
 
@@ -554,16 +684,8 @@ class CEFGenerator(object):
 
         self.log_invalid_header(possible_headers, headers, data_type, subtype)
 
-        hostname = self._get_hostname()
-
         # Append the CEF version
-        cef_components = [
-            "{} {} CEF:{}".format(
-                time.strftime("%b %d %H:%M:%S", time.localtime(time.time())),
-                hostname,
-                self.cef_version,
-            )
-        ]
+        cef_components = [self._get_prefix()]
 
         # Append other headers if available
         for header in possible_headers:
@@ -589,3 +711,46 @@ class CEFGenerator(object):
 
         # Join every CEF component with given delimiter
         return self.delimiter.join(cef_components)
+
+
+# Bounded per-process cache of ready CEF generators, keyed on a digest of
+# the configuration they are built from. A change in the configured
+# extensions, delimiter or CEF version yields a new key, so stale
+# generators are never served and simply age out of the cache.
+CEF_GENERATOR_CACHE_SIZE = 16
+_cef_generator_cache = collections.OrderedDict()
+_cef_generator_lock = threading.Lock()
+
+
+def get_cef_generator(extensions, delimiter, cef_version, logger):
+    """To Fetch a CEF generator for given configuration, building it only once per process.
+
+    Args:
+        extensions: CSV string having information of all the available CEF fields
+        delimiter: Delimiter of CEF components
+        cef_version: Version of CEF being used
+        logger: Logger to be used by the returned generator
+
+    Returns:
+        CEFGenerator object
+    """
+    key = hashlib.sha256(
+        "\0".join([extensions, delimiter, str(cef_version)]).encode("utf-8")
+    ).hexdigest()
+    with _cef_generator_lock:
+        generator = _cef_generator_cache.get(key)
+        if generator is not None:
+            _cef_generator_cache.move_to_end(key)
+
+    if generator is None:
+        generator = CEFGenerator(extensions, delimiter, cef_version, logger)
+        with _cef_generator_lock:
+            _cef_generator_cache[key] = generator
+            while len(_cef_generator_cache) > CEF_GENERATOR_CACHE_SIZE:
+                _cef_generator_cache.popitem(last=False)
+
+    # The parsed extensions and sanitizers are shared read-only; only the
+    # logger differs between callers.
+    generator = copy.copy(generator)
+    generator.logger = logger
+    return generator
@@ -0,0 +1,185 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Golden tests of the CEF string escaping of the syslog family generators.
+
+The expected values in golden/cef_escaping.json were produced by the regex
+and unicode_escape based escaping the translate tables replaced, so these
+tests pin the fast path to the exact bytes the plugins used to emit.
+"""
+
+
+import functools
+import hashlib
+import importlib
+import json
+import os
+
+import pytest
+
+GOLDEN_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "golden", "cef_escaping.json"
+)
+
+# Package and module prefix of every CEF generator copy
+GENERATORS = [
+    ("syslog", "syslog"),
+    ("arcsight", "arcsight"),
+    ("log_rhythm", "log_rhythm"),
+    ("mcas_cls", "mcas"),
+    ("qradar", "qradar"),
+    ("rapid7", "rapid7"),
+]
+
+# Code points escaped at once by the sweeps over the code space
+SWEEP_CHUNK_SIZE = 4096
+
+
+def _load_golden():
+    """To Load the expected values."""
+    with open(GOLDEN_FILE, encoding="utf-8") as golden_file:
+        return json.load(golden_file)
+
+
+GOLDEN = _load_golden()
+
+
+def _get_generator(package, prefix):
+    """To Create a bare CEF generator of given plugin.
+
+    The sanitizers and escapers do not depend on the state set up by the
+    constructor, so the mappings and extensions are not needed.
+    """
+    module = importlib.import_module(
+        "{}.utils.{}_cef_generator".format(package, prefix)
+    )
+    return module.CEFGenerator.__new__(module.CEFGenerator)
+
+
+def _apply(function, strings):
+    """To Apply given sanitizer or escaper, None standing for a raise."""
+    results = []
+    for string in strings:
+        try:
+            results.append(function(string))
+        except Exception as err:
+            # Each plugin raises the CEFTypeError of its own package
+            assert type(err).__name__ == "CEFTypeError"
+            results.append(None)
+    return results
+
+
+@functools.lru_cache(maxsize=None)
+def _sweep_chunks():
+    """To Build the chunks of the code point sweeps.
+
+    They hold every code point of the Basic Multilingual Plane, lone
+    surrogates included, and the first SWEEP_CHUNK_SIZE code points of each
+    supplementary plane.
+    """
+    starts = list(range(0, 0x10000, SWEEP_CHUNK_SIZE))
+    starts += range(0x10000, 0x110000, 0x10000)
+    return tuple(
+        "".join(chr(code) for code in range(start, start + SWEEP_CHUNK_SIZE))
+        for start in starts
+    )
+
+
+def sweep_digest(function):
+    """To Digest the output of given function over the code point sweep.
+
+    Args:
+        function: Function escaping a string
+
+    Returns:
+        Hex SHA-256 digest of the escaped chunks
+    """
+    digest = hashlib.sha256()
+    for chunk in _sweep_chunks():
+        digest.update(function(chunk).encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@pytest.fixture(params=GENERATORS, ids=[package for package, _ in GENERATORS])
+def generator(request):
+    """CEF generator of each plugin of the syslog family."""
+    return _get_generator(*request.param)
+
+
+@pytest.mark.parametrize(
+    "case",
+    GOLDEN["sanitizers"],
+    ids=lambda case: "{regex!r}-{escape_chars!r}-{max_len}".format(**case),
+)
+def test_str_sanitizer(generator, case):
+    """The sanitized strings match the golden values."""
+    sanitize = generator.str_sanitizer(
+        case["regex"], case["escape_chars"], max_len=case["max_len"]
+    )
+    assert _apply(
+        lambda s: sanitize(s, "field"), GOLDEN["strings"]
+    ) == case["expected"]
+
+
+@pytest.mark.parametrize(
+    "case",
+    GOLDEN["escapers"],
+    ids=lambda case: repr(case["special_chars"]),
+)
+def test_escaper(generator, case):
+    """The escaped strings match the golden values."""
+    escape = generator.escaper(case["special_chars"])
+    assert _apply(escape, GOLDEN["strings"]) == case["expected"]
+
+
+@pytest.mark.parametrize(
+    "escape_chars", sorted(GOLDEN["sanitizer_sweeps"])
+)
+def test_str_sanitizer_code_points(generator, escape_chars):
+    """The code points are sanitized as they used to be."""
+    sanitize = generator.str_sanitizer(escape_chars=escape_chars)
+    assert (
+        sweep_digest(lambda s: sanitize(s, "field"))
+        == GOLDEN["sanitizer_sweeps"][escape_chars]
+    )
+
+
+@pytest.mark.parametrize(
+    "special_chars", sorted(GOLDEN["escaper_sweeps"])
+)
+def test_escaper_code_points(generator, special_chars):
+    """The code points are escaped as they used to be."""
+    assert (
+        sweep_digest(generator.escaper(special_chars))
+        == GOLDEN["escaper_sweeps"][special_chars]
+    )
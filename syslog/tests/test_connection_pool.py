@@ -0,0 +1,215 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Tests of the connection pools of the syslog family plugins over TLS.
+
+The pooled handlers talk to a TLS 1.3 loopback server, which sends session
+tickets right after the handshake.
+"""
+
+
+import datetime
+import importlib
+import queue
+import socket
+import ssl
+import threading
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+
+# Package, module prefix and SSL handler class of every connection pool copy
+POOLS = [
+    ("syslog", "syslog", "SSLSysLogHandler"),
+    ("arcsight", "arcsight", "SSLArcSightHandler"),
+    ("log_rhythm", "log_rhythm", "SSLLogRhythmHandler"),
+    ("qradar", "qradar", "SSLQRadarHandler"),
+    ("rapid7", "rapid7", "SSLRapid7Handler"),
+]
+
+# Seconds to wait for the loopback server
+TIMEOUT = 10
+
+
+def _write_certificate(directory):
+    """To Write a self-signed certificate and its key to given directory.
+
+    Returns:
+        Paths of the certificate and of the key
+    """
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_file = directory / "cert.pem"
+    key_file = directory / "key.pem"
+    cert_file.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return str(cert_file), str(key_file)
+
+
+class TLSServer(object):
+    """TLS 1.3 server recording the lines received on each connection."""
+
+    def __init__(self, cert_file, key_file):
+        """Init method."""
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.minimum_version = ssl.TLSVersion.TLSv1_3
+        self.context.load_cert_chain(cert_file, key_file)
+        self.close_after_line = False
+        self.closed = threading.Event()
+        self.connections = 0
+        self.lines = queue.Queue()
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.address = self.sock.getsockname()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(
+                target=self._serve, args=(conn,), daemon=True
+            ).start()
+
+    def _serve(self, conn):
+        with self.context.wrap_socket(conn, server_side=True) as tls:
+            for line in tls.makefile("rb"):
+                self.lines.put(line)
+                if self.close_after_line:
+                    break
+        self.closed.set()
+
+    def close(self):
+        """To Stop accepting connections."""
+        self.sock.close()
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    """Self-signed certificate of the loopback server."""
+    return _write_certificate(tmp_path_factory.mktemp("tls"))
+
+
+@pytest.fixture
+def server(certificate):
+    """TLS 1.3 loopback server."""
+    tls_server = TLSServer(*certificate)
+    yield tls_server
+    tls_server.close()
+
+
+@pytest.fixture(params=POOLS, ids=[package for package, _, _ in POOLS])
+def plugin(request):
+    """Connection pool module and SSL handler class of each plugin."""
+    package, prefix, handler_class = request.param
+    pool_module = importlib.import_module(
+        "{}.utils.{}_connection_pool".format(package, prefix)
+    )
+    ssl_module = importlib.import_module(
+        "{}.utils.{}_ssl".format(package, prefix)
+    )
+    return pool_module, getattr(ssl_module, handler_class)
+
+
+def _send(handler, server, line):
+    """To Write a line with given handler and wait for the server to get it."""
+    handler.socket.sendall(line)
+    assert server.lines.get(timeout=TIMEOUT) == line
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_tls_handler_reused(plugin, server):
+    """A healthy TLS 1.3 connection is handed out again by the pool."""
+    pool_module, handler_class = plugin
+    pool = type(pool_module.connection_pool)()
+    created = []
+
+    def connect():
+        created.append(handler_class(server.address))
+        return created[-1]
+
+    handler = pool.acquire(server.address, connect)
+    _send(handler, server, b"first\n")
+    assert pool_module.is_connection_alive(handler)
+    pool.release(server.address, handler)
+
+    assert pool.acquire(server.address, connect) is handler
+    _send(handler, server, b"second\n")
+    assert len(created) == 1
+    assert server.connections == 1
+    pool.discard(handler)
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_tls_handler_closed_by_peer(plugin, server):
+    """A TLS connection closed by the server is replaced."""
+    pool_module, handler_class = plugin
+    pool = type(pool_module.connection_pool)()
+    server.close_after_line = True
+
+    handler = pool.acquire(
+        server.address, lambda: handler_class(server.address)
+    )
+    _send(handler, server, b"last\n")
+    assert server.closed.wait(TIMEOUT)
+    pool.release(server.address, handler)
+
+    replacement = pool.acquire(
+        server.address, lambda: handler_class(server.address)
+    )
+    assert replacement is not handler
+    pool.discard(replacement)
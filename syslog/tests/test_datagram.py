@@ -0,0 +1,203 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Tests of the UDP datagram sender of the syslog plugin.
+
+The datagrams are sent to a loopback UDP listener, so the sizes checked are
+the sizes of the datagrams a receiver gets.
+"""
+
+
+import socket
+
+import pytest
+
+from ..utils.syslog_constants import (
+    MAX_DATAGRAM_SIZE,
+    OVERSIZE_DROP,
+    RFC_5424,
+)
+from ..utils.syslog_datagram import SyslogDatagramSender
+from ..utils.syslog_encoder import SyslogEncoder
+
+# Seconds to wait for a datagram
+TIMEOUT = 5
+
+
+@pytest.fixture
+def listener():
+    """UDP socket bound to a free loopback port."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(TIMEOUT)
+    yield sock
+    sock.close()
+
+
+@pytest.fixture
+def sock():
+    """UDP socket the datagrams are sent with."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    yield sock
+    sock.close()
+
+
+def _send(sender, sock, listener, messages):
+    """To Pack and send given messages, and receive the datagrams sent.
+
+    Returns:
+        Datagram payloads (bytes) received by the listener
+    """
+    datagrams = [sender.pack(message) for message in messages]
+    datagrams = [datagram for datagram in datagrams if datagram is not None]
+    sender.send(sock, listener.getsockname(), datagrams)
+    return [listener.recv(1 << 17) for _ in range(sender.sent)]
+
+
+class FailingSocket(object):
+    """UDP socket whose sendto fails once, after given number of datagrams."""
+
+    def __init__(self, sock, fail_after):
+        """Init method."""
+        self.sock = sock
+        self.family = sock.family
+        self.fail_after = fail_after
+
+    def sendto(self, data, address):
+        """To Send a datagram, failing once after fail_after datagrams."""
+        if self.fail_after == 0:
+            self.fail_after = None
+            raise OSError("Network is unreachable")
+        if self.fail_after is not None:
+            self.fail_after -= 1
+        return self.sock.sendto(data, address)
+
+
+def test_one_datagram_per_message(sock, listener):
+    """Every message is sent in a datagram of its own, in order."""
+    sender = SyslogDatagramSender()
+
+    received = _send(sender, sock, listener, ["first", "second", "é"])
+
+    assert received == [
+        b"<14>first\x00",
+        b"<14>second\x00",
+        "<14>é\x00".encode("utf-8"),
+    ]
+    assert (sender.sent, sender.truncated, sender.dropped) == (3, 0, 0)
+
+
+def test_rfc_5424_datagram_has_no_trailer(sock, listener):
+    """RFC 5424 datagrams carry the message without the NUL terminator."""
+    sender = SyslogDatagramSender(SyslogEncoder(RFC_5424))
+
+    (received,) = _send(sender, sock, listener, ["message"])
+
+    assert received.startswith(b"<14>1 ")
+    assert received.endswith(b" - - - message")
+
+
+@pytest.mark.parametrize("max_datagram_size", [480, 1472, MAX_DATAGRAM_SIZE])
+def test_datagram_of_max_size_sent_whole(sock, listener, max_datagram_size):
+    """A message encoding to exactly the max size is not truncated."""
+    sender = SyslogDatagramSender(max_datagram_size=max_datagram_size)
+    # PRI and NUL terminator
+    message = "x" * (max_datagram_size - 5)
+
+    (received,) = _send(sender, sock, listener, [message])
+
+    assert received == b"<14>" + message.encode("utf-8") + b"\x00"
+    assert sender.truncated == 0
+
+
+@pytest.mark.parametrize("max_datagram_size", [480, 1472, MAX_DATAGRAM_SIZE])
+def test_oversize_datagram_truncated(sock, listener, max_datagram_size):
+    """Oversize messages are truncated to the max size, terminator kept."""
+    sender = SyslogDatagramSender(max_datagram_size=max_datagram_size)
+
+    received = _send(
+        sender, sock, listener, ["a" * max_datagram_size, "small"]
+    )
+
+    assert len(received[0]) == max_datagram_size
+    assert received[0] == (
+        b"<14>" + b"a" * (max_datagram_size - 5) + b"\x00"
+    )
+    assert received[1] == b"<14>small\x00"
+    assert (sender.sent, sender.truncated, sender.dropped) == (2, 1, 0)
+
+
+def test_truncation_does_not_split_characters(sock, listener):
+    """Truncation backs off to the start of a multi-byte character."""
+    sender = SyslogDatagramSender(max_datagram_size=480)
+    # 4 bytes of PRI and 2 bytes per character, the 480 bytes limit falls
+    # in the middle of the 238th character
+    (received,) = _send(sender, sock, listener, ["é" * 300])
+
+    assert received == "<14>{}\x00".format("é" * 237).encode("utf-8")
+    assert len(received) == 479
+
+
+def test_oversize_datagram_dropped(sock, listener):
+    """With the drop policy, oversize messages are counted and not sent."""
+    sender = SyslogDatagramSender(
+        max_datagram_size=480, oversize_policy=OVERSIZE_DROP
+    )
+
+    received = _send(sender, sock, listener, ["small", "a" * 480, "last"])
+
+    assert received == [b"<14>small\x00", b"<14>last\x00"]
+    assert (sender.sent, sender.truncated, sender.dropped) == (2, 0, 1)
+
+
+def test_send_resumes_after_failure(sock, listener):
+    """Sending again after a failure sends only the remaining datagrams."""
+    sender = SyslogDatagramSender()
+    datagrams = [sender.pack(str(index)) for index in range(5)]
+    address = listener.getsockname()
+
+    with pytest.raises(OSError):
+        sender.send(FailingSocket(sock, 2), address, datagrams)
+    assert sender.sent == 2
+    sender.send(sock, address, datagrams)
+
+    assert sender.sent == 5
+    assert [listener.recv(1024) for _ in range(5)] == [
+        "<14>{}\x00".format(index).encode("utf-8") for index in range(5)
+    ]
+
+
+def test_invalid_oversize_policy():
+    """An unknown oversize policy is rejected."""
+    with pytest.raises(ValueError):
+        SyslogDatagramSender(oversize_policy="fragment")
@@ -35,6 +35,9 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 SYSLOG_FORMATS = ['CEF']
 SYSLOG_PROTOCOLS = ['UDP', 'TCP', 'TLS']
+RFC_3164 = 'RFC 3164'
+RFC_5424 = 'RFC 5424'
+SYSLOG_MESSAGE_FORMATS = [RFC_3164, RFC_5424]
 
 SEVERITY_LOW = 'Low'
 SEVERITY_MEDIUM = 'Medium'
@@ -61,3 +64,37 @@ SEVERITY_MAP = {
     '9': SEVERITY_VERY_HIGH,
     '10': SEVERITY_VERY_HIGH
 }
+
+# Seconds after which the hostname used in the CEF prefix is resolved again
+HOSTNAME_REFRESH_INTERVAL = 3600
+# Max characters cached by the translate table of a CEF string sanitizer
+ESCAPE_TABLE_SIZE = 4096
+
+# Seconds after which an unused pooled syslog connection is closed
+CONNECTION_IDLE_TIMEOUT = 300
+# Max unused connections kept open per syslog destination
+MAX_IDLE_CONNECTIONS = 8
+# Bytes read at once while draining the post-handshake records of a pooled
+# TLS connection
+SSL_DRAIN_SIZE = 4096
+
+# Framing of syslog messages over TCP/TLS (RFC 6587)
+FRAMING_NEWLINE = "newline"
+FRAMING_OCTET_COUNTING = "octet-counting"
+SYSLOG_FRAMINGS = [FRAMING_NEWLINE, FRAMING_OCTET_COUNTING]
+# Buffered bytes after which framed syslog messages are written to the socket
+WRITE_BATCH_SIZE = 64 * 1024
+
+# Max UDP datagram payload (bytes), the IPv4 limit by default. Smaller
+# values (e.g. 1472 for a 1500 bytes MTU) avoid IP fragmentation.
+MAX_DATAGRAM_SIZE = 65507
+MIN_DATAGRAM_SIZE = 480  # Size every receiver must accept (RFC 5426)
+# What to do with messages exceeding the max datagram size
+OVERSIZE_TRUNCATE = "truncate"
+OVERSIZE_DROP = "drop"
+OVERSIZE_POLICIES = [OVERSIZE_TRUNCATE, OVERSIZE_DROP]
+
+# APP-NAME of the RFC 5424 header
+SYSLOG_APP_NAME = "NetskopeCE"
+# Value of the RFC 5424 header fields that are not provided
+NILVALUE = "-"
@@ -0,0 +1,140 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Syslog Plugin UDP datagram sender."""
+
+
+import socket
+
+from .syslog_constants import (
+    MAX_DATAGRAM_SIZE,
+    OVERSIZE_DROP,
+    OVERSIZE_POLICIES,
+    OVERSIZE_TRUNCATE,
+)
+from .syslog_encoder import SyslogEncoder
+
+
+def _truncate_utf8(data, size):
+    """To Truncate UTF-8 encoded data without splitting a character.
+
+    Args:
+        data: UTF-8 encoded data (bytes)
+        size: Max length of the truncated data
+
+    Returns:
+        Truncated data (bytes)
+    """
+    if len(data) <= size:
+        return data
+    # Back off over the continuation bytes (0b10xxxxxx) of a split character
+    while size > 0 and (data[size] & 0xC0) == 0x80:
+        size -= 1
+    return data[:size]
+
+
+class SyslogDatagramSender(object):
+    """Sender of pre-encoded syslog messages, one UDP datagram per message."""
+
+    def __init__(
+        self,
+        encoder=None,
+        max_datagram_size=MAX_DATAGRAM_SIZE,
+        oversize_policy=OVERSIZE_TRUNCATE,
+    ):
+        """Init method.
+
+        Args:
+            encoder: SyslogEncoder of the messages, RFC 3164 if not given
+            max_datagram_size: Max size (bytes) of a datagram payload
+            oversize_policy: OVERSIZE_TRUNCATE or OVERSIZE_DROP, what to do
+            with messages encoding to more than max_datagram_size bytes
+        """
+        if oversize_policy not in OVERSIZE_POLICIES:
+            raise ValueError(
+                "Invalid oversize policy: {}".format(oversize_policy)
+            )
+        self.encoder = encoder or SyslogEncoder()
+        self.max_datagram_size = max_datagram_size
+        self.oversize_policy = oversize_policy
+        self.sent = 0  # Number of datagrams sent
+        self.truncated = 0  # Number of messages truncated to fit
+        self.dropped = 0  # Number of messages dropped for being too large
+
+    def pack(self, message):
+        """To Encode given message as a datagram of at most max_datagram_size bytes.
+
+        Args:
+            message: The message (str) to be sent
+
+        Returns:
+            Datagram payload (bytes), None if the message was dropped
+        """
+        datagram = self.encoder.encode_datagram(message)
+        if len(datagram) <= self.max_datagram_size:
+            return datagram
+
+        if self.oversize_policy == OVERSIZE_DROP:
+            self.dropped += 1
+            return None
+
+        trailer = self.encoder.datagram_trailer
+        datagram = (
+            _truncate_utf8(
+                datagram[: len(datagram) - len(trailer)],
+                self.max_datagram_size - len(trailer),
+            )
+            + trailer
+        )
+        self.truncated += 1
+        return datagram
+
+    def send(self, sock, address, datagrams):
+        """To Send the datagrams not sent yet.
+
+        The destination is resolved once per call rather than by every
+        sendto. If sending fails, calling again with the same datagrams
+        resumes after the last datagram sent.
+
+        Args:
+            sock: UDP socket to send the datagrams with
+            address: Destination (host, port)
+            datagrams: Datagram payloads (bytes) returned by pack()
+        """
+        host, port = address
+        address = socket.getaddrinfo(
+            host, port, sock.family, socket.SOCK_DGRAM
+        )[0][4]
+        sendto = sock.sendto
+        for datagram in datagrams[self.sent:]:
+            sendto(datagram, address)
+            self.sent += 1
@@ -0,0 +1,154 @@
+"""
+BSD 3-Clause License
+
+Copyright (c) 2021, Netskope OSS
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+"""Syslog Plugin message encoder."""
+
+
+import socket
+import time
+from logging.handlers import SysLogHandler
+
+from .syslog_constants import (
+    HOSTNAME_REFRESH_INTERVAL,
+    NILVALUE,
+    RFC_3164,
+    SYSLOG_APP_NAME,
+    SYSLOG_MESSAGE_FORMATS,
+)
+
+
+class SyslogEncoder(object):
+    """Encoder of syslog messages in RFC 3164 or RFC 5424 format."""
+
+    hostname_refresh_interval = HOSTNAME_REFRESH_INTERVAL
+
+    def __init__(
+        self,
+        message_format=RFC_3164,
+        facility=SysLogHandler.LOG_USER,
+        severity=SysLogHandler.LOG_INFO,
+        app_name=SYSLOG_APP_NAME,
+    ):
+        """Init method.
+
+        Args:
+            message_format: RFC_3164 (PRI followed by the message, as sent by
+            logging.handlers.SysLogHandler) or RFC_5424
+            facility: Syslog facility of the messages
+            severity: Syslog severity of the messages
+            app_name: APP-NAME of the RFC 5424 header
+        """
+        if message_format not in SYSLOG_MESSAGE_FORMATS:
+            raise ValueError(
+                "Invalid syslog message format: {}".format(message_format)
+            )
+        self.message_format = message_format
+        # RFC 3164 datagrams keep the NUL terminator appended by
+        # logging.handlers.SysLogHandler, RFC 5424 datagrams (RFC 5426)
+        # carry the bare message.
+        self.datagram_trailer = b"\x00" if message_format == RFC_3164 else b""
+        self.app_name = app_name
+        self._pri = "<{}>".format((facility << 3) | severity)
+        self._header = self._pri.encode("utf-8")
+        self._header_second = None
+        self._hostname = None
+        self._hostname_expiry = 0
+
+    @staticmethod
+    def _get_hostname():
+        """To Fetch the HOSTNAME of the RFC 5424 header.
+
+        Returns:
+            Hostname, or NILVALUE if it is not available
+        """
+        hostname = socket.gethostname()
+        if not hostname:
+            return NILVALUE
+        # HOSTNAME is limited to 255 printable US-ASCII characters
+        hostname = hostname.encode("ascii", "ignore").decode("ascii")
+        return "".join(hostname.split())[:255] or NILVALUE
+
+    def _get_header(self):
+        """To Fetch the encoded header preceding each message.
+
+        The RFC 5424 header is rebuilt at most once per wall-clock second
+        and the hostname is resolved again every hostname_refresh_interval
+        seconds.
+
+        Returns:
+            Encoded header (bytes)
+        """
+        if self.message_format == RFC_3164:
+            return self._header
+
+        now = time.time()
+        if self._hostname is None or now >= self._hostname_expiry:
+            self._hostname = self._get_hostname()
+            self._hostname_expiry = now + self.hostname_refresh_interval
+            self._header_second = None
+
+        second = int(now)
+        if second != self._header_second:
+            # PRI VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID SD
+            self._header = "{}1 {} {} {} {} {} {} ".format(
+                self._pri,
+                time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)),
+                self._hostname,
+                self.app_name,
+                NILVALUE,
+                NILVALUE,
+                NILVALUE,
+            ).encode("utf-8")
+            self._header_second = second
+        return self._header
+
+    def encode(self, message):
+        """To Encode given message with the syslog header.
+
+        Args:
+            message: The message (str) to be encoded
+
+        Returns:
+            Encoded syslog message (bytes) without any transport framing
+        """
+        return self._get_header() + message.encode("utf-8")
+
+    def encode_datagram(self, message):
+        """To Encode given message as the payload of a UDP datagram.
+
+        Args:
+            message: The message (str) to be encoded
+
+        Returns:
+            Datagram payload (bytes)
+        """
+        return self.encode(message) + self.datagram_trailer
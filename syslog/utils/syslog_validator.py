@@ -38,6 +38,8 @@ import csv
 from jsonschema import validate
 from jsonschema.exceptions import ValidationError as JsonSchemaValidationError
 
+from .syslog_constants import MAX_DATAGRAM_SIZE, MIN_DATAGRAM_SIZE
+
 
 class SyslogValidator(object):
     """Syslog validator class."""
@@ -67,6 +69,21 @@ class SyslogValidator(object):
         else:
             return False
 
+    def validate_max_datagram_size(self, max_datagram_size):
+        """Validate max UDP datagram size.
+
+        Args:
+            max_datagram_size: the max datagram size to be validated
+
+        Returns:
+            Whether the provided value is valid or not. True in case of valid value, False otherwise
+        """
+        try:
+            max_datagram_size = int(max_datagram_size)
+        except (TypeError, ValueError):
+            return False
+        return MIN_DATAGRAM_SIZE <= max_datagram_size <= MAX_DATAGRAM_SIZE
+
     def validate_taxonomy(self, instance):
         """Validate the schema of given taxonomy JSON.
 